@@ -28,7 +28,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from app.database import Base
-from app.models import RequestLog, PolicyRule, AdminUser, AuditLog
+from app.models import (
+    RequestLog, RequestRisk, PromptBlob, DecisionRollup, RiskRollup, PolicyRule, AdminUser,
+    AuditLog
+)
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,31 @@
+"""Add composite (timestamp, id) index for keyset pagination of request logs
+
+Revision ID: 002_logs_keyset_index
+Revises: 001_initial
+Create Date: 2025-02-03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002_logs_keyset_index'
+down_revision: Union[str, None] = '001_initial'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_request_logs_timestamp_id',
+        'request_logs',
+        ['timestamp', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_request_logs_timestamp_id', table_name='request_logs')
@@ -0,0 +1,120 @@
+"""Add normalized request_risks table
+
+Revision ID: 003_request_risks
+Revises: 002_logs_keyset_index
+Create Date: 2025-02-10
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003_request_risks'
+down_revision: Union[str, None] = '002_logs_keyset_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    op.create_table(
+        'request_risks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('request_log_id', sa.Integer(), nullable=False),
+        sa.Column('risk_type', sa.String(), nullable=False),
+        sa.Column('severity', sa.String(), nullable=False),
+        sa.Column('pattern_name', sa.String(), nullable=True),
+        sa.Column('start', sa.Integer(), nullable=True),
+        sa.Column('end', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['request_log_id'], ['request_logs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # Backfill from the JSON column before building indexes
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            """
+            INSERT INTO request_risks (request_log_id, risk_type, severity, pattern_name, start, "end")
+            SELECT l.id,
+                   r->>'type',
+                   r->>'severity',
+                   r->>'pattern_name',
+                   (r->'position'->>'start')::integer,
+                   (r->'position'->>'end')::integer
+            FROM request_logs l, json_array_elements(l.risks) AS r
+            """
+        )
+    else:
+        _backfill_in_batches(bind)
+
+    op.create_index(
+        'ix_request_risks_type_log',
+        'request_risks',
+        ['risk_type', 'request_log_id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_request_risks_severity_log',
+        'request_risks',
+        ['severity', 'request_log_id'],
+        unique=False
+    )
+    op.create_index(
+        'ix_request_risks_request_log_id',
+        'request_risks',
+        ['request_log_id'],
+        unique=False
+    )
+
+
+def _backfill_in_batches(bind) -> None:
+    """Portable backfill for databases without JSON set-returning functions."""
+    request_logs = sa.table('request_logs', sa.column('id', sa.Integer), sa.column('risks', sa.JSON))
+    request_risks = sa.table(
+        'request_risks',
+        sa.column('request_log_id', sa.Integer),
+        sa.column('risk_type', sa.String),
+        sa.column('severity', sa.String),
+        sa.column('pattern_name', sa.String),
+        sa.column('start', sa.Integer),
+        sa.column('end', sa.Integer),
+    )
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(request_logs.c.id, request_logs.c.risks)
+            .where(request_logs.c.id > last_id)
+            .order_by(request_logs.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        entries = [
+            {
+                'request_log_id': row.id,
+                'risk_type': risk['type'],
+                'severity': risk['severity'],
+                'pattern_name': risk.get('pattern_name'),
+                'start': (risk.get('position') or {}).get('start'),
+                'end': (risk.get('position') or {}).get('end'),
+            }
+            for row in rows
+            for risk in (row.risks or [])
+        ]
+        if entries:
+            bind.execute(request_risks.insert(), entries)
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index('ix_request_risks_request_log_id', table_name='request_risks')
+    op.drop_index('ix_request_risks_severity_log', table_name='request_risks')
+    op.drop_index('ix_request_risks_type_log', table_name='request_risks')
+    op.drop_table('request_risks')
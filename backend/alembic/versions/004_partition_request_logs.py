@@ -0,0 +1,116 @@
+"""Range-partition request_logs by timestamp (PostgreSQL only)
+
+Revision ID: 004_partition_request_logs
+Revises: 003_request_risks
+Create Date: 2025-02-17
+
+Rebuilds request_logs as a table partitioned by month on timestamp, with
+partitions covering existing rows plus three future months and a default
+partition for anything outside those ranges. Later partitions are created
+by `python -m app.log_partitions`.
+
+PostgreSQL requires the partition key in every unique constraint, so the
+primary key becomes (id, timestamp), request_id is unique per timestamp,
+and request_risks loses its foreign key to request_logs (retention cleans
+up risk rows explicitly).
+
+Other databases are left unpartitioned.
+"""
+from datetime import date, datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004_partition_request_logs'
+down_revision: Union[str, None] = '003_request_risks'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FUTURE_MONTHS = 3
+
+
+def _next_month(start: date) -> date:
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.drop_constraint('request_risks_request_log_id_fkey', 'request_risks', type_='foreignkey')
+
+    op.execute(
+        """
+        CREATE TABLE request_logs_partitioned (
+            LIKE request_logs INCLUDING DEFAULTS,
+            PRIMARY KEY (id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+        """
+    )
+
+    oldest = bind.execute(sa.text('SELECT min("timestamp") FROM request_logs')).scalar()
+    current = datetime.utcnow().date().replace(day=1)
+    start = (oldest.date() if oldest else current).replace(day=1)
+    last = current
+    for _ in range(FUTURE_MONTHS):
+        last = _next_month(last)
+    while start <= last:
+        end = _next_month(start)
+        op.execute(
+            f"CREATE TABLE request_logs_p{start:%Y_%m} PARTITION OF request_logs_partitioned "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+    op.execute("CREATE TABLE request_logs_default PARTITION OF request_logs_partitioned DEFAULT")
+
+    op.execute("INSERT INTO request_logs_partitioned SELECT * FROM request_logs")
+
+    # Keep the id sequence alive when the old table is dropped
+    op.execute("ALTER SEQUENCE request_logs_id_seq OWNED BY request_logs_partitioned.id")
+    op.drop_table('request_logs')
+    op.rename_table('request_logs_partitioned', 'request_logs')
+    op.execute("ALTER TABLE request_logs RENAME CONSTRAINT request_logs_partitioned_pkey TO request_logs_pkey")
+    op.create_index('ix_request_logs_id', 'request_logs', ['id'], unique=False)
+    op.create_index('ix_request_logs_request_id', 'request_logs', ['request_id', 'timestamp'], unique=True)
+    op.create_index('ix_request_logs_timestamp_id', 'request_logs', ['timestamp', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        """
+        CREATE TABLE request_logs_unpartitioned (
+            LIKE request_logs INCLUDING DEFAULTS,
+            PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute("INSERT INTO request_logs_unpartitioned SELECT * FROM request_logs")
+    op.execute("ALTER SEQUENCE request_logs_id_seq OWNED BY request_logs_unpartitioned.id")
+
+    # Dropping the parent drops every attached partition with it
+    op.drop_table('request_logs')
+    op.rename_table('request_logs_unpartitioned', 'request_logs')
+    op.execute("ALTER TABLE request_logs RENAME CONSTRAINT request_logs_unpartitioned_pkey TO request_logs_pkey")
+    op.create_index('ix_request_logs_id', 'request_logs', ['id'], unique=False)
+    op.create_index('ix_request_logs_request_id', 'request_logs', ['request_id'], unique=True)
+    op.create_index('ix_request_logs_timestamp_id', 'request_logs', ['timestamp', 'id'], unique=False)
+
+    op.execute(
+        "DELETE FROM request_risks WHERE request_log_id NOT IN (SELECT id FROM request_logs)"
+    )
+    op.create_foreign_key(
+        'request_risks_request_log_id_fkey',
+        'request_risks',
+        'request_logs',
+        ['request_log_id'],
+        ['id'],
+        ondelete='CASCADE'
+    )
@@ -0,0 +1,74 @@
+"""Add decision and risk rollup tables for the stats endpoint
+
+Revision ID: 005_log_rollups
+Revises: 004_partition_request_logs
+Create Date: 2025-02-24
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005_log_rollups'
+down_revision: Union[str, None] = '004_partition_request_logs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'decision_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('granularity', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('decision', sa.String(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('granularity', 'bucket_start', 'decision', name='uq_decision_rollups_key')
+    )
+    op.create_table(
+        'risk_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('granularity', sa.String(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('risk_type', sa.String(), nullable=False),
+        sa.Column('severity', sa.String(), nullable=False),
+        sa.Column('pattern_name', sa.String(), nullable=False),
+        sa.Column('count', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'granularity', 'bucket_start', 'risk_type', 'severity', 'pattern_name',
+            name='uq_risk_rollups_key'
+        )
+    )
+
+    # Seed rollups from existing logs; buckets are truncated in UTC
+    if op.get_bind().dialect.name == 'postgresql':
+        for granularity in ('minute', 'hour', 'day'):
+            bucket = f"date_trunc('{granularity}', l.\"timestamp\" AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
+            op.execute(
+                f"""
+                INSERT INTO decision_rollups (granularity, bucket_start, decision, count)
+                SELECT '{granularity}', {bucket}, l.decision::text, count(*)
+                FROM request_logs l
+                GROUP BY 2, 3
+                """
+            )
+            op.execute(
+                f"""
+                INSERT INTO risk_rollups (granularity, bucket_start, risk_type, severity, pattern_name, count)
+                SELECT '{granularity}', {bucket}, r.risk_type, r.severity,
+                       coalesce(r.pattern_name, ''), count(*)
+                FROM request_logs l
+                JOIN request_risks r ON r.request_log_id = l.id
+                GROUP BY 2, 3, 4, 5
+                """
+            )
+
+
+def downgrade() -> None:
+    op.drop_table('risk_rollups')
+    op.drop_table('decision_rollups')
@@ -0,0 +1,61 @@
+"""Add denormalized risk summary columns to request_logs
+
+Revision ID: 006_request_log_summary
+Revises: 005_log_rollups
+Create Date: 2025-03-03
+
+Existing rows keep NULL summaries until `python -m app.log_summary` has
+backfilled them; the columns are added without defaults so this migration
+does not rewrite the table. Until then the logs router matches and counts
+those rows through request_risks, found via a partial index on rows with
+a NULL risk_count.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006_request_log_summary'
+down_revision: Union[str, None] = '005_log_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('request_logs', sa.Column('risk_count', sa.Integer(), nullable=True))
+    op.add_column('request_logs', sa.Column('max_severity', sa.String(), nullable=True))
+    op.add_column('request_logs', sa.Column('risk_types', sa.Integer(), nullable=True))
+    op.add_column('request_logs', sa.Column('prompt_length', sa.Integer(), nullable=True))
+    op.create_index(
+        'ix_request_logs_risk_types_timestamp',
+        'request_logs',
+        ['risk_types', 'timestamp'],
+        unique=False
+    )
+    op.create_index(
+        'ix_request_logs_max_severity_timestamp',
+        'request_logs',
+        ['max_severity', 'timestamp'],
+        unique=False
+    )
+    op.create_index(
+        'ix_request_logs_unsummarized',
+        'request_logs',
+        ['timestamp'],
+        unique=False,
+        postgresql_where=sa.text('risk_count IS NULL'),
+        sqlite_where=sa.text('risk_count IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_request_logs_unsummarized', table_name='request_logs')
+    op.drop_index('ix_request_logs_max_severity_timestamp', table_name='request_logs')
+    op.drop_index('ix_request_logs_risk_types_timestamp', table_name='request_logs')
+    op.drop_column('request_logs', 'prompt_length')
+    op.drop_column('request_logs', 'risk_types')
+    op.drop_column('request_logs', 'max_severity')
+    op.drop_column('request_logs', 'risk_count')
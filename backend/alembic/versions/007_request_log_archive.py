@@ -0,0 +1,28 @@
+"""Add cold storage archive reference columns to request_logs
+
+Revision ID: 007_request_log_archive
+Revises: 006_request_log_summary
+Create Date: 2025-03-10
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007_request_log_archive'
+down_revision: Union[str, None] = '006_request_log_summary'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('request_logs', sa.Column('archive_ref', sa.String(), nullable=True))
+    op.add_column('request_logs', sa.Column('archive_sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('request_logs', 'archive_sha256')
+    op.drop_column('request_logs', 'archive_ref')
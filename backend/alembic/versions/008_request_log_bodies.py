@@ -0,0 +1,26 @@
+"""Add compressed bodies column to request_logs
+
+Revision ID: 008_request_log_bodies
+Revises: 007_request_log_archive
+Create Date: 2025-03-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008_request_log_bodies'
+down_revision: Union[str, None] = '007_request_log_archive'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('request_logs', sa.Column('bodies', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('request_logs', 'bodies')
@@ -0,0 +1,46 @@
+"""Add content-addressed prompt_blobs table referenced by request_logs
+
+Revision ID: 009_prompt_blobs
+Revises: 008_request_log_bodies
+Create Date: 2025-03-24
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009_prompt_blobs'
+down_revision: Union[str, None] = '008_request_log_bodies'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'prompt_blobs',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint('hash')
+    )
+    op.add_column('request_logs', sa.Column('prompt_hash', sa.String(length=64), nullable=True))
+    op.create_foreign_key(
+        'fk_request_logs_prompt_hash',
+        'request_logs', 'prompt_blobs',
+        ['prompt_hash'], ['hash']
+    )
+
+
+def downgrade() -> None:
+    # Inline shared prompts again before the blobs go away; rows stored with
+    # LOG_BODY_STORAGE=compressed cannot be rewritten in SQL and lose them
+    op.execute(
+        "UPDATE request_logs SET original_prompt = "
+        "(SELECT body FROM prompt_blobs WHERE prompt_blobs.hash = request_logs.prompt_hash) "
+        "WHERE prompt_hash IS NOT NULL AND bodies IS NULL"
+    )
+    op.drop_constraint('fk_request_logs_prompt_hash', 'request_logs', type_='foreignkey')
+    op.drop_column('request_logs', 'prompt_hash')
+    op.drop_table('prompt_blobs')
@@ -0,0 +1,75 @@
+"""Add full-text search index over logged prompts and responses
+
+Revision ID: 010_log_search
+Revises: 009_prompt_blobs
+Create Date: 2025-03-31
+
+PostgreSQL gets a GIN-indexed tsvector column; SQLite an FTS5 table. Existing
+logs are indexed from their plain-text or deduplicated prompt; logs stored
+with LOG_BODY_STORAGE=compressed before this migration are not indexed.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010_log_search'
+down_revision: Union[str, None] = '009_prompt_blobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Original prompt (inline or shared) followed by the original response
+INDEXED_TEXT = """
+    concat_ws(
+        chr(10),
+        nullif(coalesce(
+            (SELECT body FROM prompt_blobs WHERE prompt_blobs.hash = request_logs.prompt_hash),
+            original_prompt
+        ), ''),
+        original_response
+    )
+"""
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        op.add_column('request_logs', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.execute(
+            f"UPDATE request_logs SET search_vector = to_tsvector('english', {INDEXED_TEXT}) "
+            "WHERE bodies IS NULL"
+        )
+        op.create_index(
+            'ix_request_logs_search_vector',
+            'request_logs',
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin'
+        )
+        return
+
+    op.add_column('request_logs', sa.Column('search_vector', sa.Text(), nullable=True))
+    if bind.dialect.name == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS request_logs_fts USING fts5(body)")
+        op.execute(
+            "INSERT INTO request_logs_fts (rowid, body) "
+            "SELECT id, trim(coalesce((SELECT body FROM prompt_blobs "
+            "WHERE prompt_blobs.hash = request_logs.prompt_hash), original_prompt) "
+            "|| char(10) || coalesce(original_response, ''), char(10)) "
+            "FROM request_logs WHERE bodies IS NULL"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        op.drop_index('ix_request_logs_search_vector', table_name='request_logs')
+    elif bind.dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS request_logs_fts")
+    op.drop_column('request_logs', 'search_vector')
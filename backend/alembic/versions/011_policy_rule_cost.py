@@ -0,0 +1,29 @@
+"""Add measured regex cost to policy_rules
+
+Revision ID: 011_policy_rule_cost
+Revises: 010_log_search
+Create Date: 2025-04-07
+
+Existing rules keep a NULL cost until they are next saved through
+PUT /v1/policy, which probes their pattern.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011_policy_rule_cost'
+down_revision: Union[str, None] = '010_log_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('policy_rules', sa.Column('pattern_cost', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('policy_rules', 'pattern_cost')
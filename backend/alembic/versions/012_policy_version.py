@@ -0,0 +1,46 @@
+"""Version policy rules for conditional and incremental GET /v1/policy
+
+Revision ID: 012_policy_version
+Revises: 011_policy_rule_cost
+Create Date: 2025-04-14
+
+Existing rules become version 1, so a client polling with since_version=0
+still receives them.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012_policy_version'
+down_revision: Union[str, None] = '011_policy_rule_cost'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'policy_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.add_column(
+        'policy_rules',
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False)
+    )
+    op.create_index(op.f('ix_policy_rules_version'), 'policy_rules', ['version'], unique=False)
+    op.execute("UPDATE policy_rules SET version = 1")
+    op.execute(
+        "INSERT INTO policy_state (id, version) "
+        "SELECT 1, CASE WHEN EXISTS (SELECT 1 FROM policy_rules) THEN 1 ELSE 0 END"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_policy_rules_version'), table_name='policy_rules')
+    op.drop_column('policy_rules', 'version')
+    op.drop_table('policy_state')
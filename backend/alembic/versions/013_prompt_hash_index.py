@@ -0,0 +1,33 @@
+"""Index request_logs.prompt_hash so unreferenced prompt_blobs can be pruned
+
+Revision ID: 013_prompt_hash_index
+Revises: 012_policy_version
+Create Date: 2025-04-21
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013_prompt_hash_index'
+down_revision: Union[str, None] = '012_policy_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_request_logs_prompt_hash',
+        'request_logs',
+        ['prompt_hash'],
+        unique=False,
+        postgresql_where=sa.text('prompt_hash IS NOT NULL'),
+        sqlite_where=sa.text('prompt_hash IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_request_logs_prompt_hash', table_name='request_logs')
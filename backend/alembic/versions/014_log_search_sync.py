@@ -0,0 +1,44 @@
+"""Keep the full-text index in sync with archived and deleted logs
+
+Revision ID: 014_log_search_sync
+Revises: 013_prompt_hash_index
+Create Date: 2025-04-22
+
+Archived logs are removed from the index. On SQLite a trigger removes the
+FTS5 row of a deleted log, and rows left behind by earlier deletes are
+dropped so their rowids cannot match new logs.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014_log_search_sync'
+down_revision: Union[str, None] = '013_prompt_hash_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        op.execute("UPDATE request_logs SET search_vector = NULL WHERE archive_ref IS NOT NULL")
+    elif bind.dialect.name == 'sqlite':
+        op.execute(
+            "DELETE FROM request_logs_fts WHERE rowid NOT IN "
+            "(SELECT id FROM request_logs WHERE archive_ref IS NULL)"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS request_logs_fts_delete AFTER DELETE ON request_logs "
+            "BEGIN DELETE FROM request_logs_fts WHERE rowid = old.id; END"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS request_logs_fts_delete")
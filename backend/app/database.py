@@ -2,21 +2,41 @@
 Database configuration and session management.
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
-from typing import Generator
+from fastapi import Depends
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from typing import Generator, Optional
+import logging
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional read-only replica for heavy admin reads
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+# Replica reads fall back to the primary when the replica is further behind than this
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+# Seconds a replica lag measurement is reused before checking again
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "5"))
 
 engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+read_engine = create_engine(DATABASE_READ_URL, pool_pre_ping=True) if DATABASE_READ_URL else None
+ReadSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine else None
+)
+
 Base = declarative_base()
 
+# Last replica lag check: (monotonic time of the check, replica usable)
+_replica_check = (float("-inf"), False)
+
 
 def get_db() -> Generator:
     """Dependency for getting database session."""
@@ -25,3 +45,82 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+def on_conflict_insert(bind, table):
+    """
+    Return an INSERT into `table` that supports ON CONFLICT clauses, or None
+    on databases without INSERT ... ON CONFLICT, where callers fall back to
+    checking for the row first.
+    """
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(table)
+
+
+def replica_lag_seconds() -> Optional[float]:
+    """Return how far the read replica is behind the primary, or None if either is unreachable."""
+    try:
+        if read_engine.dialect.name != "postgresql":
+            with read_engine.connect():
+                return 0.0
+        # Read the primary's position first: a replica that has replayed up to it is
+        # current, however old its last replayed transaction is. Comparing against
+        # what the replica itself received would also pass a replica that has lost
+        # its connection to the primary.
+        with engine.connect() as conn:
+            primary_lsn = conn.execute(text("SELECT pg_current_wal_lsn()")).scalar()
+        with read_engine.connect() as conn:
+            lag = conn.execute(text(
+                "SELECT CASE WHEN NOT pg_is_in_recovery() "
+                "OR pg_last_wal_replay_lsn() >= CAST(:primary_lsn AS pg_lsn) THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+            ), {"primary_lsn": str(primary_lsn)}).scalar()
+            # Behind the primary without having replayed any transaction yet
+            return float(lag) if lag is not None else float("inf")
+    except SQLAlchemyError as e:
+        logger.warning(f"Read replica unavailable: {str(e)}")
+        return None
+
+
+def replica_is_usable() -> bool:
+    """Whether reads may go to the replica; its lag is re-checked at most every interval."""
+    global _replica_check
+    if ReadSessionLocal is None:
+        return False
+
+    now = time.monotonic()
+    checked_at, usable = _replica_check
+    if now - checked_at < REPLICA_LAG_CHECK_INTERVAL:
+        return usable
+
+    lag = replica_lag_seconds()
+    usable = lag is not None and lag <= REPLICA_MAX_LAG_SECONDS
+    if lag is not None and not usable:
+        logger.warning(f"Read replica is {lag:.1f}s behind; reading from primary")
+    _replica_check = (now, usable)
+    return usable
+
+
+def get_read_db(primary: Session = Depends(get_db)) -> Generator:
+    """
+    Dependency for read-only endpoints.
+
+    Yields a replica session when DATABASE_READ_URL is configured and the
+    replica is within REPLICA_MAX_LAG_SECONDS of the primary, otherwise the
+    primary session.
+    """
+    if not replica_is_usable():
+        yield primary
+        return
+
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
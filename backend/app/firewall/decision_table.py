@@ -0,0 +1,78 @@
+"""
+Decision Table
+
+Default firewall decisions as a precomputed lookup table.
+
+Severities and decisions are small integer codes. A request's risks are
+reduced in a single pass to a summary of their highest severity and a
+bitmask of their risk types (the same bits as RequestLog.risk_types), and
+the decision for every possible summary is computed once at import time.
+"""
+
+from typing import Iterable, Tuple
+
+from app.models import RISK_TYPE_BITS
+
+# Severity codes; 0 is no risk, or only risks of unknown severity
+NO_SEVERITY, LOW, MEDIUM, HIGH = range(4)
+SEVERITY_CODES = {"low": LOW, "medium": MEDIUM, "high": HIGH}
+
+# Decision codes, ordered from least to most strict
+ALLOW, WARN, REDACT, BLOCK = range(4)
+DECISION_VALUES = ("allow", "warn", "redact", "block")
+DECISION_CODES = {value: code for code, value in enumerate(DECISION_VALUES)}
+
+INJECTION_BIT = RISK_TYPE_BITS["PROMPT_INJECTION"]
+TYPE_MASKS = 1 << len(RISK_TYPE_BITS)
+
+# A summary packs the type mask above the two severity bits
+_SEVERITY_BITS = 2
+_SEVERITY_MASK = (1 << _SEVERITY_BITS) - 1
+
+
+def summarize(*risk_lists: Iterable) -> int:
+    """Reduce one or more lists of risks to a summary in a single pass."""
+    severity = NO_SEVERITY
+    types = 0
+    severity_codes = SEVERITY_CODES
+    type_bits = RISK_TYPE_BITS
+    for risks in risk_lists:
+        for risk in risks:
+            code = severity_codes.get(risk.severity, NO_SEVERITY)
+            if code > severity:
+                severity = code
+            types |= type_bits.get(risk.risk_type, 0)
+    return types << _SEVERITY_BITS | severity
+
+
+def unpack(summary: int) -> Tuple[int, int]:
+    """Return the (type mask, severity code) of a summary."""
+    return summary >> _SEVERITY_BITS, summary & _SEVERITY_MASK
+
+
+def _default_decision(types: int, severity: int) -> int:
+    """
+    The default policy, applied once per summary to build the table.
+
+    Prompt injection and high severity block, medium severity redacts and
+    low severity warns. High-severity PII/PHI needs no rule of its own: it
+    is high severity, so it already blocks.
+    """
+    if types & INJECTION_BIT or severity == HIGH:
+        return BLOCK
+    if severity == MEDIUM:
+        return REDACT
+    if severity == LOW:
+        return WARN
+    return ALLOW
+
+
+DEFAULT_TABLE = tuple(
+    _default_decision(*unpack(summary))
+    for summary in range(TYPE_MASKS << _SEVERITY_BITS)
+)
+
+
+def decide(summary: int) -> int:
+    """Return the default decision code for a risk summary."""
+    return DEFAULT_TABLE[summary]
@@ -0,0 +1,158 @@
+"""
+Encoded Payload Decoding
+
+A pipeline detector that looks inside base64, hex and URL-encoded blobs.
+Blobs are found in one regex pass, decoded, and the decoded text is scanned
+by the PII and injection detectors; what they find is reported at the
+blob's position, so redaction replaces the whole encoded blob. Decoded text
+is itself searched for blobs, down to FIREWALL_DECODE_MAX_DEPTH levels.
+
+Decoding is bounded so hostile input cannot make it expensive: at most
+FIREWALL_DECODE_MAX_BLOBS distinct blobs per text are scanned, only the
+first FIREWALL_DECODE_MAX_BLOB_LENGTH characters of each are decoded, and
+no blob is started once FIREWALL_DECODE_BUDGET_MS has passed. Candidates
+that are not readable text once decoded (paths, hashes, IDs, binary) are
+discarded without counting toward the limit, so padding a text with them
+cannot push a payload past it. Decoded blobs are cached, so a payload
+repeated across requests is decoded once.
+"""
+
+import base64
+import binascii
+import os
+import re
+import time
+from dataclasses import replace
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+
+from app.firewall import normalization
+from app.firewall.injection_detector import InjectionDetector
+from app.firewall.pii_detector import PIIDetector, RiskMatch
+
+# Levels of encoding looked through (base64 of base64 is 2)
+FIREWALL_DECODE_MAX_DEPTH = int(os.getenv("FIREWALL_DECODE_MAX_DEPTH", "2"))
+# Distinct blobs decoding to readable text scanned per text at each level
+FIREWALL_DECODE_MAX_BLOBS = int(os.getenv("FIREWALL_DECODE_MAX_BLOBS", "8"))
+# Characters of a blob decoded; longer blobs are decoded from their start
+FIREWALL_DECODE_MAX_BLOB_LENGTH = int(os.getenv("FIREWALL_DECODE_MAX_BLOB_LENGTH", "16384"))
+# Time after which no further blob of a text is decoded
+FIREWALL_DECODE_BUDGET_MS = float(os.getenv("FIREWALL_DECODE_BUDGET_MS", "5"))
+# Decoded blobs cached per process
+FIREWALL_DECODE_CACHE_SIZE = int(os.getenv("FIREWALL_DECODE_CACHE_SIZE", "4096"))
+
+# Shortest blobs worth decoding; shorter runs are mostly words and numbers
+MIN_ENCODED_LENGTH = 16
+# Share of printable characters decoded text needs to be scanned
+MIN_PRINTABLE_RATIO = 0.9
+
+HEX = "hex"
+BASE64 = "base64"
+URL = "url"
+
+# Hex is tried first: every hex string is also valid base64. Each kind only
+# starts at a boundary, so a long run that is not a blob is scanned once
+_BLOB = re.compile(
+    r"(?P<hex>\b(?:[0-9A-Fa-f]{2}){%d,}\b)"
+    r"|(?P<base64>(?<![A-Za-z0-9+/_-])[A-Za-z0-9+/_-]{%d,}={0,2})"
+    r"|(?P<url>(?<!\S)[^\s%%]*(?:%%[0-9A-Fa-f]{2}[^\s%%]*){2,})"
+    % (MIN_ENCODED_LENGTH // 2, MIN_ENCODED_LENGTH)
+)
+
+
+def _readable(data: bytes) -> Optional[str]:
+    """Return decoded bytes as text, or None if they are not readable text."""
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    if not text:
+        return None
+    printable = sum(1 for char in text if char.isprintable() or char in "\n\r\t")
+    return text if printable / len(text) >= MIN_PRINTABLE_RATIO else None
+
+
+@lru_cache(maxsize=FIREWALL_DECODE_CACHE_SIZE)
+def decode_blob(kind: str, blob: str) -> Optional[str]:
+    """Decode a blob of the given kind to text, or None if it is not encoded text."""
+    try:
+        if kind == URL:
+            decoded = unquote(blob, errors="strict")
+            return decoded if decoded != blob else None
+        if kind == HEX:
+            data = bytes.fromhex(blob[:len(blob) - len(blob) % 2])
+        else:
+            body = blob.rstrip("=")
+            body = body[:len(body) - len(body) % 4] if len(body) % 4 == 1 else body
+            body += "=" * (-len(body) % 4)
+            if "-" in body or "_" in body:
+                data = base64.urlsafe_b64decode(body)
+            else:
+                data = base64.b64decode(body, validate=True)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+    return _readable(data)
+
+
+def find_blobs(text: str) -> Iterator[Tuple[str, int, int]]:
+    """Yield (kind, start, end) of candidate encoded blobs, in one pass."""
+    for match in _BLOB.finditer(text):
+        yield match.lastgroup, match.start(), match.end()
+
+
+class DecodingDetector:
+    """Detects PII and injections hidden in encoded blobs."""
+
+    name = "decoding"
+
+    def __init__(self, detectors: Optional[list] = None):
+        """Initialize with the detectors run on decoded text."""
+        self.detectors = detectors if detectors is not None else [PIIDetector(), InjectionDetector()]
+
+    def detect(self, text: str) -> List[RiskMatch]:
+        """
+        Detect risks inside encoded blobs of the given text.
+
+        Args:
+            text: The text to analyze
+
+        Returns:
+            Risks found in decoded content, positioned at their blob
+        """
+        deadline = time.perf_counter() + FIREWALL_DECODE_BUDGET_MS / 1000
+        return self._detect(text, FIREWALL_DECODE_MAX_DEPTH, deadline)
+
+    def _detect(self, text: str, depth: int, deadline: float) -> List[RiskMatch]:
+        matches = []
+        # Risks inside each distinct readable blob scanned so far; repeats of a
+        # blob are reported at every position without counting again
+        scanned: Dict[Tuple[str, str], List[RiskMatch]] = {}
+        for kind, start, end in find_blobs(text):
+            if time.perf_counter() > deadline:
+                break
+            blob = text[start:min(end, start + FIREWALL_DECODE_MAX_BLOB_LENGTH)]
+            inner = scanned.get((kind, blob))
+            if inner is None:
+                if len(scanned) >= FIREWALL_DECODE_MAX_BLOBS:
+                    # Only repeats of a risky blob are left to report
+                    if not any(scanned.values()):
+                        break
+                    continue
+                decoded = decode_blob(kind, blob)
+                if decoded is None:
+                    continue
+                view = normalization.normalize(decoded).text
+                inner = [risk for detector in self.detectors for risk in detector.detect(view)]
+                if depth > 1:
+                    inner.extend(self._detect(view, depth - 1, deadline))
+                scanned[(kind, blob)] = inner
+            for risk in inner:
+                matches.append(replace(
+                    risk,
+                    match=text[start:end],
+                    start=start,
+                    end=end,
+                    explanation=f"{risk.explanation} in {kind}-encoded content"
+                ))
+        return matches
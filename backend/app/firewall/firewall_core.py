@@ -5,29 +5,36 @@ Main integration point for the Prompt Firewall.
 Combines PII detection, injection detection, and policy engine.
 """
 
+import os
 import uuid
 from datetime import datetime
 from typing import Optional, Dict, Any, List
-from app.firewall.pii_detector import PIIDetector
-from app.firewall.injection_detector import InjectionDetector
-from app.firewall.policy_engine import PolicyEngine, Decision
+from app.firewall import decision_table
+from app.firewall.pipeline import DetectorPipeline
+from app.firewall.policy_engine import PolicyEngine, Decision, describe_risks
 from app.models import PolicyRule
 
+# Least strict decision for a request whose detectors did not all finish:
+# "warn" or "block" raise it, "ignore" keeps the decision of the detectors that
+# did. Blocking by default keeps an overloaded or failing detector from letting
+# unscanned text through; failing open has to be chosen explicitly.
+FIREWALL_DEGRADED_ACTION = os.getenv("FIREWALL_DEGRADED_ACTION", "block")
+
 
 class FirewallCore:
     """Main firewall core that processes prompts and responses."""
     
-    def __init__(self):
+    def __init__(self, pipeline: Optional[DetectorPipeline] = None):
         """Initialize firewall core with detectors and policy engine."""
-        self.pii_detector = PIIDetector()
-        self.injection_detector = InjectionDetector()
+        self.pipeline = pipeline or DetectorPipeline.from_config()
         self.policy_engine = PolicyEngine()
     
     def process(
         self,
         prompt: Optional[str] = None,
         response: Optional[str] = None,
-        policy_rules: Optional[List[PolicyRule]] = None
+        policy_rules: Optional[List[PolicyRule]] = None,
+        explain: bool = True
     ) -> Dict[str, Any]:
         """
         Process prompt and/or response through the firewall.
@@ -36,25 +43,20 @@ class FirewallCore:
             prompt: The user's prompt (optional)
             response: The model's response (optional)
             policy_rules: Optional custom policy rules
+            explain: Build the human-readable explanation; when False it is
+                None, and can still be built later from the risks with
+                explain_risks()
             
         Returns:
-            Dictionary with decision, modified text, risks, and metadata
+            Dictionary with decision, modified text, risks, and metadata;
+            metadata lists any detectors that degraded (overran their budget
+            or failed) under "degraded"
         """
         request_id = str(uuid.uuid4())
         timestamp = datetime.utcnow().isoformat() + "Z"
         
-        prompt_risks = []
-        response_risks = []
-        
-        if prompt:
-            prompt_pii_risks = self.pii_detector.detect(prompt)
-            prompt_injection_risks = self.injection_detector.detect(prompt)
-            prompt_risks = prompt_pii_risks + prompt_injection_risks
-        
-        if response:
-            response_pii_risks = self.pii_detector.detect(response)
-            response_injection_risks = self.injection_detector.detect(response)
-            response_risks = response_pii_risks + response_injection_risks
+        detected = self.pipeline.run([prompt, response])
+        prompt_risks, response_risks = detected.risks
         
         all_risks = prompt_risks + response_risks
         
@@ -63,6 +65,8 @@ class FirewallCore:
             response_risks,
             policy_rules
         )
+        if detected.degraded:
+            decision = self._degraded_decision(decision)
         
         prompt_modified = prompt
         response_modified = response
@@ -82,6 +86,7 @@ class FirewallCore:
             {
                 "type": risk.risk_type,
                 "severity": risk.severity,
+                "pattern_name": risk.pattern_name,
                 "match": risk.match,
                 "position": {"start": risk.start, "end": risk.end},
                 "explanation": risk.explanation
@@ -89,7 +94,7 @@ class FirewallCore:
             for risk in all_risks
         ]
         
-        explanation = self.policy_engine.generate_explanation(all_risks)
+        explanation = self.policy_engine.generate_explanation(all_risks) if explain else None
         
         result = {
             "decision": decision.value,
@@ -102,6 +107,26 @@ class FirewallCore:
                 "requestId": request_id
             }
         }
+        if detected.degraded:
+            result["metadata"]["degraded"] = [
+                {"detector": d.detector, "reason": d.reason, "elapsed_ms": d.elapsed_ms}
+                for d in detected.degraded
+            ]
         
         return result
-
+    
+    @staticmethod
+    def _degraded_decision(decision: Decision) -> Decision:
+        """Raise a decision to FIREWALL_DEGRADED_ACTION when detectors were skipped."""
+        floor = decision_table.DECISION_CODES.get(FIREWALL_DEGRADED_ACTION)
+        if floor is None or decision_table.DECISION_CODES[decision.value] >= floor:
+            return decision
+        return Decision(FIREWALL_DEGRADED_ACTION)
+    
+    @staticmethod
+    def explain_risks(risks: List[Dict[str, Any]]) -> str:
+        """Build the explanation of a result, or of logged risks, from its risk list."""
+        return describe_risks(
+            (risk.get("type"), risk.get("pattern_name") or "", risk.get("explanation") or "")
+            for risk in risks
+        )
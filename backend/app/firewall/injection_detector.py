@@ -33,6 +33,8 @@ class RiskMatch:
 class InjectionDetector:
     """Detects prompt injection and jailbreak attempts."""
     
+    name = "injection"
+    
     def __init__(self):
         """Initialize injection detector with pattern definitions."""
         self.patterns = [
@@ -0,0 +1,238 @@
+"""
+Text Normalization
+
+Builds the view of a text that detectors scan, so homoglyphs, zero-width
+characters and full-width or stylized letters cannot hide a pattern:
+
+- NFKC compatibility folding (full-width, math alphanumerics, ligatures)
+- removal of invisible format characters (zero-width spaces and joiners,
+  soft hyphens, bidi controls)
+- folding of common Cyrillic and Greek look-alikes to Latin letters
+
+The view can map any of its characters to the span of the original text it
+came from, so risks found in the view are reported at original positions
+and redaction still applies to the text the user sent. ASCII text is
+already in normal form and is returned as is, which keeps the common case
+to a single isascii() check. Only folds that change the length of the text
+are recorded; the positions of everything else follow from them, so most
+texts are normalized without building a per-character offset map.
+"""
+
+import re
+import unicodedata
+from bisect import bisect_right
+from dataclasses import dataclass, field, replace
+from functools import cached_property, lru_cache
+from itertools import chain
+from typing import List, Optional, Tuple, TypeVar
+
+Risk = TypeVar("Risk")
+
+# Cyrillic and Greek letters rendered like Latin ones, after NFKC
+CONFUSABLES = {
+    # Cyrillic
+    "а": "a", "в": "b", "е": "e", "к": "k", "м": "m", "н": "h", "о": "o", "р": "p",
+    "с": "c", "т": "t", "у": "y", "х": "x", "ѕ": "s", "і": "i", "ј": "j", "ԁ": "d",
+    "һ": "h", "ӏ": "l", "ԛ": "q", "ԝ": "w", "ү": "y", "ɡ": "g",
+    "А": "A", "В": "B", "Е": "E", "К": "K", "М": "M", "Н": "H", "О": "O", "Р": "P",
+    "С": "C", "Т": "T", "У": "Y", "Х": "X", "Ѕ": "S", "І": "I", "Ј": "J", "Ԁ": "D",
+    "Һ": "H", "Ӏ": "l", "Ԛ": "Q", "Ԝ": "W", "Ү": "Y",
+    # Greek
+    "α": "a", "ε": "e", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p", "τ": "t",
+    "υ": "u", "χ": "x",
+    "Α": "A", "Β": "B", "Ε": "E", "Ζ": "Z", "Η": "H", "Ι": "I", "Κ": "K", "Μ": "M",
+    "Ν": "N", "Ο": "O", "Ρ": "P", "Τ": "T", "Υ": "Y", "Χ": "X",
+}
+
+
+# A span folded to a different length: (view start, view end, original start, original end)
+Fold = Tuple[int, int, int, int]
+
+
+@dataclass
+class NormalizedText:
+    """A normalized view of a text, with the original span of each character."""
+    text: str
+    original: str
+    # Folds that changed the length of the text, in order; any other character
+    # of `text` is a single original character, offset as after the last fold
+    folds: List[Fold] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return self.text != self.original
+
+    @cached_property
+    def _fold_starts(self) -> List[int]:
+        return [fold[0] for fold in self.folds]
+
+    def _original_position(self, index: int, end: bool) -> int:
+        """Original start (or end) of the character at `index` of the view."""
+        i = bisect_right(self._fold_starts, index) - 1
+        if i < 0:
+            return index + end
+        view_start, view_end, original_start, original_end = self.folds[i]
+        if index < view_end:
+            return original_end if end else original_start
+        return index - view_end + original_end + end
+
+    @cached_property
+    def starts(self) -> Optional[List[int]]:
+        """Original start of each character of `text`; None when each is at its original position."""
+        if not self.folds:
+            return None
+        return [self._original_position(i, False) for i in range(len(self.text))]
+
+    @cached_property
+    def ends(self) -> Optional[List[int]]:
+        """Original end of each character of `text`; None when each is at its original position."""
+        if not self.folds:
+            return None
+        return [self._original_position(i, True) for i in range(len(self.text))]
+
+    def original_span(self, start: int, end: int) -> Tuple[int, int]:
+        """Map a span of the normalized text to the original text."""
+        if not self.folds:
+            return start, end
+        if end <= start:
+            position = (
+                self._original_position(start, False) if start < len(self.text) else len(self.original)
+            )
+            return position, position
+        return self._original_position(start, False), self._original_position(end - 1, True)
+
+    def restore(self, risk: Risk) -> Risk:
+        """Return a risk found in the normalized text at its original position."""
+        if not self.changed:
+            return risk
+        start, end = self.original_span(risk.start, risk.end)
+        return replace(risk, start=start, end=end, match=self.original[start:end])
+
+
+def _char_class(codes) -> str:
+    """A regex character class matching the given code points, as ranges."""
+    ranges = []
+    for code in codes:
+        if ranges and ranges[-1][1] == code - 1:
+            ranges[-1][1] = code
+        else:
+            ranges.append([code, code])
+    return "[" + "".join(
+        re.escape(chr(low)) if low == high else f"{re.escape(chr(low))}-{re.escape(chr(high))}"
+        for low, high in ranges
+    ) + "]"
+
+
+def _needs_folding(char: str) -> bool:
+    return (
+        unicodedata.category(char) == "Cf"
+        or unicodedata.combining(char) != 0
+        or unicodedata.normalize("NFKC", char) != char
+    )
+
+
+# Blocks outside the BMP holding invisible or compatibility characters
+_SUPPLEMENTARY_BLOCKS = (
+    range(0x110BD, 0x110CE),    # Kaithi number signs
+    range(0x13430, 0x13440),    # Egyptian hieroglyph format controls
+    range(0x1BCA0, 0x1BCA4),    # shorthand format controls
+    range(0x1D173, 0x1D17B),    # musical symbol format controls
+    range(0x1D400, 0x1D800),    # mathematical alphanumerics
+    range(0x1F100, 0x1F300),    # enclosed alphanumerics
+    range(0x2F800, 0x2FA20),    # CJK compatibility ideographs
+    range(0xE0000, 0xE1000),    # tags and variation selectors
+)
+# Characters NFKC changes, combining marks and invisible format characters;
+# text between them is already in normal form and is copied in bulk. The
+# BMP-only class compiles to a bitmap; supplementary ranges would make every
+# character a linear range scan, so they are only searched for in texts that
+# have supplementary characters at all
+_SPECIAL_BMP = [code for code in range(0x80, 0x10000) if _needs_folding(chr(code))]
+_SPECIAL = re.compile(_char_class(_SPECIAL_BMP) + "+")
+_SPECIAL_WIDE = re.compile(_char_class(chain(_SPECIAL_BMP, (
+    code for code in chain(*_SUPPLEMENTARY_BLOCKS) if _needs_folding(chr(code))
+))) + "+")
+_SUPPLEMENTARY = re.compile("[\U00010000-\U0010FFFF]")
+# Indexed by code point rather than a dict, which str.translate looks up
+# several times faster; characters past its end are left as they are
+_CONFUSABLE_TABLE = list(range(max(map(ord, CONFUSABLES)) + 1))
+for _char, _latin in CONFUSABLES.items():
+    _CONFUSABLE_TABLE[ord(_char)] = ord(_latin)
+_CONFUSABLE_SET = frozenset(CONFUSABLES)
+# Runs up to this long are folded through a cache; obfuscated words repeat
+_CACHED_RUN_LENGTH = 64
+
+
+@lru_cache(maxsize=65536)
+def _fold(cluster: str) -> str:
+    """Normalize one character with its combining marks; invisible ones vanish."""
+    if len(cluster) == 1 and unicodedata.category(cluster) == "Cf":
+        return ""
+    return unicodedata.normalize("NFKC", cluster).translate(_CONFUSABLE_TABLE)
+
+
+def _fold_run(run: str) -> Tuple[str, Tuple[Fold, ...]]:
+    """Fold a run of special characters; return it with its length-changing folds."""
+    pieces = []
+    folds = []
+    length = 0
+    i = 0
+    while i < len(run):
+        j = i + 1
+        while j < len(run) and unicodedata.combining(run[j]):
+            j += 1
+        folded = _fold(run[i:j])
+        if len(folded) != 1 or j - i != 1:
+            folds.append((length, length + len(folded), i, j))
+        pieces.append(folded)
+        length += len(folded)
+        i = j
+    return "".join(pieces), tuple(folds)
+
+
+_fold_short_run = lru_cache(maxsize=16384)(_fold_run)
+
+
+def normalize(text: str) -> NormalizedText:
+    """Build the normalized view of a text."""
+    if text.isascii():
+        return NormalizedText(text, text)
+
+    has_confusables = not _CONFUSABLE_SET.isdisjoint(text)
+    special = _SPECIAL_WIDE if _SUPPLEMENTARY.search(text) else _SPECIAL
+    runs = list(special.finditer(text))
+    if not runs:
+        # Already in normal form: confusable folding keeps every position
+        if has_confusables:
+            return NormalizedText(text.translate(_CONFUSABLE_TABLE), text)
+        return NormalizedText(text, text)
+
+    pieces: List[str] = []
+    folds: List[Fold] = []
+    position = 0
+    length = 0
+    for run in runs:
+        run_start, run_end = run.span()
+        # A combining mark is folded with the character before it (e + U+0301 -> é)
+        if run_start > position and unicodedata.combining(text[run_start]):
+            run_start -= 1
+        pieces.append(text[position:run_start])
+        length += run_start - position
+        segment = text[run_start:run_end]
+        fold_run = _fold_short_run if len(segment) <= _CACHED_RUN_LENGTH else _fold_run
+        folded, run_folds = fold_run(segment)
+        pieces.append(folded)
+        if run_folds:
+            folds.extend(
+                (length + view_start, length + view_end, run_start + start, run_start + end)
+                for view_start, view_end, start, end in run_folds
+            )
+        length += len(folded)
+        position = run_end
+    pieces.append(text[position:])
+
+    view = "".join(pieces)
+    # Folded runs are already free of confusables; the fold keeps every position
+    if has_confusables:
+        view = view.translate(_CONFUSABLE_TABLE)
+    return NormalizedText(view, text, folds)
@@ -2,13 +2,15 @@
 PII/PHI Detection Module
 
 Detects personally identifiable information and protected health information
-in text using pattern matching.
+in text using pattern matching. Card number and SSN matches are validated
+(see app.firewall.validators) so look-alike digit sequences are not flagged.
 """
 
 import re
 from dataclasses import dataclass
 from typing import List, Optional
 from enum import Enum
+from app.firewall.validators import validate_cards, validate_ssns
 
 
 class RiskType(str, Enum):
@@ -39,6 +41,8 @@ class RiskMatch:
 class PIIDetector:
     """Detects PII/PHI in text using pattern matching."""
     
+    name = "pii"
+    
     def __init__(self):
         """Initialize PII detector with pattern definitions."""
         self.patterns = [
@@ -54,7 +58,8 @@ class PIIDetector:
                 "risk_type": RiskType.PII,
                 "pattern": r"\b\d{3}-\d{2}-\d{4}\b",
                 "severity": Severity.HIGH,
-                "explanation": "Social Security Number detected"
+                "explanation": "Social Security Number detected",
+                "validator": validate_ssns
             },
             {
                 "name": "phone",
@@ -68,7 +73,8 @@ class PIIDetector:
                 "risk_type": RiskType.PII,
                 "pattern": r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b",
                 "severity": Severity.HIGH,
-                "explanation": "Credit card number detected"
+                "explanation": "Credit card number detected",
+                "validator": validate_cards
             },
             {
                 "name": "medical_record_number",
@@ -93,8 +99,15 @@ class PIIDetector:
         
         for pattern_def in self.patterns:
             regex = re.compile(pattern_def["pattern"], re.IGNORECASE)
+            found = list(regex.finditer(text))
+            
+            # Drop candidates failing checksum/structure checks, in one batch
+            validator = pattern_def.get("validator")
+            if validator and found:
+                valid = validator([match.group() for match in found])
+                found = [match for match, ok in zip(found, valid) if ok]
             
-            for match in regex.finditer(text):
+            for match in found:
                 risk_match = RiskMatch(
                     risk_type=pattern_def["risk_type"].value,
                     pattern_name=pattern_def["name"],
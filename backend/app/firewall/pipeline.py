@@ -0,0 +1,256 @@
+"""
+Detector Pipeline
+
+Runs an ordered list of detectors over the texts of a request. Any object
+with a `name` and a `detect(text) -> List[RiskMatch]` method is a detector;
+deployments register, order and disable them with FIREWALL_DETECTORS, e.g.
+
+    FIREWALL_DETECTORS=pii,injection,decoding,acme.detectors:SecretsDetector=20
+
+or with DetectorPipeline.register() / disable() in code.
+
+A detector given a budget runs on worker threads and is waited on for at
+most that many milliseconds per request. One that overruns, or raises, is
+reported as degraded and its findings are dropped, so a slow plugin cannot
+hold a request past the latency SLO. Python threads cannot be interrupted,
+so an overrunning call keeps its worker until it returns; while all of a
+detector's workers are busy it is skipped as degraded straight away rather
+than queued. Detectors without a budget (the built-in regex detectors,
+unless configured otherwise) run inline.
+
+Each text is normalized once per request and every detector scans the
+normalized view; risks are mapped back to positions in the original text.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from importlib import import_module
+from typing import Dict, List, Optional, Protocol, Sequence, Tuple
+
+from app.firewall import normalization
+from app.firewall.decoding import DecodingDetector
+from app.firewall.injection_detector import InjectionDetector
+from app.firewall.pii_detector import PIIDetector, RiskMatch
+
+logger = logging.getLogger(__name__)
+
+# Ordered detectors: built-in names or module:Class paths, each optionally "=budget_ms"
+FIREWALL_DETECTORS = os.getenv("FIREWALL_DETECTORS", "pii,injection,decoding")
+# Budget of plugin detectors listed without one
+FIREWALL_DETECTOR_BUDGET_MS = float(os.getenv("FIREWALL_DETECTOR_BUDGET_MS", "50"))
+# Worker threads per budgeted detector
+FIREWALL_DETECTOR_WORKERS = int(os.getenv("FIREWALL_DETECTOR_WORKERS", "4"))
+# Scan the Unicode-normalized view of texts (see app.firewall.normalization)
+FIREWALL_NORMALIZE = os.getenv("FIREWALL_NORMALIZE", "true").lower() == "true"
+
+BUILTIN_DETECTORS = {
+    "pii": PIIDetector,
+    "injection": InjectionDetector,
+    "decoding": DecodingDetector,
+}
+
+# Reasons a detector's findings are missing from a result
+TIMEOUT = "timeout"
+SATURATED = "saturated"
+ERROR = "error"
+
+
+class Detector(Protocol):
+    """Interface of a pipeline detector."""
+    name: str
+
+    def detect(self, text: str) -> List[RiskMatch]:
+        ...
+
+
+@dataclass
+class Degraded:
+    """A detector that did not contribute to a result, and why."""
+    detector: str
+    reason: str
+    elapsed_ms: float
+
+
+@dataclass
+class PipelineResult:
+    """Risks found in each text of a request, in pipeline order."""
+    risks: List[List[RiskMatch]]
+    degraded: List[Degraded]
+    timings_ms: Dict[str, float]
+
+
+class DetectorStage:
+    """A detector with its budget and enabled state."""
+
+    def __init__(
+        self,
+        detector: Detector,
+        budget_ms: Optional[float] = None,
+        enabled: bool = True,
+        workers: Optional[int] = None,
+    ):
+        self.detector = detector
+        self.name = getattr(detector, "name", type(detector).__name__)
+        self.budget_ms = budget_ms
+        self.enabled = enabled
+        self.workers = workers or FIREWALL_DETECTOR_WORKERS
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix=f"detector-{self.name}"
+                )
+            return self._executor
+
+    def _detect_all(self, texts: Sequence[Optional[str]]) -> List[List[RiskMatch]]:
+        return [self.detector.detect(text) if text else [] for text in texts]
+
+    def run(self, texts: Sequence[Optional[str]]) -> Tuple[Optional[List[List[RiskMatch]]], Optional[str]]:
+        """Return (risks per text, None), or (None, reason) if the stage degraded."""
+        if self.budget_ms is None:
+            try:
+                return self._detect_all(texts), None
+            except Exception:
+                logger.exception(f"Detector {self.name} failed")
+                return None, ERROR
+
+        if not self._slots.acquire(blocking=False):
+            return None, SATURATED
+        try:
+            future = self._pool().submit(self._detect_all, texts)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.budget_ms / 1000), None
+        except FutureTimeout:
+            return None, TIMEOUT
+        except Exception:
+            logger.exception(f"Detector {self.name} failed")
+            return None, ERROR
+
+    def shutdown(self) -> None:
+        """Stop the stage's worker threads once their current calls return."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+class DetectorPipeline:
+    """Ordered detector stages run over every text of a request."""
+
+    def __init__(self, stages: Optional[List[DetectorStage]] = None, normalize: Optional[bool] = None):
+        self.normalize = FIREWALL_NORMALIZE if normalize is None else normalize
+        self.stages: List[DetectorStage] = []
+        for stage in stages or []:
+            self._add(stage, None)
+
+    @classmethod
+    def from_config(cls, spec: Optional[str] = None) -> "DetectorPipeline":
+        """Build a pipeline from a FIREWALL_DETECTORS style specification."""
+        spec = FIREWALL_DETECTORS if spec is None else spec
+        pipeline = cls()
+        for entry in spec.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            path, _, budget = entry.partition("=")
+            path = path.strip()
+            if path in BUILTIN_DETECTORS:
+                detector = BUILTIN_DETECTORS[path]()
+                default_budget = None
+            elif ":" in path:
+                module_name, _, class_name = path.partition(":")
+                try:
+                    detector = getattr(import_module(module_name), class_name)()
+                except (ImportError, AttributeError) as e:
+                    raise ValueError(f"Cannot load detector {path}: {e}") from e
+                default_budget = FIREWALL_DETECTOR_BUDGET_MS
+            else:
+                raise ValueError(
+                    f"Unknown detector {path!r}; use one of {sorted(BUILTIN_DETECTORS)} or module:Class"
+                )
+            budget = budget.strip()
+            if budget.lower() == "none":
+                budget_ms = None
+            elif budget:
+                budget_ms = float(budget)
+            else:
+                budget_ms = default_budget
+            pipeline.register(detector, budget_ms=budget_ms)
+        return pipeline
+
+    def _add(self, stage: DetectorStage, position: Optional[int]) -> None:
+        if stage.name in self.names:
+            raise ValueError(f"Detector {stage.name!r} is already registered")
+        if position is None:
+            self.stages.append(stage)
+        else:
+            self.stages.insert(position, stage)
+
+    @property
+    def names(self) -> List[str]:
+        return [stage.name for stage in self.stages]
+
+    def register(
+        self,
+        detector: Detector,
+        budget_ms: Optional[float] = None,
+        position: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> DetectorStage:
+        """Add a detector, at the end or at the given position."""
+        stage = DetectorStage(detector, budget_ms=budget_ms, workers=workers)
+        self._add(stage, position)
+        return stage
+
+    def get(self, name: str) -> DetectorStage:
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(f"No detector named {name!r}")
+
+    def enable(self, name: str) -> None:
+        self.get(name).enabled = True
+
+    def disable(self, name: str) -> None:
+        self.get(name).enabled = False
+
+    def run(self, texts: Sequence[Optional[str]]) -> PipelineResult:
+        """Run every enabled detector over the texts, within their budgets."""
+        views = [normalization.normalize(text) if text and self.normalize else None for text in texts]
+        if any(view is not None and view.changed for view in views):
+            texts = [view.text if view is not None else text for view, text in zip(views, texts)]
+        risks: List[List[RiskMatch]] = [[] for _ in texts]
+        degraded: List[Degraded] = []
+        timings: Dict[str, float] = {}
+        for stage in self.stages:
+            if not stage.enabled:
+                continue
+            started = time.perf_counter()
+            found, reason = stage.run(texts)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+            timings[stage.name] = elapsed_ms
+            if reason is not None:
+                degraded.append(Degraded(stage.name, reason, elapsed_ms))
+                continue
+            for text_risks, stage_risks in zip(risks, found):
+                text_risks.extend(stage_risks)
+        for i, view in enumerate(views):
+            if view is not None and view.changed:
+                risks[i] = [view.restore(risk) for risk in risks[i]]
+        return PipelineResult(risks=risks, degraded=degraded, timings_ms=timings)
+
+    def shutdown(self) -> None:
+        for stage in self.stages:
+            stage.shutdown()
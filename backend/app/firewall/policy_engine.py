@@ -4,13 +4,22 @@ Policy Engine
 Applies policy rules to detected risks and determines actions (block, redact, warn, allow).
 """
 
+import re
 from enum import Enum
-from typing import List, Optional
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
 from app.firewall.pii_detector import RiskMatch as PIIRiskMatch
 from app.firewall.injection_detector import RiskMatch as InjectionRiskMatch
+from app.firewall import decision_table
 from app.models import PolicyRule, RiskType, Severity, Decision
 
 
+@lru_cache(maxsize=4096)
+def _compile_rule_pattern(pattern: str) -> "re.Pattern":
+    """Compile a rule regex once rather than on every risk it is checked against."""
+    return re.compile(pattern, re.IGNORECASE)
+
+
 class Decision(str, Enum):
     """Firewall decision actions."""
     BLOCK = "block"
@@ -19,6 +28,10 @@ class Decision(str, Enum):
     ALLOW = "allow"
 
 
+# Decision codes of app.firewall.decision_table as Decision values
+_DECISIONS_BY_CODE = tuple(Decision(value) for value in decision_table.DECISION_VALUES)
+
+
 class PolicyEngine:
     """Applies policy rules to determine firewall actions."""
     
@@ -35,6 +48,9 @@ class PolicyEngine:
         """
         Determine the action to take based on detected risks.
         
+        Without custom rules this is a lookup in the precomputed default
+        decision table (see app.firewall.decision_table).
+        
         Args:
             prompt_risks: Risks detected in the prompt
             response_risks: Risks detected in the response
@@ -43,32 +59,12 @@ class PolicyEngine:
         Returns:
             Decision enum value
         """
-        all_risks = prompt_risks + response_risks
-        
-        if not all_risks:
-            return Decision.ALLOW
-        
-        if policy_rules:
-            return self.apply_policy_rules(all_risks, policy_rules)
-        
-        highest_severity = self._get_highest_severity(all_risks)
-        
-        has_injection = any(r.risk_type == "PROMPT_INJECTION" for r in all_risks)
-        has_high_pii = any(
-            r.risk_type in ["PII", "PHI"] and r.severity == "high"
-            for r in all_risks
-        )
-        
-        if has_injection or highest_severity == "high":
-            return Decision.BLOCK
-        
-        if has_high_pii or highest_severity == "medium":
-            return Decision.REDACT
+        if policy_rules and (prompt_risks or response_risks):
+            return self.apply_policy_rules(prompt_risks + response_risks, policy_rules)
         
-        if highest_severity == "low":
-            return Decision.WARN
-        
-        return Decision.ALLOW
+        return _DECISIONS_BY_CODE[decision_table.decide(
+            decision_table.summarize(prompt_risks, response_risks)
+        )]
     
     def apply_policy_rules(
         self,
@@ -92,27 +88,45 @@ class PolicyEngine:
         if not enabled_rules:
             return self.determine_action(risks, [])
         
+        ordered_rules = self._order_rules(enabled_rules)
         decisions = []
         
         for risk in risks:
-            matching_rules = []
-            
-            for rule in enabled_rules:
-                if self._risk_matches_rule(risk, rule):
-                    matching_rules.append(rule)
-            
-            if matching_rules:
-                highest_priority_rule = max(
-                    matching_rules,
-                    key=lambda r: self._severity_priority(r.severity)
-                )
-                decisions.append(highest_priority_rule.action)
+            # The first matching rule in evaluation order is the highest priority one
+            matching_rule = next(
+                (rule for rule in ordered_rules if self._risk_matches_rule(risk, rule)),
+                None
+            )
+            if matching_rule is not None:
+                decisions.append(matching_rule.action)
         
         if not decisions:
             return self.determine_action(risks, [])
         
         return self._get_strictest_decision(decisions)
     
+    def _order_rules(self, rules: List[PolicyRule]) -> List[PolicyRule]:
+        """
+        Order rules for evaluation: highest severity first, then strictest
+        action, then cheapest pattern by the cost measured when the rule was
+        saved, so a risk stops at its first match and expensive regexes only
+        run when no cheaper rule of the same priority matched.
+        """
+        def cost(rule: PolicyRule) -> float:
+            if rule.pattern_type != "regex":
+                return 0.0
+            measured = (rule.pattern_cost or {}).get("us_per_kb")
+            return measured if measured is not None else float("inf")
+        
+        return sorted(
+            rules,
+            key=lambda r: (
+                -self._severity_priority(r.severity),
+                -self._get_decision_priority(r.action),
+                cost(r),
+            )
+        )
+    
     def _risk_matches_rule(
         self,
         risk: PIIRiskMatch | InjectionRiskMatch,
@@ -130,10 +144,8 @@ class PolicyEngine:
             return False
         
         if rule.pattern_type == "regex":
-            import re
             try:
-                pattern = re.compile(rule.pattern, re.IGNORECASE)
-                return bool(pattern.search(risk.match))
+                return bool(_compile_rule_pattern(rule.pattern).search(risk.match))
             except re.error:
                 return False
         elif rule.pattern_type == "keyword":
@@ -143,36 +155,15 @@ class PolicyEngine:
     
     def _severity_priority(self, severity: Severity) -> int:
         """Get priority value for severity (higher = more severe)."""
-        priorities = {
-            Severity.HIGH: 3,
-            Severity.MEDIUM: 2,
-            Severity.LOW: 1,
-        }
-        return priorities.get(severity, 0)
+        return decision_table.SEVERITY_CODES.get(severity, decision_table.NO_SEVERITY)
     
-    def _get_highest_severity(
-        self,
-        risks: List[PIIRiskMatch | InjectionRiskMatch]
-    ) -> str:
-        """Get the highest severity level from risks."""
-        if not risks:
-            return "low"
-        
-        severities = [r.severity for r in risks]
-        severity_priority = {"high": 3, "medium": 2, "low": 1}
-        
-        return max(severities, key=lambda s: severity_priority.get(s, 0))
+    def _get_decision_priority(self, decision: Decision) -> int:
+        """Get priority value for a decision (higher = stricter)."""
+        return decision_table.DECISION_CODES.get(decision, -1)
     
     def _get_strictest_decision(self, decisions: List[Decision]) -> Decision:
         """Get the strictest decision from a list."""
-        priority = {
-            Decision.BLOCK: 4,
-            Decision.REDACT: 3,
-            Decision.WARN: 2,
-            Decision.ALLOW: 1,
-        }
-        
-        return max(decisions, key=lambda d: priority.get(d, 0))
+        return max(decisions, key=self._get_decision_priority)
     
     def redact_text(
         self,
@@ -192,23 +183,27 @@ class PolicyEngine:
         if not risks:
             return text
         
-        redacted = text
-        offset = 0
-        
-        sorted_risks = sorted(risks, key=lambda r: r.start)
-        
-        for risk in sorted_risks:
-            start = risk.start + offset
-            end = risk.end + offset
-            
-            if start < 0 or end > len(redacted):
+        # Overlapping risks (several findings in one decoded blob, or a
+        # phone number inside a card number) are redacted as one span,
+        # named after the first
+        spans = []
+        for risk in sorted(risks, key=lambda r: r.start):
+            if risk.start < 0 or risk.end > len(text):
                 continue
-            
-            replacement = f"[{risk.pattern_name.upper()}_REDACTED]"
-            redacted = redacted[:start] + replacement + redacted[end:]
-            offset += len(replacement) - (end - start)
+            if spans and risk.start < spans[-1][1]:
+                spans[-1][1] = max(spans[-1][1], risk.end)
+            else:
+                spans.append([risk.start, risk.end, risk.pattern_name])
+        
+        pieces = []
+        position = 0
+        for start, end, pattern_name in spans:
+            pieces.append(text[position:start])
+            pieces.append(f"[{pattern_name.upper()}_REDACTED]")
+            position = end
+        pieces.append(text[position:])
         
-        return redacted
+        return "".join(pieces)
     
     def generate_explanation(
         self,
@@ -223,30 +218,40 @@ class PolicyEngine:
         Returns:
             Explanation string
         """
-        if not risks:
-            return "No security risks detected. Request allowed."
-        
-        explanations = []
-        
-        risk_types = {}
-        for risk in risks:
-            if risk.risk_type not in risk_types:
-                risk_types[risk.risk_type] = []
-            risk_types[risk.risk_type].append(risk)
-        
-        for risk_type, type_risks in risk_types.items():
-            count = len(type_risks)
-            if risk_type == "PROMPT_INJECTION":
-                explanations.append(
-                    f"Detected {count} prompt injection attempt(s): "
-                    f"{', '.join(r.explanation for r in type_risks[:3])}"
-                )
-            elif risk_type in ["PII", "PHI"]:
-                pii_types = set(r.pattern_name for r in type_risks)
-                explanations.append(
-                    f"Detected {count} {risk_type} item(s): "
-                    f"{', '.join(pii_types)}"
-                )
-        
-        return "; ".join(explanations)
+        return describe_risks(
+            (risk.risk_type, risk.pattern_name, risk.explanation) for risk in risks
+        )
+
+
+def describe_risks(risks: Iterable[Tuple[str, str, str]]) -> str:
+    """
+    Explain a decision from (risk type, pattern name, explanation) triples.
+    
+    Shared by live requests and logged risks, whose explanation is built
+    from the stored risk list when a log is viewed rather than when it is
+    written.
+    """
+    risk_types = {}
+    for risk_type, pattern_name, explanation in risks:
+        risk_types.setdefault(risk_type, []).append((pattern_name, explanation))
+    
+    if not risk_types:
+        return "No security risks detected. Request allowed."
+    
+    explanations = []
+    for risk_type, type_risks in risk_types.items():
+        count = len(type_risks)
+        if risk_type == "PROMPT_INJECTION":
+            explanations.append(
+                f"Detected {count} prompt injection attempt(s): "
+                f"{', '.join(explanation for _, explanation in type_risks[:3])}"
+            )
+        elif risk_type in ["PII", "PHI"]:
+            pii_types = set(pattern_name for pattern_name, _ in type_risks)
+            explanations.append(
+                f"Detected {count} {risk_type} item(s): "
+                f"{', '.join(pii_types)}"
+            )
+    
+    return "; ".join(explanations)
 
@@ -0,0 +1,78 @@
+"""
+Checksum and structure validators for PII candidates.
+
+Regexes for card numbers and SSNs match any digit sequence of the right
+shape, so order numbers and reference codes would be redacted and logged
+as PII. PIIDetector passes all of a pattern's matches in a text to its
+validator in one call, and drops the candidates it rejects before any risk
+objects are built.
+
+Validators take a sequence of matched strings and return one bool per
+candidate.
+"""
+
+import re
+from typing import List, Sequence
+
+_NON_DIGITS = re.compile(r"\D")
+
+# Luhn doubles every second digit from the right; digits of the product are summed
+_LUHN_DOUBLED = {str(digit): sum(divmod(digit * 2, 10)) for digit in range(10)}
+
+# Issuer (IIN) prefix ranges of 16-digit card numbers, as (prefix length, low, high)
+CARD_IIN_RANGES = (
+    (1, 4, 4),          # Visa
+    (2, 51, 55),        # Mastercard
+    (4, 2221, 2720),    # Mastercard 2-series
+    (4, 6011, 6011),    # Discover
+    (3, 644, 649),      # Discover
+    (2, 65, 65),        # Discover
+    (4, 3528, 3589),    # JCB
+    (2, 62, 62),        # UnionPay
+)
+# The same ranges on the first four digits
+_IIN_RANGES_4 = tuple(
+    (low * 10 ** (4 - length), (high + 1) * 10 ** (4 - length) - 1)
+    for length, low, high in CARD_IIN_RANGES
+)
+
+
+def luhn_valid(digits: str) -> bool:
+    """Return whether a digit string passes the Luhn checksum."""
+    total = sum(map(int, digits[-1::-2])) + sum(map(_LUHN_DOUBLED.__getitem__, digits[-2::-2]))
+    return total % 10 == 0
+
+
+def known_iin(digits: str) -> bool:
+    """Return whether a card number starts with a known issuer prefix."""
+    prefix = int(digits[:4])
+    for low, high in _IIN_RANGES_4:
+        if low <= prefix <= high:
+            return True
+    return False
+
+
+def validate_cards(candidates: Sequence[str]) -> List[bool]:
+    """Card numbers need a known issuer prefix and a valid Luhn check digit."""
+    results = []
+    for candidate in candidates:
+        digits = candidate.replace("-", "").replace(" ", "")
+        if not digits.isdigit():
+            digits = _NON_DIGITS.sub("", candidate)
+        results.append(known_iin(digits) and luhn_valid(digits))
+    return results
+
+
+def validate_ssns(candidates: Sequence[str]) -> List[bool]:
+    """
+    SSNs follow the SSA's structural rules: area 000, 666 and 900-999 are
+    never issued, nor are group 00 or serial 0000.
+    """
+    results = []
+    for candidate in candidates:
+        area, group, serial = candidate.split("-")
+        results.append(
+            area != "000" and area != "666" and area[0] != "9"
+            and group != "00" and serial != "0000"
+        )
+    return results
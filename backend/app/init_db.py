@@ -12,6 +12,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.database import SessionLocal, engine, Base
 from app.models import AdminUser, PolicyRule, RiskType, Severity, Decision
+from app.policy_rules import bump_version
 from app.auth import get_password_hash
 from dotenv import load_dotenv
 
@@ -121,15 +122,23 @@ def init_db():
             },
         ]
 
+        created_rules = []
         for rule_data in default_rules:
             existing_rule = db.query(PolicyRule).filter_by(name=rule_data["name"]).first()
             if not existing_rule:
                 rule = PolicyRule(**rule_data)
                 db.add(rule)
+                created_rules.append(rule)
                 print(f"Created policy rule: {rule_data['name']}")
             else:
                 print(f"Policy rule {rule_data['name']} already exists")
 
+        # Seeded rules are a policy change like any other, so pollers pick them up
+        if created_rules:
+            version = bump_version(db)
+            for rule in created_rules:
+                rule.version = version
+
         db.commit()
         print("Database initialization complete!")
 
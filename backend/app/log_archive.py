@@ -0,0 +1,229 @@
+"""
+Cold storage archival of logged prompt and response text.
+
+Text bodies of logs older than LOG_ARCHIVE_AFTER_DAYS are moved out of
+request_logs into zstd-compressed blobs, one per batch of logs, on a local
+filesystem path or an S3-compatible bucket. Each archived row keeps a
+reference to its blob and a SHA-256 of its bodies; the log detail endpoint
+rehydrates them transparently. Blobs are written before the rows that
+reference them are committed and are keyed by their content, so a batch
+that fails to commit is rewritten to the same key on the next run. Shared
+prompts (app.prompt_blobs) are archived with the rest of the text, and
+blobs no log references any more are deleted afterwards. Archived logs
+leave the full-text index (app.log_search) and are no longer searchable. Run it
+periodically, e.g. alongside partition maintenance:
+
+    python -m app.log_archive
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.engine import Engine
+from dotenv import load_dotenv
+
+from app.log_bodies import BODY_FIELDS, compress, decoded, decompress
+from app.log_partitions import row_update
+from app.log_search import unindex_logs
+from app.models import RequestLog
+from app.prompt_blobs import prune_prompt_blobs
+
+load_dotenv()
+
+# Days before a log's text is archived; 0 disables archival
+ARCHIVE_AFTER_DAYS = int(os.getenv("LOG_ARCHIVE_AFTER_DAYS", "0"))
+# Absolute filesystem directory, or s3://bucket/prefix for S3-compatible object storage
+ARCHIVE_URL = os.getenv("LOG_ARCHIVE_URL")
+# Custom endpoint for S3-compatible stores such as MinIO
+ARCHIVE_S3_ENDPOINT = os.getenv("LOG_ARCHIVE_S3_ENDPOINT")
+# Logs per archive blob
+ARCHIVE_BATCH_SIZE = int(os.getenv("LOG_ARCHIVE_BATCH_SIZE", "1000"))
+
+
+class ArchiveError(Exception):
+    """An archived log body is missing or does not match its stored hash."""
+
+
+class LocalArchiveStore:
+    """Archive blobs stored as files under a root directory."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename so readers never see a partial blob
+        partial = path.with_name(path.name + ".partial")
+        partial.write_bytes(data)
+        os.replace(partial, path)
+
+    def get(self, key: str) -> bytes:
+        try:
+            return (self.root / key).read_bytes()
+        except FileNotFoundError:
+            raise ArchiveError(f"Archive blob {key} not found")
+
+
+class S3ArchiveStore:
+    """Archive blobs stored in an S3-compatible bucket."""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("S3 log archives require boto3 (pip install boto3)")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self._client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key: str, data: bytes) -> None:
+        self._client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    def get(self, key: str) -> bytes:
+        try:
+            response = self._client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except self._client.exceptions.NoSuchKey:
+            raise ArchiveError(f"Archive blob {key} not found")
+        return response["Body"].read()
+
+
+@lru_cache(maxsize=None)
+def get_store(url: Optional[str] = None):
+    """Return the archive store for an absolute directory path or s3:// URL."""
+    url = url or ARCHIVE_URL
+    if not url:
+        raise ArchiveError("LOG_ARCHIVE_URL is not set")
+    if url.startswith("s3://"):
+        bucket, _, prefix = url[len("s3://"):].partition("/")
+        return S3ArchiveStore(bucket, prefix, ARCHIVE_S3_ENDPOINT)
+    if url.startswith("file://"):
+        url = url[len("file://"):]
+    # A relative path would resolve differently for the archiver and the API
+    if not Path(url).is_absolute():
+        raise ArchiveError(f"LOG_ARCHIVE_URL must be an absolute path or s3:// URL, not {url!r}")
+    return LocalArchiveStore(url)
+
+
+def bodies_hash(bodies: Dict[str, Any]) -> str:
+    """Return the SHA-256 of a log's text bodies in canonical JSON form."""
+    canonical = json.dumps(bodies, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def blob_key(first: Any, last: Any, blob: bytes) -> str:
+    """Return the blob key for a batch spanning the given (timestamp, id) rows."""
+    digest = hashlib.sha256(blob).hexdigest()[:16]
+    return f"request_logs/{first.timestamp:%Y/%m/%d}/{first.id}-{last.id}-{digest}.json.zst"
+
+
+def archive_logs(engine: Engine, store, older_than: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move text bodies of logs older than `older_than` to the store; return logs archived."""
+    table = RequestLog.__table__
+    statement, by_partition = row_update(engine.dialect.name)
+    statement = statement.where(table.c.archive_ref.is_(None))
+    position = None
+    archived = 0
+
+    while True:
+        query = (
+            select(
+                table.c.id,
+                table.c.timestamp,
+                table.c.bodies,
+                table.c.prompt_hash,
+                RequestLog.prompt_body.label("prompt_body"),
+                *[table.c[name] for name in BODY_FIELDS],
+            )
+            .where(table.c.timestamp < older_than, table.c.archive_ref.is_(None))
+            .order_by(table.c.timestamp, table.c.id)
+            .limit(batch_size)
+        )
+        if position:
+            query = query.where(tuple_(table.c.timestamp, table.c.id) > tuple_(*position))
+
+        with engine.connect() as conn:
+            rows = conn.execute(query).all()
+        if not rows:
+            break
+
+        bodies = {
+            str(row.id): {name: getattr(decoded(row), name) for name in BODY_FIELDS}
+            for row in rows
+        }
+        blob = compress(json.dumps(bodies).encode())
+        key = blob_key(rows[0], rows[-1], blob)
+        # Store the blob outside the transaction and before clearing the rows,
+        # so a failure never loses text and no transaction waits on the store
+        store.put(key, blob)
+
+        params = []
+        for row in rows:
+            values = {
+                "b_id": row.id,
+                "original_prompt": "",
+                "modified_prompt": None,
+                "original_response": None,
+                "modified_response": None,
+                "bodies": None,
+                "prompt_hash": None,
+                "search_vector": None,
+                "archive_ref": key,
+                "archive_sha256": bodies_hash(bodies[str(row.id)]),
+            }
+            if by_partition:
+                values["b_timestamp"] = row.timestamp
+            params.append(values)
+        with engine.begin() as conn:
+            conn.execute(statement, params)
+            unindex_logs(conn, [row.id for row in rows])
+
+        position = (rows[-1].timestamp, rows[-1].id)
+        archived += len(rows)
+
+    if archived:
+        with engine.begin() as conn:
+            prune_prompt_blobs(conn)
+    return archived
+
+
+def load_bodies(store, log: Any) -> Dict[str, Any]:
+    """Return the archived text bodies of a log, verified against its hash."""
+    try:
+        batch = json.loads(decompress(store.get(log.archive_ref)))
+        bodies = batch[str(log.id)]
+    except (KeyError, ValueError, OSError):
+        raise ArchiveError(f"Archived bodies of log {log.id} are unreadable")
+    if bodies_hash(bodies) != log.archive_sha256:
+        raise ArchiveError(f"Archived bodies of log {log.id} do not match their hash")
+    return bodies
+
+
+def main():
+    """Archive old log text in DATABASE_URL."""
+    from app.database import engine
+
+    if ARCHIVE_AFTER_DAYS <= 0:
+        print("LOG_ARCHIVE_AFTER_DAYS is not set; nothing to do")
+        return
+    try:
+        store = get_store()
+    except ArchiveError as e:
+        raise SystemExit(str(e))
+
+    older_than = datetime.utcnow() - timedelta(days=ARCHIVE_AFTER_DAYS)
+    archived = archive_logs(engine, store, older_than)
+    print(f"Log archival complete! {archived} logs archived to {ARCHIVE_URL}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Compact storage of logged prompt and response bodies.
+
+With LOG_BODY_STORAGE=compressed, a log's text is kept in a single
+zstd-compressed `bodies` blob instead of the four Text columns. Original
+texts are stored whole; modified texts, which differ from the original only
+where the firewall redacted or blocked something, are stored as a list of
+(start, end, replacement) spans against the original. An original prompt
+deduplicated into prompt_blobs (see app.prompt_blobs) is left out of the
+blob. Readers call decoded() to get a log whose text attributes are
+reconstructed either way.
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+
+# "text" stores bodies in plain Text columns, "compressed" in the bodies blob
+BODY_STORAGE = os.getenv("LOG_BODY_STORAGE", "text")
+
+BODY_FIELDS = ("original_prompt", "modified_prompt", "original_response", "modified_response")
+
+# Characters of unchanged text needed to resynchronize after a redaction
+DIFF_ANCHOR = 8
+
+
+def compress(data: bytes) -> bytes:
+    """Compress bytes as a standard zstd frame."""
+    sink = pa.BufferOutputStream()
+    with pa.output_stream(sink, compression="zstd") as stream:
+        stream.write(data)
+    return sink.getvalue().to_pybytes()
+
+
+def decompress(blob: bytes) -> bytes:
+    """Decompress a zstd frame produced by compress()."""
+    with pa.input_stream(pa.BufferReader(blob), compression="zstd") as stream:
+        return stream.read()
+
+
+def _common_prefix(a: str, i: int, b: str, j: int) -> int:
+    """Length of the common prefix of a[i:] and b[j:], by binary search over slices."""
+    low, high = 0, min(len(a) - i, len(b) - j)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[i:i + middle] == b[j:j + middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def redaction_diff(original: str, modified: str) -> List[list]:
+    """
+    Return the [start, end, replacement] spans that turn original into modified.
+
+    Redaction replaces matches in place and never reorders text, so after
+    each mismatch the scan resynchronizes at the first DIFF_ANCHOR-character
+    run of the modified text that reappears later in the original. The
+    result always reconstructs modified exactly; a spurious anchor only makes
+    a span longer than necessary.
+    """
+    spans = []
+    i = j = 0
+    while True:
+        run = _common_prefix(original, i, modified, j)
+        i += run
+        j += run
+        if i == len(original) and j == len(modified):
+            return spans
+
+        for resync in range(j, len(modified) - DIFF_ANCHOR + 1):
+            found = original.find(modified[resync:resync + DIFF_ANCHOR], i)
+            if found != -1:
+                spans.append([i, found, modified[j:resync]])
+                i, j = found, resync
+                break
+        else:
+            # No anchor left: keep whatever tail the two texts still share
+            tail = _common_prefix(original[i:][::-1], 0, modified[j:][::-1], 0)
+            spans.append([i, len(original) - tail, modified[j:len(modified) - tail]])
+            return spans
+
+
+def apply_diff(original: str, spans: List[list]) -> str:
+    """Rebuild a modified text from its original and redaction_diff() spans."""
+    pieces = []
+    position = 0
+    for start, end, replacement in spans:
+        pieces.append(original[position:start])
+        pieces.append(replacement)
+        position = end
+    pieces.append(original[position:])
+    return "".join(pieces)
+
+
+def _encode_modified(original: Optional[str], modified: Optional[str]) -> Optional[Dict[str, Any]]:
+    if modified is None:
+        return None
+    if original is not None:
+        spans = redaction_diff(original, modified)
+        # Fall back to the full text when the diff would not be smaller
+        if sum(len(span[2]) + 16 for span in spans) < len(modified):
+            return {"d": spans}
+    return {"t": modified}
+
+
+def _decode_modified(original: Optional[str], encoded: Optional[Dict[str, Any]]) -> Optional[str]:
+    if encoded is None:
+        return None
+    if "d" in encoded:
+        return apply_diff(original or "", encoded["d"])
+    return encoded["t"]
+
+
+def encode_bodies(
+    original_prompt: str,
+    modified_prompt: Optional[str],
+    original_response: Optional[str],
+    modified_response: Optional[str],
+    shared_prompt: bool = False,
+) -> bytes:
+    """Pack a log's text bodies into one compressed blob."""
+    payload = {
+        "p": None if shared_prompt else original_prompt,
+        "r": original_response,
+        "mp": _encode_modified(original_prompt, modified_prompt),
+        "mr": _encode_modified(original_response, modified_response),
+    }
+    return compress(json.dumps(payload, separators=(",", ":")).encode())
+
+
+def decode_bodies(blob: bytes, shared_prompt: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """Unpack a blob produced by encode_bodies() into the four text fields."""
+    payload = json.loads(decompress(blob))
+    original_prompt = payload["p"] if payload["p"] is not None else shared_prompt
+    return {
+        "original_prompt": original_prompt,
+        "modified_prompt": _decode_modified(original_prompt, payload["mp"]),
+        "original_response": payload["r"],
+        "modified_response": _decode_modified(payload["r"], payload["mr"]),
+    }
+
+
+def body_columns(
+    original_prompt: str,
+    modified_prompt: Optional[str],
+    original_response: Optional[str],
+    modified_response: Optional[str],
+    storage: Optional[str] = None,
+    shared_prompt: bool = False,
+) -> Dict[str, Any]:
+    """
+    Return the RequestLog column values that store these bodies.
+
+    With shared_prompt, the original prompt is stored in prompt_blobs by the
+    caller and is not repeated here.
+    """
+    if (storage or BODY_STORAGE) != "compressed":
+        columns = {
+            "original_prompt": "" if shared_prompt else original_prompt,
+            "modified_prompt": modified_prompt,
+            "original_response": original_response,
+            "modified_response": modified_response,
+        }
+    else:
+        columns = {
+            "original_prompt": "",
+            "bodies": encode_bodies(
+                original_prompt, modified_prompt, original_response, modified_response,
+                shared_prompt,
+            ),
+        }
+    # After original_prompt, whose validator would otherwise measure the placeholder
+    columns["prompt_length"] = len(original_prompt)
+    return columns
+
+
+class _DecodedLog:
+    """Read-only view of a log row with its text reconstructed."""
+
+    def __init__(self, log: Any, bodies: Dict[str, Optional[str]]):
+        self._log = log
+        self._bodies = bodies
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self._bodies:
+            return self._bodies[name]
+        return getattr(self._log, name)
+
+
+def decoded(log: Any) -> Any:
+    """Return the log itself, or a view with its stored text reconstructed."""
+    blob = getattr(log, "bodies", None)
+    # Check the hash first so ORM rows without one never load the deferred prompt_body
+    shared_prompt = getattr(log, "prompt_body", None) if getattr(log, "prompt_hash", None) else None
+    if blob is not None:
+        return _DecodedLog(log, decode_bodies(blob, shared_prompt))
+    if shared_prompt is not None:
+        return _DecodedLog(log, {"original_prompt": shared_prompt})
+    return log
@@ -0,0 +1,321 @@
+"""
+Partition maintenance for the request_logs table.
+
+On PostgreSQL, request_logs is range-partitioned by timestamp (migration
+004). This module creates partitions ahead of time and applies the log
+retention policy to expired ones, then deletes prompt blobs
+(app.prompt_blobs) that only expired logs referenced. It also prunes old minute buckets of the
+stats rollups (app.log_rollups) on any database. Run it periodically, e.g.
+from a daily scheduled job:
+
+    python -m app.log_partitions
+"""
+
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import bindparam, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Update
+from dotenv import load_dotenv
+
+from app.models import RequestLog
+from app.prompt_blobs import prune_prompt_blobs
+
+load_dotenv()
+
+PARENT_TABLE = "request_logs"
+# Catch-all partition for rows outside every range (migration 004)
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+# "month" or "day"
+PARTITION_INTERVAL = os.getenv("LOG_PARTITION_INTERVAL", "month")
+# Number of future partitions kept ready beyond the current one
+PARTITIONS_AHEAD = int(os.getenv("LOG_PARTITIONS_AHEAD", "3"))
+# Days of logs to keep; 0 keeps logs forever
+RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "0"))
+# "drop" deletes expired partitions, "detach" keeps them as standalone archive tables
+RETENTION_ACTION = os.getenv("LOG_RETENTION_ACTION", "drop")
+
+
+def row_update(dialect_name: str) -> Tuple[Update, bool]:
+    """
+    Return an UPDATE of request_logs rows by their "b_id" parameter, and
+    whether it also needs each row's timestamp as "b_timestamp".
+
+    On PostgreSQL the timestamp lets each update target a single partition
+    rather than probing all of them.
+    """
+    table = RequestLog.__table__
+    statement = update(table).where(table.c.id == bindparam("b_id"))
+    by_partition = dialect_name == "postgresql"
+    if by_partition:
+        statement = statement.where(table.c.timestamp == bindparam("b_timestamp"))
+    return statement, by_partition
+
+
+def partition_start(day: date, interval: str) -> date:
+    """Return the first day of the partition period containing `day`."""
+    if interval == "month":
+        return day.replace(day=1)
+    if interval == "day":
+        return day
+    raise ValueError(f"Unsupported partition interval: {interval}")
+
+
+def next_partition_start(start: date, interval: str) -> date:
+    """Return the first day of the period following the one starting at `start`."""
+    if interval == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    if interval == "day":
+        return start + timedelta(days=1)
+    raise ValueError(f"Unsupported partition interval: {interval}")
+
+
+def partition_name(start: date, interval: str) -> str:
+    """Return the table name of the partition starting at `start`."""
+    if interval == "month":
+        return f"{PARENT_TABLE}_p{start:%Y_%m}"
+    return f"{PARENT_TABLE}_p{start:%Y_%m_%d}"
+
+
+def parse_partition_name(name: str) -> Optional[Tuple[date, date]]:
+    """Return the [start, end) range encoded in a partition name, if any."""
+    prefix = f"{PARENT_TABLE}_p"
+    if not name.startswith(prefix):
+        return None
+
+    suffix = name[len(prefix):]
+    for fmt, interval in (("%Y_%m_%d", "day"), ("%Y_%m", "month")):
+        try:
+            start = datetime.strptime(suffix, fmt).date()
+        except ValueError:
+            continue
+        return start, next_partition_start(start, interval)
+    return None
+
+
+def planned_partitions(today: date, interval: str, ahead: int) -> List[Tuple[str, date, date]]:
+    """Return (name, start, end) for the current partition and `ahead` future ones."""
+    planned = []
+    start = partition_start(today, interval)
+    for _ in range(ahead + 1):
+        end = next_partition_start(start, interval)
+        planned.append((partition_name(start, interval), start, end))
+        start = end
+    return planned
+
+
+def expired_partitions(names: List[str], cutoff: date) -> List[str]:
+    """Return partitions whose whole range lies before `cutoff`."""
+    expired = []
+    for name in names:
+        bounds = parse_partition_name(name)
+        if bounds and bounds[1] <= cutoff:
+            expired.append(name)
+    return sorted(expired)
+
+
+def list_partitions(conn: Connection) -> List[str]:
+    """List partitions currently attached to request_logs."""
+    rows = conn.execute(
+        text(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :parent
+            """
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    return [row[0] for row in rows]
+
+
+def create_partition(conn: Connection, name: str, start: date, end: date, has_default: bool) -> None:
+    """
+    Create the partition for [start, end).
+
+    PostgreSQL refuses to add a partition for a range the DEFAULT partition
+    already holds rows of, e.g. after maintenance has not run for a while.
+    Those rows are moved into the new table before it is attached.
+    """
+    bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    in_range = 'WHERE "timestamp" >= :start AND "timestamp" < :end'
+    params = {"start": start, "end": end}
+    if not has_default or not conn.execute(
+        text(f'SELECT EXISTS (SELECT 1 FROM "{DEFAULT_PARTITION}" {in_range})'), params
+    ).scalar():
+        conn.execute(text(f'CREATE TABLE "{name}" PARTITION OF {PARENT_TABLE} {bounds}'))
+        return
+
+    conn.execute(text(f'CREATE TABLE "{name}" (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)'))
+    conn.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" {in_range} RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        params,
+    )
+    conn.execute(text(f'ALTER TABLE {PARENT_TABLE} ATTACH PARTITION "{name}" {bounds}'))
+
+
+def ensure_partitions(
+    conn: Connection,
+    today: date,
+    interval: str = PARTITION_INTERVAL,
+    ahead: int = PARTITIONS_AHEAD,
+) -> List[str]:
+    """Create any missing partitions up to `ahead` periods in the future."""
+    partitions = list_partitions(conn)
+    existing = [bounds for bounds in map(parse_partition_name, partitions) if bounds]
+    has_default = DEFAULT_PARTITION in partitions
+
+    created = []
+    for name, start, end in planned_partitions(today, interval, ahead):
+        # Skip ranges already covered, e.g. after switching from monthly to daily
+        if any(start < other_end and other_start < end for other_start, other_end in existing):
+            continue
+        create_partition(conn, name, start, end, has_default)
+        existing.append((start, end))
+        created.append(name)
+    return created
+
+
+def archive_prompts(conn: Connection, table: str) -> None:
+    """Copy the prompt blobs referenced by a detached table to "<table>_prompts"."""
+    conn.execute(
+        text(
+            f'CREATE TABLE "{table}_prompts" AS SELECT * FROM prompt_blobs '
+            f'WHERE hash IN (SELECT prompt_hash FROM "{table}")'
+        )
+    )
+
+
+def drop_prompt_foreign_keys(conn: Connection, table: str) -> None:
+    """Drop the foreign keys a detached partition keeps to prompt_blobs."""
+    constraints = conn.execute(
+        text(
+            "SELECT conname FROM pg_constraint WHERE conrelid = CAST(:table AS regclass) "
+            "AND confrelid = CAST('prompt_blobs' AS regclass)"
+        ),
+        {"table": f'"{table}"'},
+    ).scalars()
+    for constraint in constraints:
+        conn.execute(text(f'ALTER TABLE "{table}" DROP CONSTRAINT "{constraint}"'))
+
+
+def expire_default_rows(conn: Connection, cutoff: date, action: str) -> bool:
+    """
+    Apply retention to rows of the DEFAULT partition older than `cutoff`.
+
+    The DEFAULT partition has no range of its own to expire, so its expired
+    rows are deleted, or with "detach" moved to a standalone archive table
+    named after the cutoff, with their risks and prompts next to it.
+    Returns whether there were any.
+    """
+    params = {"cutoff": cutoff}
+    expired_rows = f'SELECT id FROM "{DEFAULT_PARTITION}" WHERE "timestamp" < :cutoff'
+    if not conn.execute(text(f"SELECT EXISTS ({expired_rows})"), params).scalar():
+        return False
+
+    if action == "detach":
+        archive = f"{DEFAULT_PARTITION}_before_{cutoff:%Y_%m_%d}"
+        conn.execute(
+            text(
+                f'CREATE TABLE "{archive}" AS SELECT * FROM "{DEFAULT_PARTITION}" '
+                'WHERE "timestamp" < :cutoff'
+            ),
+            params,
+        )
+        conn.execute(
+            text(
+                f'CREATE TABLE "{archive}_risks" AS SELECT * FROM request_risks '
+                f"WHERE request_log_id IN ({expired_rows})"
+            ),
+            params,
+        )
+        archive_prompts(conn, archive)
+    conn.execute(text(f"DELETE FROM request_risks WHERE request_log_id IN ({expired_rows})"), params)
+    conn.execute(text(f'DELETE FROM "{DEFAULT_PARTITION}" WHERE "timestamp" < :cutoff'), params)
+    return True
+
+
+def apply_retention(
+    conn: Connection,
+    today: date,
+    retention_days: int = RETENTION_DAYS,
+    action: str = RETENTION_ACTION,
+) -> List[str]:
+    """
+    Drop or detach partitions that are entirely older than the retention
+    window, and expire rows of the DEFAULT partition older than it. Detached
+    tables keep copies of their risks and prompts; prompt blobs no remaining
+    log references are deleted.
+    """
+    if retention_days <= 0:
+        return []
+    if action not in ("drop", "detach"):
+        raise ValueError(f"Unsupported retention action: {action}")
+
+    cutoff = today - timedelta(days=retention_days)
+    partitions = list_partitions(conn)
+    expired = expired_partitions(partitions, cutoff)
+
+    for name in expired:
+        # request_risks has no foreign key to the partitioned table, so clean it up here
+        if action == "detach":
+            conn.execute(
+                text(
+                    f'CREATE TABLE "{name}_risks" AS SELECT request_risks.* FROM request_risks '
+                    f'JOIN "{name}" ON "{name}".id = request_risks.request_log_id'
+                )
+            )
+            archive_prompts(conn, name)
+        conn.execute(
+            text(f'DELETE FROM request_risks WHERE request_log_id IN (SELECT id FROM "{name}")')
+        )
+        if action == "drop":
+            conn.execute(text(f'DROP TABLE "{name}"'))
+        else:
+            conn.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+            drop_prompt_foreign_keys(conn, name)
+    expired_default = DEFAULT_PARTITION in partitions and expire_default_rows(conn, cutoff, action)
+    if expired or expired_default:
+        prune_prompt_blobs(conn)
+    return expired
+
+
+def maintain_partitions(engine, today: Optional[date] = None) -> Tuple[List[str], List[str]]:
+    """Create upcoming partitions and apply retention in a single transaction."""
+    today = today or datetime.utcnow().date()
+    with engine.begin() as conn:
+        created = ensure_partitions(conn, today)
+        expired = apply_retention(conn, today)
+    return created, expired
+
+
+def main():
+    """Run partition maintenance against DATABASE_URL."""
+    from app import log_rollups
+    from app.database import engine
+
+    if engine.dialect.name == "postgresql":
+        created, expired = maintain_partitions(engine)
+        for name in created:
+            print(f"Created partition: {name}")
+        for name in expired:
+            print(f"{'Dropped' if RETENTION_ACTION == 'drop' else 'Detached'} partition: {name}")
+    else:
+        print("request_logs partitioning requires PostgreSQL; skipping partitions")
+
+    with engine.begin() as conn:
+        pruned = log_rollups.prune_rollups(conn, datetime.now(timezone.utc))
+    print(f"Pruned {pruned} minute rollup rows")
+    print("Partition maintenance complete!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Incrementally maintained rollups of request logs.
+
+Each processed request adds to per-minute, per-hour and per-day counters
+of decisions and detected risks (decision_rollups / risk_rollups), so the
+stats endpoint can chart long time ranges without scanning request_logs.
+
+Every request would otherwise update the same few current-bucket rows, so
+counts are buffered per process and added in one short transaction of
+their own at most every LOG_ROLLUP_FLUSH_SECONDS. Rows are always upserted
+in key order, so concurrent flushes lock them in the same order and cannot
+deadlock. Minute buckets are pruned after LOG_ROLLUP_MINUTE_RETENTION_DAYS
+by the maintenance job (`python -m app.log_partitions`).
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.database import on_conflict_insert
+from app.models import DecisionRollup, RiskRollup
+
+# Longest buffered counts wait before they are written; 0 writes after every request
+ROLLUP_FLUSH_SECONDS = float(os.getenv("LOG_ROLLUP_FLUSH_SECONDS", "5"))
+# Days of minute buckets kept; 0 keeps them forever. Hour and day buckets are kept.
+MINUTE_RETENTION_DAYS = int(os.getenv("LOG_ROLLUP_MINUTE_RETENTION_DAYS", "7"))
+
+DECISION_KEY = ["granularity", "bucket_start", "decision"]
+RISK_KEY = ["granularity", "bucket_start", "risk_type", "severity", "pattern_name"]
+
+# Bucket width of each rollup granularity
+GRANULARITIES: Dict[str, timedelta] = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its UTC bucket."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    timestamp = timestamp.astimezone(timezone.utc)
+
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+
+def _upsert_counts(db: Session, model, key_columns: List[str], counts: Counter) -> None:
+    """Add counts to rollup rows, creating rows that do not exist yet."""
+    if not counts:
+        return
+
+    # Key order keeps row locks in the same order across concurrent flushes
+    rows = [
+        {**dict(zip(key_columns, key)), "count": counts[key]}
+        for key in sorted(counts)
+    ]
+    table = model.__table__
+    stmt = on_conflict_insert(db.get_bind(), table)
+    if stmt is not None:
+        stmt = stmt.values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={"count": table.c.count + stmt.excluded["count"]},
+        )
+        db.execute(stmt)
+        return
+
+    for row in rows:
+        filters = {name: row[name] for name in key_columns}
+        existing = db.query(model).filter_by(**filters).with_for_update().first()
+        if existing:
+            existing.count += row["count"]
+        else:
+            db.add(model(**row))
+    db.flush()
+
+
+class RollupBuffer:
+    """Rollup counts of processed requests not yet written to the database."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._decisions: Counter = Counter()
+        self._risks: Counter = Counter()
+        self._last_flush = time.monotonic()
+
+    def add(self, timestamp: datetime, decision: str, risks: List[Dict[str, Any]]) -> None:
+        """Count one processed request in every granularity."""
+        with self._lock:
+            for granularity in GRANULARITIES:
+                start = bucket_start(timestamp, granularity)
+                self._decisions[(granularity, start, decision)] += 1
+                for risk in risks:
+                    self._risks[(
+                        granularity,
+                        start,
+                        risk["type"],
+                        risk["severity"],
+                        risk.get("pattern_name") or "",
+                    )] += 1
+
+    def due(self) -> bool:
+        """Return whether buffered counts have waited ROLLUP_FLUSH_SECONDS."""
+        return time.monotonic() - self._last_flush >= ROLLUP_FLUSH_SECONDS
+
+    def flush(self, db: Session) -> None:
+        """
+        Add the buffered counts to the rollup tables and commit.
+
+        Counts are taken out of the buffer first so requests keep counting
+        while the flush runs; if it fails they are put back for the next one.
+        """
+        with self._lock:
+            decisions, self._decisions = self._decisions, Counter()
+            risks, self._risks = self._risks, Counter()
+            self._last_flush = time.monotonic()
+        if not decisions:
+            return
+
+        try:
+            _upsert_counts(db, DecisionRollup, DECISION_KEY, decisions)
+            _upsert_counts(db, RiskRollup, RISK_KEY, risks)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            with self._lock:
+                self._decisions.update(decisions)
+                self._risks.update(risks)
+            raise
+
+
+buffer = RollupBuffer()
+
+
+def record_request(timestamp: datetime, decision: str, risks: List[Dict[str, Any]]) -> None:
+    """Count one processed request; see flush_if_due() for when it is written."""
+    buffer.add(timestamp, decision, risks)
+
+
+def flush_if_due(db: Session) -> None:
+    """
+    Write buffered counts if ROLLUP_FLUSH_SECONDS have passed since the last
+    write. Call it after the request's own transaction has committed.
+    """
+    if buffer.due():
+        buffer.flush(db)
+
+
+def flush(db: Session) -> None:
+    """Write all buffered counts now, e.g. on shutdown."""
+    buffer.flush(db)
+
+
+def prune_rollups(
+    conn: Connection, now: datetime, retention_days: int = MINUTE_RETENTION_DAYS
+) -> int:
+    """Delete minute buckets older than the retention window; return rows deleted."""
+    if retention_days <= 0:
+        return 0
+
+    cutoff = bucket_start(now - timedelta(days=retention_days), "day")
+    deleted = 0
+    for model in (DecisionRollup, RiskRollup):
+        table = model.__table__
+        deleted += conn.execute(
+            table.delete().where(table.c.granularity == "minute", table.c.bucket_start < cutoff)
+        ).rowcount
+    return deleted
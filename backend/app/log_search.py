@@ -0,0 +1,93 @@
+"""
+Full-text search over logged prompts and responses.
+
+On PostgreSQL each log's original prompt and response are indexed in the
+request_logs.search_vector tsvector column (GIN-indexed) as the log is
+inserted, and searches use websearch_to_tsquery syntax ("quoted phrases",
+or, -exclusions) ranked with ts_rank_cd. On SQLite, used for local
+development and tests, the same text goes into the request_logs_fts FTS5
+table and results are ranked by bm25.
+
+Text is indexed from the request itself, so logs whose bodies are stored
+compressed or deduplicated stay searchable. The index holds the original,
+unredacted text, so it never outlives the text in request_logs: archival
+(app.log_archive) removes archived logs from it, and deleting a log removes
+its FTS5 row through a trigger. Only logs whose text is still in the
+database are searchable.
+"""
+
+from typing import Any, List, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import column, func, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Query, Session
+
+from app.models import RequestLog
+
+# PostgreSQL text search configuration used to build and query the index
+SEARCH_CONFIG = "english"
+
+_fts = table("request_logs_fts", column("rowid"), column("rank"))
+
+
+def search_text(prompt: str, response: str = None) -> str:
+    """Return the text indexed for a log."""
+    return "\n".join(part for part in (prompt, response) if part)
+
+
+def index_log(db: Session, log: RequestLog, body: str) -> None:
+    """Index a log's text; call after adding the log to the session, before commit."""
+    if not body:
+        return
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        # Computed by the INSERT itself, so indexing costs no extra round trip
+        log.search_vector = func.to_tsvector(SEARCH_CONFIG, body)
+    elif dialect == "sqlite":
+        db.flush()
+        db.execute(
+            text("INSERT INTO request_logs_fts (rowid, body) VALUES (:id, :body)"),
+            {"id": log.id, "body": body},
+        )
+
+
+def unindex_logs(conn: Connection, ids: List[int]) -> None:
+    """
+    Remove logs from the SQLite FTS5 table; on PostgreSQL callers set
+    search_vector to NULL in the same UPDATE instead.
+    """
+    if ids and conn.dialect.name == "sqlite":
+        conn.execute(
+            text("DELETE FROM request_logs_fts WHERE rowid = :id"), [{"id": log_id} for log_id in ids]
+        )
+
+
+def _fts5_query(q: str) -> str:
+    """Turn free text into an FTS5 query matching every word."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in q.split())
+
+
+def apply_search(db: Session, query: Query, q: str) -> Tuple[Query, Any]:
+    """Restrict a RequestLog query to logs matching q; return it with a rank expression (higher is better)."""
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+        query = query.filter(RequestLog.search_vector.op("@@")(tsquery))
+        return query, func.ts_rank_cd(RequestLog.search_vector, tsquery)
+
+    if dialect == "sqlite":
+        query = (
+            query.join(_fts, _fts.c.rowid == RequestLog.id)
+            .filter(text("request_logs_fts MATCH :fts_query"))
+            .params(fts_query=_fts5_query(q))
+        )
+        # FTS5's rank is bm25, where lower means more relevant
+        return query, -_fts.c.rank
+
+    raise HTTPException(
+        status_code=status.HTTP_501_NOT_IMPLEMENTED,
+        detail="Log search requires PostgreSQL or SQLite"
+    )
@@ -0,0 +1,84 @@
+"""
+Backfill of the denormalized summary columns on request_logs.
+
+New logs get risk_count, max_severity, risk_types and prompt_length when
+they are written (see RequestLog). Rows logged before migration 006 have
+NULL summaries, which the logs router derives from request_risks on every
+query until they are filled. This command fills them in batches, committing
+after each one, so it can run against a live database and be resumed if
+interrupted:
+
+    python -m app.log_summary --batch-size 5000
+"""
+
+import argparse
+from typing import Callable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+
+from app.log_partitions import row_update
+from app.models import RequestLog, risk_summary
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def backfill_summaries(
+    engine: Engine,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Compute summaries for every log that lacks them; return the number of rows updated."""
+    table = RequestLog.__table__
+    statement, by_partition = row_update(engine.dialect.name)
+    last_id = 0
+    updated = 0
+
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.timestamp, table.c.risks, table.c.original_prompt)
+                .where(table.c.id > last_id, table.c.risk_count.is_(None))
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return updated
+
+            params = []
+            for row in rows:
+                values = {
+                    "b_id": row.id,
+                    **risk_summary(row.risks),
+                    "prompt_length": len(row.original_prompt or ""),
+                }
+                if by_partition:
+                    values["b_timestamp"] = row.timestamp
+                params.append(values)
+            conn.execute(statement, params)
+
+        last_id = rows[-1].id
+        updated += len(rows)
+        if progress:
+            progress(updated)
+
+
+def main():
+    """Backfill log summaries in DATABASE_URL."""
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="Backfill request_logs summary columns")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    updated = backfill_summaries(
+        engine,
+        args.batch_size,
+        progress=lambda count: print(f"Backfilled {count} logs", end="\r"),
+    )
+    print()
+    print(f"Summary backfill complete! {updated} logs updated.")
+
+
+if __name__ == "__main__":
+    main()
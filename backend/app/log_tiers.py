@@ -0,0 +1,56 @@
+"""
+Tiered logging policy for processed requests.
+
+Requests with a block, redact or warn decision are always logged in full.
+Allowed requests, usually the bulk of traffic, follow LOG_ALLOW_TIER:
+
+- ``full``: log every request with its bodies (default)
+- ``metadata``: log every request without prompt/response text or matches
+- ``sampled``: log LOG_ALLOW_SAMPLE_RATE of requests in full and skip the rest
+
+Skipped requests are still counted by the stats rollups, so stats stay
+exact while log write volume follows risk rather than traffic.
+"""
+
+import os
+import random
+from collections import Counter
+from typing import Any, Dict, List
+
+FULL = "full"
+METADATA = "metadata"
+SKIPPED = "skipped"
+
+LOG_ALLOW_TIER = os.getenv("LOG_ALLOW_TIER", FULL)
+# Fraction of allowed requests logged in full when LOG_ALLOW_TIER=sampled
+LOG_ALLOW_SAMPLE_RATE = float(os.getenv("LOG_ALLOW_SAMPLE_RATE", "0.01"))
+
+# Requests per tier since the process started
+tier_counts: Counter = Counter()
+
+
+def choose_tier(decision: str) -> str:
+    """Pick the logging tier of a request and count it."""
+    if decision != "allow" or LOG_ALLOW_TIER == FULL:
+        tier = FULL
+    elif LOG_ALLOW_TIER == METADATA:
+        tier = METADATA
+    else:
+        tier = FULL if random.random() < LOG_ALLOW_SAMPLE_RATE else SKIPPED
+    tier_counts[tier] += 1
+    return tier
+
+
+def tier_metadata(decision: str, tier: str) -> Dict[str, Any]:
+    """Return request_metadata entries describing how a logged request was tiered."""
+    if decision != "allow" or LOG_ALLOW_TIER == FULL:
+        return {}
+    if tier == METADATA:
+        return {"log_tier": METADATA}
+    # Lets analysts scale sampled allow logs back up to traffic volume
+    return {"log_tier": "sampled", "sample_rate": LOG_ALLOW_SAMPLE_RATE}
+
+
+def strip_matches(risks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop matched text from risks for metadata-only logs."""
+    return [{key: value for key, value in risk.items() if key != "match"} for risk in risks]
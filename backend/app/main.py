@@ -2,15 +2,27 @@
 FastAPI main application.
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import os
 from dotenv import load_dotenv
-from app.routers import query, policy, logs, auth
+from app import log_rollups
+from app.database import SessionLocal
+from app.routers import query, policy, logs, auth, stats
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Write stats rollup counts still buffered in this process on shutdown."""
+    yield
+    with SessionLocal() as db:
+        log_rollups.flush(db)
+
+
 app = FastAPI(
     title="Prompt Firewall API",
     description="AI Security Firewall for detecting PII/PHI and prompt injections",
@@ -18,6 +30,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 # CORS configuration
@@ -37,6 +50,7 @@ app.include_router(query.router)
 app.include_router(policy.router)
 app.include_router(logs.router)
 app.include_router(auth.router)
+app.include_router(stats.router)
 
 
 @app.get("/v1/health")
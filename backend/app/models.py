@@ -2,7 +2,13 @@
 Database models for the Prompt Firewall application.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, JSON, Boolean
+from sqlalchemy import (
+    Column, Integer, BigInteger, String, Text, DateTime, Enum, JSON, Boolean, Index, ForeignKey,
+    ForeignKeyConstraint, PrimaryKeyConstraint, UniqueConstraint, LargeBinary,
+)
+from sqlalchemy import DDL, event, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import column_property, deferred, relationship, validates
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
@@ -30,13 +36,56 @@ class Decision(str, enum.Enum):
     allow = "allow"
 
 
+# Bit set in RequestLog.risk_types for each risk type present in a log
+RISK_TYPE_BITS = {risk_type.value: 1 << index for index, risk_type in enumerate(RiskType)}
+SEVERITY_RANKS = {Severity.low.value: 1, Severity.medium.value: 2, Severity.high.value: 3}
+
+
+def risk_summary(risks) -> dict:
+    """Compute RequestLog's denormalized risk columns from a risks list."""
+    risks = risks if isinstance(risks, list) else []
+    risk_types = 0
+    max_severity = None
+    for risk in risks:
+        risk_types |= RISK_TYPE_BITS.get(risk.get("type"), 0)
+        severity = risk.get("severity")
+        if SEVERITY_RANKS.get(severity, 0) > SEVERITY_RANKS.get(max_severity, 0):
+            max_severity = severity
+    return {
+        "risk_count": len(risks),
+        "max_severity": max_severity,
+        "risk_types": risk_types,
+    }
+
+
+def risk_type_masks(risk_type: str) -> list:
+    """Return every risk_types value that includes the given risk type."""
+    bit = RISK_TYPE_BITS[risk_type]
+    return [mask for mask in range(1 << len(RISK_TYPE_BITS)) if mask & bit]
+
+
+def _unpartitioned(ddl, target, bind, dialect, **kw) -> bool:
+    """DDL condition for constraints that only exist where request_logs is not partitioned."""
+    return dialect.name != "postgresql"
+
+
+class PromptBlob(Base):
+    """A prompt body stored once and shared by every log with the same text."""
+
+    __tablename__ = "prompt_blobs"
+
+    # SHA-256 of the UTF-8 body, hex encoded
+    hash = Column(String(64), primary_key=True)
+    body = Column(Text, nullable=False)
+
+
 class RequestLog(Base):
     """Log of all requests processed by the firewall."""
 
     __tablename__ = "request_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    request_id = Column(String, unique=True, index=True, nullable=False)
+    request_id = Column(String, nullable=False)
     timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     original_prompt = Column(Text, nullable=False)
@@ -45,6 +94,21 @@ class RequestLog(Base):
     original_response = Column(Text, nullable=True)
     modified_response = Column(Text, nullable=True)
 
+    # With LOG_BODY_STORAGE=compressed the four text columns above stay empty and
+    # the bodies live here instead; read them through app.log_bodies.decoded()
+    bodies = Column(LargeBinary, nullable=True)
+
+    # Set when the original prompt lives in prompt_blobs (LOG_PROMPT_DEDUP);
+    # prompt_body loads the shared text only when it is read
+    prompt_hash = Column(String(64), ForeignKey("prompt_blobs.hash"), nullable=True)
+    prompt_body = column_property(
+        select(PromptBlob.body)
+        .where(PromptBlob.hash == prompt_hash)
+        .correlate_except(PromptBlob)
+        .scalar_subquery(),
+        deferred=True,
+    )
+
     decision = Column(Enum(Decision), nullable=False)
 
     risks = Column(JSON, nullable=False)
@@ -53,6 +117,197 @@ class RequestLog(Base):
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Summaries of risks and original_prompt, kept in sync on assignment so list
+    # queries can filter and count without parsing the risks JSON. NULL marks
+    # rows written before these columns existed (see app.log_summary).
+    risk_count = Column(Integer, nullable=True)
+    max_severity = Column(String, nullable=True)
+    risk_types = Column(Integer, nullable=True)
+    prompt_length = Column(Integer, nullable=True)
+
+    # Set once app.log_archive has moved the text bodies to cold storage; the
+    # hash covers the archived bodies so rehydration can be verified
+    archive_ref = Column(String, nullable=True)
+    archive_sha256 = Column(String(64), nullable=True)
+
+    # Full-text index of the original prompt and response, written by
+    # app.log_search when the log is inserted. PostgreSQL only; SQLite keeps
+    # its index in the request_logs_fts table instead.
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
+
+    # Deleted through the ORM rather than by the database: on PostgreSQL
+    # request_risks has no foreign key to the partitioned request_logs
+    risk_entries = relationship(
+        "RequestRisk",
+        back_populates="request_log",
+        cascade="all, delete-orphan",
+    )
+
+    # On PostgreSQL this table is range-partitioned by timestamp (migration 004,
+    # maintained by app.log_partitions). Unique constraints there must include
+    # the partition key, so the primary key is (id, timestamp) and request_id
+    # is only unique per timestamp; request ids are random UUIDs generated by
+    # the firewall, so global uniqueness is not enforced by the database.
+    # The PostgreSQL primary key and default partition are added after the
+    # table is created, below.
+    __table_args__ = (
+        PrimaryKeyConstraint("id").ddl_if(callable_=_unpartitioned),
+        Index("ix_request_logs_request_id", "request_id", unique=True).ddl_if(
+            callable_=_unpartitioned
+        ),
+        Index("ix_request_logs_request_id", "request_id", "timestamp", unique=True).ddl_if(
+            dialect="postgresql"
+        ),
+        # Backs keyset pagination on the logs endpoint (ORDER BY timestamp DESC, id DESC)
+        Index("ix_request_logs_timestamp_id", "timestamp", "id"),
+        # Back the type and min_severity filters, which match a few discrete values
+        Index("ix_request_logs_risk_types_timestamp", "risk_types", "timestamp"),
+        Index("ix_request_logs_max_severity_timestamp", "max_severity", "timestamp"),
+        # Finds rows whose summaries are not backfilled yet; empty once they are
+        Index(
+            "ix_request_logs_unsummarized",
+            "timestamp",
+            postgresql_where=risk_count.is_(None),
+            sqlite_where=risk_count.is_(None),
+        ),
+        Index("ix_request_logs_search_vector", "search_vector", postgresql_using="gin"),
+        # Finds the logs still sharing a prompt when unreferenced prompt_blobs are pruned
+        Index(
+            "ix_request_logs_prompt_hash",
+            "prompt_hash",
+            postgresql_where=prompt_hash.isnot(None),
+            sqlite_where=prompt_hash.isnot(None),
+        ),
+        {"postgresql_partition_by": 'RANGE ("timestamp")'},
+    )
+
+    @validates("risks")
+    def _summarize_risks(self, key, risks):
+        for name, value in risk_summary(risks).items():
+            setattr(self, name, value)
+        return risks
+
+    @validates("original_prompt")
+    def _measure_prompt(self, key, prompt):
+        self.prompt_length = len(prompt) if prompt is not None else None
+        return prompt
+
+
+# Partition-compatible primary key, and a catch-all partition so inserts work
+# before app.log_partitions has created the monthly ones (as in migration 004)
+for statement in (
+    'ALTER TABLE request_logs ADD CONSTRAINT request_logs_pkey PRIMARY KEY (id, "timestamp")',
+    "CREATE TABLE request_logs_default PARTITION OF request_logs DEFAULT",
+):
+    event.listen(
+        RequestLog.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+
+# SQLite fallback for the full-text index; rowid is request_logs.id
+event.listen(
+    RequestLog.__table__,
+    "after_create",
+    DDL("CREATE VIRTUAL TABLE IF NOT EXISTS request_logs_fts USING fts5(body)").execute_if(
+        dialect="sqlite"
+    ),
+)
+# Keeps deleted logs out of the index, and their rowids free for reuse
+event.listen(
+    RequestLog.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS request_logs_fts_delete AFTER DELETE ON request_logs "
+        "BEGIN DELETE FROM request_logs_fts WHERE rowid = old.id; END"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    RequestLog.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS request_logs_fts").execute_if(dialect="sqlite"),
+)
+
+
+class RequestRisk(Base):
+    """One detected risk of a logged request, normalized for indexed filtering."""
+
+    __tablename__ = "request_risks"
+
+    id = Column(Integer, primary_key=True)
+    request_log_id = Column(Integer, nullable=False)
+
+    risk_type = Column(String, nullable=False)
+    severity = Column(String, nullable=False)
+    pattern_name = Column(String, nullable=True)
+
+    start = Column(Integer, nullable=True)
+    end = Column(Integer, nullable=True)
+
+    request_log = relationship("RequestLog", back_populates="risk_entries")
+
+    __table_args__ = (
+        # PostgreSQL cannot reference the partitioned request_logs (migration 004);
+        # RequestLog.risk_entries and app.log_partitions delete risk rows there
+        ForeignKeyConstraint(
+            ["request_log_id"], ["request_logs.id"], ondelete="CASCADE"
+        ).ddl_if(callable_=_unpartitioned),
+        # The logs router filters by type and severity as separate EXISTS clauses
+        Index("ix_request_risks_type_log", "risk_type", "request_log_id"),
+        Index("ix_request_risks_severity_log", "severity", "request_log_id"),
+        Index("ix_request_risks_request_log_id", "request_log_id"),
+    )
+
+    @classmethod
+    def from_risk_dict(cls, risk: dict) -> "RequestRisk":
+        """Build a row from a risk entry as stored in RequestLog.risks."""
+        position = risk.get("position") or {}
+        return cls(
+            risk_type=risk["type"],
+            severity=risk["severity"],
+            pattern_name=risk.get("pattern_name"),
+            start=position.get("start"),
+            end=position.get("end"),
+        )
+
+
+class DecisionRollup(Base):
+    """Count of requests per decision per time bucket, maintained at write time."""
+
+    __tablename__ = "decision_rollups"
+
+    id = Column(Integer, primary_key=True)
+    granularity = Column(String, nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    decision = Column(String, nullable=False)
+    count = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("granularity", "bucket_start", "decision", name="uq_decision_rollups_key"),
+    )
+
+
+class RiskRollup(Base):
+    """Count of detected risks per type, severity and pattern per time bucket."""
+
+    __tablename__ = "risk_rollups"
+
+    id = Column(Integer, primary_key=True)
+    granularity = Column(String, nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    risk_type = Column(String, nullable=False)
+    severity = Column(String, nullable=False)
+    # Empty string rather than NULL so the row participates in the unique key
+    pattern_name = Column(String, nullable=False, default="")
+    count = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "granularity", "bucket_start", "risk_type", "severity", "pattern_name",
+            name="uq_risk_rollups_key",
+        ),
+    )
+
 
 class PolicyRule(Base):
     """Policy rules for the firewall."""
@@ -72,10 +327,35 @@ class PolicyRule(Base):
 
     enabled = Column(Boolean, default=True, nullable=False)
 
+    # Policy version (PolicyState.version) of the last change to this rule
+    version = Column(BigInteger, nullable=False, default=0, server_default="0", index=True)
+
+    # Regex cost measured when the rule was saved (see app.policy_regex):
+    # {"us_per_kb": ..., "growth": ..., "flag": None | "superlinear"}, with
+    # growth None for patterns that cannot backtrack and were not probed
+    pattern_cost = Column(JSON, nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 
+class PolicyState(Base):
+    """Single-row counter bumped by every change to the policy rules."""
+
+    __tablename__ = "policy_state"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
+# The counter row is created with the table, so writers only ever UPDATE it
+event.listen(
+    PolicyState.__table__,
+    "after_create",
+    DDL("INSERT INTO policy_state (id, version) VALUES (1, 0)")
+)
+
+
 class AdminUser(Base):
     """Admin users for the admin console."""
 
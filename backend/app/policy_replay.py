@@ -0,0 +1,286 @@
+"""
+Dry-run replay of a candidate policy against logged requests.
+
+Before a rule set is enabled, admins can see what it would have done: the
+most recent logged requests are re-run through the current FirewallCore
+twice, once with the saved rules and once with the candidate policy (the
+saved rules with the candidate rules applied over them by name, as PUT
+/v1/policy would), and the two decisions are compared. Comparing against
+the logged decision instead would also count changes to the detectors
+since the request was logged. The result counts decisions before and
+after, the changes by transition (e.g. "allow->block") and keeps a sample
+of changed requests.
+
+Logs are streamed from the database in chunks and evaluated in a pool of
+POLICY_REPLAY_WORKERS processes, so a million-row replay takes minutes on a
+multi-core host. Logs without text to replay (metadata-only or archived)
+are counted as skipped. Also available from the command line:
+
+    python -m app.policy_replay --rules candidate.json --limit 1000000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.log_bodies import decoded
+from app.models import PolicyRule, RequestLog
+
+# Processes evaluating logs in parallel; 1 evaluates in the calling process
+POLICY_REPLAY_WORKERS = int(os.getenv("POLICY_REPLAY_WORKERS", str(os.cpu_count() or 1)))
+# Upper bound on POLICY_REPLAY_WORKERS for replays started by the API, which
+# shares the host with request handling
+POLICY_REPLAY_API_WORKERS = int(os.getenv("POLICY_REPLAY_API_WORKERS", "2"))
+
+# Logs per unit of work sent to a worker
+CHUNK_SIZE = 500
+# Characters of prompt text kept in each sample
+SAMPLE_TEXT_LIMIT = 500
+
+# Columns of a saved rule that the firewall evaluates
+RULE_COLUMNS = [
+    "name", "description", "risk_type", "pattern", "pattern_type",
+    "severity", "action", "enabled", "pattern_cost",
+]
+
+# Per-process state set up by _init_worker()
+_firewall = None
+_current_rules: List[PolicyRule] = []
+_candidate_rules: List[PolicyRule] = []
+
+
+def _init_worker(current_values: List[Dict[str, Any]], candidate_values: List[Dict[str, Any]]) -> None:
+    """Build the firewall and both rule sets once per worker process."""
+    global _firewall, _current_rules, _candidate_rules
+    from app.firewall.firewall_core import FirewallCore
+
+    _firewall = FirewallCore()
+    _current_rules = [PolicyRule(**values) for values in current_values]
+    _candidate_rules = [PolicyRule(**values) for values in candidate_values]
+
+
+def _truncate(text: Optional[str]) -> Optional[str]:
+    return text if text is None or len(text) <= SAMPLE_TEXT_LIMIT else text[:SAMPLE_TEXT_LIMIT] + "..."
+
+
+def _evaluate(chunk: List[Dict[str, Any]], samples: int) -> Dict[str, Any]:
+    """Re-run a chunk of logged requests with the current and the candidate rules."""
+    result = {
+        "evaluated": 0,
+        "changed": 0,
+        "before": Counter(),
+        "after": Counter(),
+        "transitions": Counter(),
+        "samples": [],
+    }
+    for row in chunk:
+        current, outcome = (
+            _firewall.process(
+                prompt=row["prompt"], response=row["response"], policy_rules=rules, explain=False
+            )
+            for rules in (_current_rules, _candidate_rules)
+        )
+        before, after = current["decision"], outcome["decision"]
+        result["evaluated"] += 1
+        result["before"][before] += 1
+        result["after"][after] += 1
+        if before == after:
+            continue
+
+        result["changed"] += 1
+        result["transitions"][f"{before}->{after}"] += 1
+        if len(result["samples"]) < samples:
+            result["samples"].append({
+                "log_id": row["id"],
+                "request_id": row["request_id"],
+                "timestamp": row["timestamp"],
+                "before": before,
+                "after": after,
+                "risks": sorted({risk["pattern_name"] for risk in outcome["risks"]}),
+                "prompt_before": _truncate(current["promptModified"]),
+                "prompt_after": _truncate(outcome["promptModified"]),
+            })
+    return result
+
+
+def _logged_requests(db: Session, limit: int, skipped: Counter) -> Iterator[Dict[str, Any]]:
+    """Yield the most recent logs with replayable text, newest first."""
+    query = (
+        select(
+            RequestLog.id,
+            RequestLog.request_id,
+            RequestLog.timestamp,
+            RequestLog.original_prompt,
+            RequestLog.modified_prompt,
+            RequestLog.original_response,
+            RequestLog.bodies,
+            RequestLog.prompt_hash,
+            RequestLog.prompt_body.label("prompt_body"),
+            RequestLog.archive_ref,
+        )
+        .order_by(RequestLog.timestamp.desc(), RequestLog.id.desc())
+        .limit(limit)
+        .execution_options(yield_per=CHUNK_SIZE)
+    )
+    for log in db.execute(query):
+        if log.archive_ref is not None:
+            skipped["archived"] += 1
+            continue
+        log = decoded(log)
+        if not log.original_prompt and not log.original_response:
+            skipped["no_text"] += 1
+            continue
+        yield {
+            "id": log.id,
+            "request_id": log.request_id,
+            "timestamp": log.timestamp.isoformat() if log.timestamp else None,
+            "prompt": log.original_prompt or None,
+            "response": log.original_response,
+        }
+
+
+def _saved_rules(db: Session) -> List[Dict[str, Any]]:
+    """Return the column values of the saved policy rules."""
+    columns = [PolicyRule.__table__.c[name] for name in RULE_COLUMNS]
+    return [dict(row._mapping) for row in db.execute(select(*columns).order_by(PolicyRule.id))]
+
+
+def _apply_candidate(current: List[Dict[str, Any]], rule_values: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return the saved rules with candidate rules replacing or adding to them by name."""
+    by_name = {values["name"]: values for values in current}
+    by_name.update((values["name"], values) for values in rule_values)
+    return list(by_name.values())
+
+
+def _chunks(rows: Iterator[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def replay_policy(
+    db: Session,
+    rule_values: List[Dict[str, Any]],
+    limit: int,
+    samples: int = 20,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Replay the last `limit` logged requests with candidate rules.
+
+    rule_values are PolicyRule column values as returned by
+    app.policy_rules.candidate_rules(); they are applied over the saved
+    rules. Samples are the most recent changed requests.
+    """
+    started = time.perf_counter()
+    # No more processes than there are chunks to hand out
+    workers = min(workers or POLICY_REPLAY_WORKERS, -(-limit // CHUNK_SIZE))
+    current_values = _saved_rules(db)
+    candidate_values = _apply_candidate(current_values, rule_values)
+    skipped = Counter()
+    totals = {
+        "evaluated": 0,
+        "changed": 0,
+        "before": Counter(),
+        "after": Counter(),
+        "transitions": Counter(),
+        "samples": [],
+    }
+
+    def merge(result: Dict[str, Any]) -> None:
+        for key in ("evaluated", "changed"):
+            totals[key] += result[key]
+        for key in ("before", "after", "transitions"):
+            totals[key].update(result[key])
+        totals["samples"].extend(result["samples"][:samples - len(totals["samples"])])
+        if progress:
+            progress(totals["evaluated"])
+
+    chunks = _chunks(_logged_requests(db, limit, skipped))
+    if workers <= 1:
+        _init_worker(current_values, candidate_values)
+        for chunk in chunks:
+            merge(_evaluate(chunk, samples))
+    else:
+        # Spawned rather than forked, as the caller may be a threaded server
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(current_values, candidate_values),
+        ) as pool:
+            # A bounded number of chunks in flight keeps memory flat however
+            # many logs are replayed; merging in submission order keeps the
+            # samples newest first
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(_evaluate, chunk, samples))
+                if len(pending) >= workers * 2:
+                    merge(pending.popleft().result())
+            while pending:
+                merge(pending.popleft().result())
+
+    return {
+        "evaluated": totals["evaluated"],
+        "skipped": sum(skipped.values()),
+        "changed": totals["changed"],
+        "before": dict(totals["before"]),
+        "after": dict(totals["after"]),
+        "transitions": dict(totals["transitions"]),
+        "samples": totals["samples"],
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    """Replay a candidate policy against logs in DATABASE_URL (or DATABASE_READ_URL)."""
+    from fastapi import HTTPException
+
+    from app.database import ReadSessionLocal, SessionLocal
+    from app.policy_rules import candidate_rules
+    from app.schemas import PolicyRuleSchema
+
+    parser = argparse.ArgumentParser(description="Replay a candidate policy against logged requests")
+    parser.add_argument("--rules", required=True, help="JSON file with a rule list or a PUT /v1/policy body")
+    parser.add_argument("--limit", type=int, default=10000)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=POLICY_REPLAY_WORKERS)
+    args = parser.parse_args()
+
+    with open(args.rules) as f:
+        document = json.load(f)
+    rules = document["rules"] if isinstance(document, dict) else document
+    try:
+        rule_values = candidate_rules([PolicyRuleSchema(**rule) for rule in rules])
+    except HTTPException as e:
+        sys.exit(f"Invalid candidate policy: {e.detail}")
+
+    db = (ReadSessionLocal or SessionLocal)()
+    try:
+        result = replay_policy(
+            db, rule_values, args.limit, args.samples, args.workers,
+            progress=lambda count: print(f"Replayed {count} logs", end="\r", file=sys.stderr),
+        )
+    finally:
+        db.close()
+    print(file=sys.stderr)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Bulk create/update of policy rules.
+
+PUT /v1/policy replaces the rule set with whatever a policy pack contains,
+which can be thousands of rules. Rather than one SELECT, one write and one
+refresh per rule, upsert_rules() validates every rule first, resolves the
+existing rows in a single query, updates them with one executemany and
+inserts the new ones with one multi-row INSERT ... RETURNING. Regex
+patterns are compiled and probed for catastrophic backtracking (see
+app.policy_regex) before anything is written; a rule whose pattern did not
+change keeps its stored cost instead of being probed again.
+"""
+
+import enum
+from typing import Any, Dict, List
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import policy_regex
+from app.database import on_conflict_insert
+from app.models import PolicyRule, PolicyState, RiskType, Severity, Decision
+from app.schemas import PolicyRuleSchema
+
+RULE_FIELDS = (
+    "name", "description", "risk_type", "pattern", "pattern_type", "severity", "action", "enabled",
+    "pattern_cost", "version",
+)
+
+_rules = PolicyRule.__table__
+_state = PolicyState.__table__
+
+
+def rule_schema(rule: Any) -> PolicyRuleSchema:
+    """Build the API schema of a PolicyRule row."""
+    return PolicyRuleSchema(
+        id=rule.id,
+        name=rule.name,
+        description=rule.description,
+        risk_type=rule.risk_type.value,
+        pattern=rule.pattern,
+        pattern_type=rule.pattern_type,
+        severity=rule.severity.value,
+        action=rule.action.value,
+        enabled=rule.enabled,
+        pattern_cost=rule.pattern_cost,
+        version=rule.version,
+    )
+
+
+def current_version(db: Session) -> int:
+    """Return the policy version, which every change to the rules advances."""
+    return db.execute(select(_state.c.version).where(_state.c.id == 1)).scalar() or 0
+
+
+def bump_version(db: Session) -> int:
+    """
+    Advance the policy version within the caller's transaction and return it.
+
+    The counter row stays locked until commit, so concurrent policy writes
+    are serialized and each gets its own version.
+    """
+    return db.execute(
+        update(_state)
+        .where(_state.c.id == 1)
+        .values(version=_state.c.version + 1)
+        .returning(_state.c.version)
+    ).scalar_one()
+
+
+def policy_etag(version: int) -> str:
+    """Return the ETag of a policy version."""
+    return f'"policy-{version}"'
+
+
+def _rule_values(rule: PolicyRuleSchema) -> Dict[str, Any]:
+    """Convert a rule to column values, rejecting unknown enum values."""
+    try:
+        return {
+            "name": rule.name,
+            "description": rule.description,
+            "risk_type": RiskType(rule.risk_type),
+            "pattern": rule.pattern,
+            "pattern_type": rule.pattern_type,
+            "severity": Severity(rule.severity),
+            "action": Decision(rule.action),
+            "enabled": rule.enabled,
+        }
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid policy rule '{rule.name}': {str(e)}",
+        )
+
+
+def _api_value(value: Any) -> Any:
+    """Return a column value as the API represents it."""
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def _check_unique(rules: List[PolicyRuleSchema]) -> None:
+    """Reject requests that name the same rule twice."""
+    ids, names = set(), set()
+    for rule in rules:
+        if rule.id is not None:
+            if rule.id in ids:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Policy rule with id {rule.id} appears more than once",
+                )
+            ids.add(rule.id)
+        if rule.name in names:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Policy rule with name '{rule.name}' appears more than once",
+            )
+        names.add(rule.name)
+
+
+def _check_compiles(rules: List[PolicyRuleSchema]) -> None:
+    """Reject regex rules whose pattern does not compile."""
+    errors = []
+    for rule in rules:
+        if rule.pattern_type == "regex":
+            error = policy_regex.compile_error(rule.pattern)
+            if error:
+                errors.append(f"'{rule.name}': {error}")
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid regex in policy rule {'; '.join(errors)}",
+        )
+
+
+def _attach_costs(rules: List[PolicyRuleSchema], values: List[Dict[str, Any]], stored: Dict[int, Any]) -> None:
+    """Set pattern_cost on every rule's values, probing new or changed regexes."""
+    pending = []
+    for rule, row in zip(rules, values):
+        previous = stored.get(rule.id)
+        if rule.pattern_type != "regex":
+            row["pattern_cost"] = None
+        elif previous is not None and previous.pattern == rule.pattern and previous.pattern_cost:
+            row["pattern_cost"] = previous.pattern_cost
+        else:
+            pending.append((rule, row))
+
+    costs = policy_regex.analyze_patterns(rule.pattern for rule, _ in pending)
+    errors = []
+    for rule, row in pending:
+        row["pattern_cost"] = costs[rule.pattern]
+        reason = policy_regex.rejection(row["pattern_cost"])
+        if reason:
+            errors.append(f"'{rule.name}': {reason}")
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unsafe regex in policy rule {'; '.join(errors)}",
+        )
+
+
+def _insert_statement(db: Session):
+    """INSERT for new rules; a name taken concurrently is skipped rather than failing the batch."""
+    stmt = on_conflict_insert(db.get_bind(), _rules)
+    if stmt is None:
+        return insert(_rules)
+    return stmt.on_conflict_do_nothing(index_elements=["name"])
+
+
+def candidate_rules(rules: List[PolicyRuleSchema]) -> List[Dict[str, Any]]:
+    """
+    Validate rules that are evaluated without being saved, as by a policy
+    replay; return their PolicyRule column values.
+
+    Applies the same checks as upsert_rules(), so a catastrophic regex can
+    no more stall a replay than live traffic.
+    """
+    _check_unique(rules)
+    values = [_rule_values(rule) for rule in rules]
+    _check_compiles(rules)
+    _attach_costs(rules, values, {})
+    return values
+
+
+def upsert_rules(db: Session, rules: List[PolicyRuleSchema]) -> List[PolicyRuleSchema]:
+    """
+    Create or update policy rules in bulk; the caller commits.
+
+    Rules with an id update that rule (404 if it does not exist); rules
+    without one are created (400 if the name is taken). Regexes that do not
+    compile or fail the backtracking probe are rejected with 422. Nothing is
+    written unless every rule is valid. Written rules are stamped with a new
+    policy version. Returns the rules as written, in request order.
+    """
+    _check_unique(rules)
+    values = [_rule_values(rule) for rule in rules]
+    _check_compiles(rules)
+
+    ids = [rule.id for rule in rules if rule.id is not None]
+    names = [rule.name for rule in rules]
+    existing = db.execute(
+        select(_rules.c.id, _rules.c.name, _rules.c.pattern, _rules.c.pattern_cost)
+        .where(or_(_rules.c.id.in_(ids), _rules.c.name.in_(names)))
+    ).all()
+    existing_ids = {row.id for row in existing}
+    owner_of_name = {row.name: row.id for row in existing}
+
+    for rule in rules:
+        if rule.id is not None and rule.id not in existing_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Policy rule with id {rule.id} not found",
+            )
+        owner = owner_of_name.get(rule.name)
+        if owner is not None and owner != rule.id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Policy rule with name '{rule.name}' already exists",
+            )
+
+    _attach_costs(rules, values, {row.id: row for row in existing})
+
+    version = bump_version(db) if rules else current_version(db)
+    for row in values:
+        row["version"] = version
+
+    updates = [
+        {"b_id": rule.id, **row} for rule, row in zip(rules, values) if rule.id is not None
+    ]
+    if updates:
+        db.execute(
+            update(_rules).where(_rules.c.id == bindparam("b_id")),
+            updates,
+        )
+
+    created = [row for rule, row in zip(rules, values) if rule.id is None]
+    new_ids = {}
+    if created:
+        # Rows come back in no particular order, so match them up by name
+        new_ids = dict(db.execute(
+            _insert_statement(db).returning(_rules.c.name, _rules.c.id), created
+        ).all())
+        taken = [row["name"] for row in created if row["name"] not in new_ids]
+        if taken:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Policy rule with name '{taken[0]}' already exists",
+            )
+
+    return [
+        PolicyRuleSchema(
+            id=rule.id if rule.id is not None else new_ids[rule.name],
+            **{field: _api_value(row[field]) for field in RULE_FIELDS},
+        )
+        for rule, row in zip(rules, values)
+    ]
@@ -0,0 +1,112 @@
+"""
+Content-addressed storage of repeated prompt text.
+
+System prompts and templates repeat across many logged requests. With
+LOG_PROMPT_DEDUP=true, original prompts of at least
+LOG_PROMPT_DEDUP_MIN_LENGTH characters are stored once in prompt_blobs,
+keyed by their SHA-256, and request logs keep only the hash. Hashes known
+to be committed are cached in-process, so a repeated prompt costs no extra
+database round trip; a new one costs a single INSERT ... ON CONFLICT DO
+NOTHING.
+
+Archival (app.log_archive) and retention (app.log_partitions) clear or
+remove the logs referencing a blob; both then delete the blobs no log
+references any more with prune_prompt_blobs(). Cached hashes expire after
+LOG_PROMPT_BLOB_CACHE_TTL seconds, well before a blob can become
+unreferenced, so a pruned blob is always inserted again before reuse.
+"""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import delete, event, exists
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.database import on_conflict_insert
+from app.models import PromptBlob, RequestLog
+
+PROMPT_DEDUP = os.getenv("LOG_PROMPT_DEDUP", "false").lower() == "true"
+# Shorter prompts are cheaper inline than as a 64-character hash reference
+PROMPT_DEDUP_MIN_LENGTH = int(os.getenv("LOG_PROMPT_DEDUP_MIN_LENGTH", "64"))
+# Number of committed hashes remembered per process
+PROMPT_BLOB_CACHE_SIZE = int(os.getenv("LOG_PROMPT_BLOB_CACHE_SIZE", "10000"))
+# Seconds a cached hash is trusted; must stay below the archival and retention
+# windows, which are at least a day
+PROMPT_BLOB_CACHE_TTL = float(os.getenv("LOG_PROMPT_BLOB_CACHE_TTL", "3600"))
+
+# Hash -> time.monotonic() of the commit that last confirmed the blob exists
+_known_hashes: "OrderedDict[str, float]" = OrderedDict()
+# Session.info key of hashes inserted in the current transaction
+_PENDING_KEY = "pending_prompt_hashes"
+
+
+def prompt_hash(text: str) -> str:
+    """Return the prompt_blobs key of a prompt."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _remember(digest: str) -> None:
+    _known_hashes[digest] = time.monotonic()
+    _known_hashes.move_to_end(digest)
+    while len(_known_hashes) > PROMPT_BLOB_CACHE_SIZE:
+        _known_hashes.popitem(last=False)
+
+
+def _insert_if_missing(db: Session, digest: str, text: str) -> None:
+    stmt = on_conflict_insert(db.get_bind(), PromptBlob.__table__)
+    if stmt is not None:
+        db.execute(
+            stmt.values(hash=digest, body=text).on_conflict_do_nothing(index_elements=["hash"])
+        )
+        return
+
+    if db.get(PromptBlob, digest) is None:
+        db.add(PromptBlob(hash=digest, body=text))
+        db.flush()
+
+
+def store_prompt(db: Session, text: str) -> Optional[str]:
+    """
+    Make sure a prompt is in prompt_blobs and return its hash.
+
+    Returns None when deduplication is disabled or the prompt is too short,
+    in which case the caller stores the text inline.
+    """
+    if not PROMPT_DEDUP or len(text) < PROMPT_DEDUP_MIN_LENGTH:
+        return None
+
+    digest = prompt_hash(text)
+    confirmed = _known_hashes.get(digest)
+    if confirmed is not None and time.monotonic() - confirmed < PROMPT_BLOB_CACHE_TTL:
+        _known_hashes.move_to_end(digest)
+        return digest
+
+    _insert_if_missing(db, digest, text)
+    # Only cache the hash once the transaction that inserted it commits
+    db.info.setdefault(_PENDING_KEY, set()).add(digest)
+    return digest
+
+
+def prune_prompt_blobs(conn: Connection) -> int:
+    """Delete prompt blobs that no request log references; return how many."""
+    blobs = PromptBlob.__table__
+    logs = RequestLog.__table__
+    result = conn.execute(
+        delete(blobs).where(~exists().where(logs.c.prompt_hash == blobs.c.hash))
+    )
+    return result.rowcount
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_committed_hashes(session: Session) -> None:
+    for digest in session.info.pop(_PENDING_KEY, ()):
+        _remember(digest)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_hashes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -5,58 +5,230 @@ Logs endpoint router.
 from fastapi import APIRouter, Depends, Query, HTTPException, status
 from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import Optional, List
+from sqlalchemy import and_, case, func, or_, select, tuple_, text
+from typing import Optional, List, Tuple, Dict, Any, Callable, Iterable, Iterator
 from datetime import datetime
+import base64
+import binascii
 import csv
 import io
 import json
+import os
+import time
+import zlib
 
-from app.database import get_db
-from app.models import RequestLog, Decision, RiskType
+from app.database import get_read_db
+from app.firewall.firewall_core import FirewallCore
+from app.log_arrow import parquet_chunks, arrow_stream_chunks
+from app.log_archive import ArchiveError, get_store, load_bodies
+from app.log_bodies import decoded
+from app.log_search import apply_search
+from app.models import (
+    RequestLog, RequestRisk, Decision, RiskType, SEVERITY_RANKS, risk_summary, risk_type_masks,
+)
 from app.schemas import LogFilterSchema
 from app.auth import get_current_admin_user
 
 router = APIRouter()
 
+# Seconds an estimated total stays cached per filter combination
+COUNT_CACHE_TTL = float(os.getenv("LOGS_COUNT_CACHE_TTL", "60"))
+_COUNT_CACHE_MAX_ENTRIES = 1024
+_count_cache: Dict[Tuple, Tuple[float, int]] = {}
 
-@router.get("/v1/logs")
-async def get_logs(
-    type: Optional[str] = Query(None, description="Filter by risk type (PII, PHI, PROMPT_INJECTION)"),
-    severity: Optional[str] = Query(None, description="Filter by severity (high, medium, low)"),
-    date_from: Optional[str] = Query(None, description="Start date (ISO format)"),
-    date_to: Optional[str] = Query(None, description="End date (ISO format)"),
-    limit: int = Query(50, ge=1, le=1000, description="Number of logs to return"),
-    offset: int = Query(0, ge=0, description="Offset for pagination"),
-    format: str = Query("json", pattern="^(json|csv)$", description="Export format"),
-    db: Session = Depends(get_db),
-    # current_user = Depends(get_current_admin_user)  # Temporarily disabled for testing
-):
+# Rows fetched per round trip and encoded per chunk when streaming exports
+EXPORT_BATCH_SIZE = 1000
+# Rows per Parquet row group / Arrow record batch
+ARROW_BATCH_SIZE = 10000
+
+# Rows logged before migration 006 keep NULL summary columns until
+# `python -m app.log_summary` has backfilled them. Until then their summaries
+# are derived from request_risks and the prompt, in SQL for list queries and
+# in Python for whole RequestLog rows.
+_RISK_COUNT = func.coalesce(
+    RequestLog.risk_count,
+    select(func.count(RequestRisk.id))
+    .where(RequestRisk.request_log_id == RequestLog.id)
+    .scalar_subquery(),
+).label("risk_count")
+_MAX_SEVERITY = func.coalesce(
+    RequestLog.max_severity,
+    select(RequestRisk.severity)
+    .where(RequestLog.risk_count.is_(None), RequestRisk.request_log_id == RequestLog.id)
+    .order_by(case(SEVERITY_RANKS, value=RequestRisk.severity, else_=0).desc())
+    .limit(1)
+    .scalar_subquery(),
+).label("max_severity")
+_PROMPT_LENGTH = func.coalesce(
+    RequestLog.prompt_length, func.length(RequestLog.original_prompt)
+).label("prompt_length")
+
+
+def _summary(log: Any, name: str) -> Any:
+    """Return a summary column of a log, computing it for rows not yet backfilled."""
+    value = getattr(log, name)
+    if value is None and isinstance(log, RequestLog) and log.risk_count is None:
+        if name == "prompt_length":
+            return len(log.original_prompt or "")
+        return risk_summary(log.risks)[name]
+    return value
+
+
+# Serializers for every field a log can be rendered with
+LOG_FIELDS: Dict[str, Callable[[RequestLog], Any]] = {
+    "id": lambda log: log.id,
+    "request_id": lambda log: log.request_id,
+    "timestamp": lambda log: log.timestamp.isoformat() if log.timestamp else None,
+    "original_prompt": lambda log: log.original_prompt,
+    "modified_prompt": lambda log: log.modified_prompt,
+    "original_response": lambda log: log.original_response,
+    "modified_response": lambda log: log.modified_response,
+    "decision": lambda log: log.decision.value if log.decision else None,
+    "risk_count": lambda log: _summary(log, "risk_count"),
+    "max_severity": lambda log: _summary(log, "max_severity"),
+    "prompt_length": lambda log: _summary(log, "prompt_length"),
+    "risks": lambda log: log.risks if isinstance(log.risks, list) else [],
+    "metadata": lambda log: log.request_metadata if isinstance(log.request_metadata, dict) else {},
+    "archived": lambda log: log.archive_ref is not None,
+}
+# Columns each field reads; exports select only these instead of full ORM entities
+FIELD_COLUMNS: Dict[str, List[Any]] = {
+    "id": [RequestLog.id],
+    "request_id": [RequestLog.request_id],
+    "timestamp": [RequestLog.timestamp],
+    "original_prompt": [
+        RequestLog.original_prompt, RequestLog.bodies, RequestLog.prompt_hash, RequestLog.prompt_body,
+    ],
+    "modified_prompt": [
+        RequestLog.modified_prompt, RequestLog.bodies, RequestLog.prompt_hash, RequestLog.prompt_body,
+    ],
+    "original_response": [RequestLog.original_response, RequestLog.bodies],
+    "modified_response": [RequestLog.modified_response, RequestLog.bodies],
+    "decision": [RequestLog.decision],
+    "risk_count": [_RISK_COUNT],
+    "max_severity": [_MAX_SEVERITY],
+    "prompt_length": [_PROMPT_LENGTH],
+    "risks": [RequestLog.risks],
+    "metadata": [RequestLog.request_metadata],
+    "archived": [RequestLog.archive_ref],
+}
+JSON_PAGE_FIELDS = [
+    "id", "request_id", "timestamp", "original_prompt", "modified_prompt",
+    "original_response", "modified_response", "decision", "risks", "metadata",
+]
+CSV_PAGE_FIELDS = ["id", "request_id", "timestamp", "decision", "risk_count"]
+
+
+def encode_cursor(timestamp: datetime, log_id: int) -> str:
+    """Encode a (timestamp, id) position as an opaque pagination cursor."""
+    payload = json.dumps({"ts": timestamp.isoformat(), "id": log_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a pagination cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["ts"]), int(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _planner_row_estimate(db: Session) -> Optional[int]:
     """
-    Retrieve firewall logs with filtering and pagination.
-    
-    - **type**: Filter by risk type
-    - **severity**: Filter by severity level
-    - **date_from**: Start date for filtering
-    - **date_to**: End date for filtering
-    - **limit**: Number of logs to return (1-1000)
-    - **offset**: Pagination offset
-    - **format**: Export format (json or csv)
-    
-    Returns filtered and paginated logs.
+    Return PostgreSQL's planner estimate of the request_logs row count.
+
+    Autovacuum never analyzes a partitioned parent, so a partitioned table is
+    estimated as the sum of its partitions' statistics.
+    """
+    params = {"table": RequestLog.__tablename__}
+    # reltuples is -1 until a table has been vacuumed or analyzed; partitions
+    # not analyzed yet are new and count as empty, unless none has been
+    estimate = db.execute(text(
+        "SELECT CASE WHEN max(c.reltuples) < 0 THEN -1 ELSE sum(greatest(c.reltuples, 0)) END "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:table AS regclass)"
+    ), params).scalar()
+    if estimate is None:
+        # Not partitioned
+        estimate = db.execute(
+            text("SELECT reltuples FROM pg_class WHERE relname = :table"), params
+        ).scalar()
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def _estimated_count(db: Session, query, filter_key: Tuple) -> Tuple[int, bool]:
     """
+    Return an approximate total for a filtered logs query and whether it
+    is an estimate.
+
+    Unfiltered totals on PostgreSQL come from planner statistics; anything
+    else is counted exactly once and cached per filter combination for
+    COUNT_CACHE_TTL seconds. Only a count made for this request is exact:
+    a cached one may trail rows written since, so it is an estimate too.
+    """
+    now = time.monotonic()
+    cached = _count_cache.get(filter_key)
+    if cached and cached[0] > now:
+        return cached[1], True
+
+    total = None
+    if not any(filter_key) and db.get_bind().dialect.name == "postgresql":
+        total = _planner_row_estimate(db)
+    is_estimate = total is not None
+    if total is None:
+        total = query.count()
+
+    if len(_count_cache) >= _COUNT_CACHE_MAX_ENTRIES:
+        _count_cache.clear()
+    _count_cache[filter_key] = (now + COUNT_CACHE_TTL, total)
+    return total, is_estimate
+
+
+def _filtered_logs_query(
+    db: Session,
+    type: Optional[str],
+    severity: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str],
+    min_severity: Optional[str] = None,
+):
+    """Build the request log query shared by the list and export endpoints."""
     query = db.query(RequestLog)
     
-    # Apply filters
+    # Type and minimum severity match a handful of values of the indexed summary
+    # columns; rows not yet backfilled (NULL risk_count, see app.log_summary)
+    # are matched through request_risks instead
+    unsummarized = RequestLog.risk_count.is_(None)
     if type:
         try:
             risk_type = RiskType(type)
-            query = query.filter(RequestLog.risks.contains([{"type": risk_type.value}]))
+            query = query.filter(or_(
+                RequestLog.risk_types.in_(risk_type_masks(risk_type.value)),
+                and_(unsummarized, RequestLog.risk_entries.any(RequestRisk.risk_type == risk_type.value)),
+            ))
         except ValueError:
             pass
     
+    if min_severity:
+        severities = [
+            name for name, rank in SEVERITY_RANKS.items()
+            if rank >= SEVERITY_RANKS[min_severity]
+        ]
+        query = query.filter(or_(
+            RequestLog.max_severity.in_(severities),
+            and_(unsummarized, RequestLog.risk_entries.any(RequestRisk.severity.in_(severities))),
+        ))
+    
+    # An exact severity needs per-risk data: EXISTS against the indexed request_risks table
     if severity:
-        query = query.filter(RequestLog.risks.contains([{"severity": severity}]))
+        query = query.filter(RequestLog.risk_entries.any(RequestRisk.severity == severity))
     
     if date_from:
         try:
@@ -78,57 +250,374 @@ async def get_logs(
                 detail="Invalid date_to format. Use ISO format."
             )
     
-    # Get total count
-    total = query.count()
-    
-    # Apply pagination
-    logs = query.order_by(RequestLog.timestamp.desc()).offset(offset).limit(limit).all()
-    
-    # Format logs
-    log_data = [
-        {
-            "id": log.id,
-            "request_id": log.request_id,
-            "timestamp": log.timestamp.isoformat() if log.timestamp else None,
-            "original_prompt": log.original_prompt,
-            "modified_prompt": log.modified_prompt,
-            "original_response": log.original_response,
-            "modified_response": log.modified_response,
-            "decision": log.decision.value if log.decision else None,
-            "risks": log.risks if isinstance(log.risks, list) else [],
-            "metadata": log.request_metadata if isinstance(log.request_metadata, dict) else {}
-        }
-        for log in logs
-    ]
+    return query
+
+
+def _parse_fields(fields: str) -> List[str]:
+    """Validate a comma-separated field list against LOG_FIELDS."""
+    selected = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in LOG_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid fields '{fields}'. Available fields: {', '.join(LOG_FIELDS)}"
+        )
+    return selected
+
+
+def _columns_for(fields: List[str]) -> List[Any]:
+    """Return the distinct columns needed to render the given fields."""
+    columns = []
+    for name in fields:
+        for column in FIELD_COLUMNS[name]:
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def _serialize_log(log: RequestLog, fields: List[str]) -> Dict[str, Any]:
+    """Render a log with the requested fields."""
+    log = decoded(log)
+    return {name: LOG_FIELDS[name](log) for name in fields}
+
+
+def _csv_chunks(rows: Iterable[Dict[str, Any]], fields: List[str]) -> Iterator[str]:
+    """Encode rows as CSV, yielding one chunk per EXPORT_BATCH_SIZE rows."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    for index, row in enumerate(rows, 1):
+        writer.writerow({
+            name: json.dumps(value) if isinstance(value, (list, dict)) else value
+            for name, value in row.items()
+        })
+        if index % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_chunks(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Encode rows as newline-delimited JSON, one chunk per EXPORT_BATCH_SIZE rows."""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(row) + "\n")
+        if len(lines) == EXPORT_BATCH_SIZE:
+            yield "".join(lines)
+            lines = []
+    yield "".join(lines)
+
+
+def _gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Gzip a stream of text chunks incrementally."""
+    # wbits=31 selects the gzip container rather than raw zlib
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode())
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+@router.get("/v1/logs")
+async def get_logs(
+    type: Optional[str] = Query(None, description="Filter by risk type (PII, PHI, PROMPT_INJECTION)"),
+    severity: Optional[str] = Query(None, description="Filter by severity (high, medium, low)"),
+    min_severity: Optional[str] = Query(
+        None, pattern="^(low|medium|high)$", description="Only logs with a risk at least this severe"
+    ),
+    date_from: Optional[str] = Query(None, description="Start date (ISO format)"),
+    date_to: Optional[str] = Query(None, description="End date (ISO format)"),
+    limit: int = Query(50, ge=1, le=1000, description="Number of logs to return"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    format: str = Query("json", pattern="^(json|csv)$", description="Export format"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return (default: all list fields)"
+    ),
+    count: str = Query(
+        "estimated",
+        pattern="^(exact|estimated|none)$",
+        description="How to compute total: exact COUNT(*), cached estimate, or skip"
+    ),
+    db: Session = Depends(get_read_db),
+    # current_user = Depends(get_current_admin_user)  # Temporarily disabled for testing
+):
+    """
+    Retrieve firewall logs with filtering and pagination.
+    
+    - **type**: Filter by risk type
+    - **severity**: Filter by severity level
+    - **min_severity**: Only logs whose most severe risk is at least this level
+    - **date_from**: Start date for filtering
+    - **date_to**: End date for filtering
+    - **limit**: Number of logs to return (1-1000)
+    - **offset**: Pagination offset
+    - **cursor**: Keyset pagination cursor (use instead of offset for deep pages)
+    - **format**: Export format (json or csv)
+    - **fields**: Only select and return these fields, e.g.
+      ``id,timestamp,decision,risk_count`` for list views
+    - **count**: Total mode (exact, estimated, none); totals taken from
+      planner statistics or a cached count rather than counted for this
+      request are flagged with ``total_is_estimate``
+    
+    Returns filtered and paginated logs. Every JSON page includes a
+    ``next_cursor`` that fetches the following page without scanning the
+    rows before it. Use ``GET /v1/logs/{log_id}`` for a single full log.
+    """
+    if fields:
+        selected = _parse_fields(fields)
+    else:
+        selected = CSV_PAGE_FIELDS if format == "csv" else JSON_PAGE_FIELDS
+
+    if cursor and offset:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor and offset cannot be combined"
+        )
+
+    query = _filtered_logs_query(db, type, severity, date_from, date_to, min_severity)
+    
+    # Get total count; has_more does not depend on it
+    total = None
+    total_is_estimate = False
+    if format == "json":
+        if count == "exact":
+            total = query.count()
+        elif count == "estimated":
+            total, total_is_estimate = _estimated_count(
+                db, query, (type, severity, date_from, date_to, min_severity)
+            )
+    
+    # Select only the requested columns (plus the cursor keys) rather than whole rows
+    columns = _columns_for(selected)
+    for key in (RequestLog.id, RequestLog.timestamp):
+        if key not in columns:
+            columns.append(key)
+    query = query.with_entities(*columns)
+
+    # Apply pagination; the id tiebreaker keeps the order total so cursors are stable
+    query = query.order_by(RequestLog.timestamp.desc(), RequestLog.id.desc())
+    if cursor:
+        cursor_timestamp, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(RequestLog.timestamp, RequestLog.id) < tuple_(cursor_timestamp, cursor_id),
+            # Plain range predicate so PostgreSQL can prune newer partitions
+            RequestLog.timestamp <= cursor_timestamp
+        )
+    else:
+        query = query.offset(offset)
+    # Fetch one extra row to learn whether another page exists
+    logs = query.limit(limit + 1).all()
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+
+    next_cursor = None
+    if has_more:
+        next_cursor = encode_cursor(logs[-1].timestamp, logs[-1].id)
     
     # Handle export formats
     if format == "csv":
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=[
-            "id", "request_id", "timestamp", "decision", "risk_count"
-        ])
-        writer.writeheader()
-        for log in log_data:
-            writer.writerow({
-                "id": log["id"],
-                "request_id": log["request_id"],
-                "timestamp": log["timestamp"],
-                "decision": log["decision"],
-                "risk_count": len(log["risks"])
-            })
-        output.seek(0)
         return StreamingResponse(
-            iter([output.getvalue()]),
+            _csv_chunks((_serialize_log(log, selected) for log in logs), selected),
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=logs.csv"}
         )
     
     # Default JSON response
     return {
-        "logs": log_data,
+        "logs": [_serialize_log(log, selected) for log in logs],
         "total": total,
+        "total_is_estimate": total_is_estimate,
         "limit": limit,
         "offset": offset,
-        "has_more": (offset + limit) < total
+        "has_more": has_more,
+        "next_cursor": next_cursor
     }
 
+
+
+@router.get("/v1/logs/export")
+async def export_logs(
+    type: Optional[str] = Query(None, description="Filter by risk type (PII, PHI, PROMPT_INJECTION)"),
+    severity: Optional[str] = Query(None, description="Filter by severity (high, medium, low)"),
+    min_severity: Optional[str] = Query(
+        None, pattern="^(low|medium|high)$", description="Only logs with a risk at least this severe"
+    ),
+    date_from: Optional[str] = Query(None, description="Start date (ISO format)"),
+    date_to: Optional[str] = Query(None, description="End date (ISO format)"),
+    format: str = Query(
+        "csv", pattern="^(csv|ndjson|parquet|arrow)$", description="Export format"
+    ),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export (default: all)"),
+    gzip: bool = Query(False, description="Gzip-compress the export (csv and ndjson only)"),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_admin_user),
+):
+    """
+    Stream every log matching the filters as CSV, NDJSON, Parquet or Arrow.
+    
+    - **type**, **severity**, **min_severity**, **date_from**, **date_to**: Same
+      filters as /v1/logs
+    - **format**: csv, ndjson, parquet (zstd-compressed) or arrow (IPC stream)
+    - **fields**: Comma-separated subset of fields (default: all)
+    - **gzip**: Compress csv/ndjson streams on the fly
+    
+    Rows are read through a server-side cursor in batches and encoded
+    incrementally, so memory use does not grow with the size of the export.
+    Parquet and Arrow exports keep risks as a typed list of structs. Logs
+    flagged ``archived`` have had their text moved to cold storage and are
+    exported without it.
+
+    Requires admin authentication: exports include the original, unredacted
+    prompt and response text.
+    """
+    selected = _parse_fields(fields) if fields else list(LOG_FIELDS)
+    if gzip and format in ("parquet", "arrow"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="gzip applies to csv and ndjson exports only"
+        )
+
+    # Plain rows of just the selected columns; the field serializers read them by attribute
+    query = _filtered_logs_query(db, type, severity, date_from, date_to, min_severity)
+    query = query.with_entities(*_columns_for(selected)).order_by(
+        RequestLog.timestamp.desc(), RequestLog.id.desc()
+    )
+
+    if format in ("parquet", "arrow"):
+        logs = query.yield_per(ARROW_BATCH_SIZE)
+        if format == "parquet":
+            binary_chunks = parquet_chunks(logs, selected, ARROW_BATCH_SIZE)
+            media_type = "application/vnd.apache.parquet"
+            filename = "logs.parquet"
+        else:
+            binary_chunks = arrow_stream_chunks(logs, selected, ARROW_BATCH_SIZE)
+            media_type = "application/vnd.apache.arrow.stream"
+            filename = "logs.arrows"
+        return StreamingResponse(
+            binary_chunks,
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+
+    rows = (_serialize_log(log, selected) for log in query.yield_per(EXPORT_BATCH_SIZE))
+    if format == "csv":
+        chunks = _csv_chunks(rows, selected)
+        media_type = "text/csv"
+        filename = "logs.csv"
+    else:
+        chunks = _ndjson_chunks(rows)
+        media_type = "application/x-ndjson"
+        filename = "logs.ndjson"
+
+    if gzip:
+        return StreamingResponse(
+            _gzip_chunks(chunks),
+            media_type="application/gzip",
+            headers={"Content-Disposition": f"attachment; filename={filename}.gz"}
+        )
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@router.get("/v1/logs/search")
+async def search_logs(
+    q: str = Query(..., min_length=1, description="Words or \"quoted phrases\" to search for"),
+    type: Optional[str] = Query(None, description="Filter by risk type (PII, PHI, PROMPT_INJECTION)"),
+    severity: Optional[str] = Query(None, description="Filter by severity (high, medium, low)"),
+    min_severity: Optional[str] = Query(
+        None, pattern="^(low|medium|high)$", description="Only logs with a risk at least this severe"
+    ),
+    date_from: Optional[str] = Query(None, description="Start date (ISO format)"),
+    date_to: Optional[str] = Query(None, description="End date (ISO format)"),
+    order: str = Query("rank", pattern="^(rank|recent)$", description="Sort by relevance or recency"),
+    limit: int = Query(50, ge=1, le=1000, description="Number of logs to return"),
+    offset: int = Query(0, ge=0, description="Offset for pagination"),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return (default: id, request_id, timestamp, decision, risk_count)"
+    ),
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_admin_user),
+):
+    """
+    Search the original prompt and response text of logs.
+    
+    - **q**: Search terms; on PostgreSQL also "quoted phrases", ``or`` and
+      ``-excluded`` words
+    - **type**, **severity**, **min_severity**, **date_from**, **date_to**:
+      Same filters as /v1/logs
+    - **order**: ``rank`` (most relevant first) or ``recent``; prefer
+      ``recent`` for very common terms, which it answers without ranking
+      every match
+    - **limit**, **offset**: Pagination
+    - **fields**: Fields to return with each hit, as in /v1/logs
+    
+    Hits come from a full-text index maintained as logs are written, and
+    each includes its relevance ``rank``.
+
+    Requires admin authentication: the search covers unredacted text.
+    """
+    if not q.split():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query must contain at least one word"
+        )
+    selected = _parse_fields(fields) if fields else CSV_PAGE_FIELDS
+
+    query = _filtered_logs_query(db, type, severity, date_from, date_to, min_severity)
+    query, rank = apply_search(db, query, q)
+
+    columns = _columns_for(selected)
+    query = query.with_entities(*columns, rank.label("rank"))
+    if order == "rank":
+        query = query.order_by(rank.desc(), RequestLog.id.desc())
+    else:
+        query = query.order_by(RequestLog.timestamp.desc(), RequestLog.id.desc())
+    # Fetch one extra row to learn whether another page exists
+    hits = query.offset(offset).limit(limit + 1).all()
+    has_more = len(hits) > limit
+    hits = hits[:limit]
+
+    return {
+        "logs": [{**_serialize_log(hit, selected), "rank": hit.rank} for hit in hits],
+        "limit": limit,
+        "offset": offset,
+        "has_more": has_more
+    }
+
+
+@router.get("/v1/logs/{log_id}")
+async def get_log(
+    log_id: int,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_admin_user),
+):
+    """
+    Retrieve a single log with every field, including full prompt and
+    response text. Text moved to cold storage is read back from the archive.
+    The decision's explanation is not stored; it is built from the logged risks.
+
+    Requires admin authentication.
+    """
+    log = db.query(RequestLog).filter(RequestLog.id == log_id).first()
+    if not log:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Log with id {log_id} not found"
+        )
+    data = _serialize_log(log, list(LOG_FIELDS))
+    data["explanation"] = FirewallCore.explain_risks(data["risks"])
+    if log.archive_ref:
+        try:
+            data.update(load_bodies(get_store(), log))
+        except ArchiveError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
+    return data
@@ -2,47 +2,70 @@
 Policy endpoints router.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
-from app.schemas import PolicyResponse, PolicyRuleSchema
-from app.database import get_db
-from app.models import PolicyRule, RiskType, Severity, Decision
+from typing import List, Optional
+from app.schemas import PolicyReplayRequest, PolicyReplayResponse, PolicyResponse
+from app.database import get_db, get_read_db
+from app.models import PolicyRule
+from app import policy_replay
+from app.policy_rules import candidate_rules, current_version, policy_etag, rule_schema, upsert_rules
 from app.auth import get_current_admin_user
 
 router = APIRouter()
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header covers the given ETag."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
 @router.get("/v1/policy", response_model=PolicyResponse)
-async def get_policy_rules(db: Session = Depends(get_db)):
+async def get_policy_rules(
+    response: Response,
+    since_version: Optional[int] = Query(
+        None, ge=0, description="Only return rules changed after this policy version"
+    ),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db)
+):
     """
     Retrieve all policy rules.
 
-    Returns a list of all configured policy rules.
+    Returns a list of all configured policy rules with the current policy
+    version, which is also the response's ETag.
+
+    - **since_version**: Only return rules created or changed after this
+      version (disabled rules are included, so pollers see them turn off)
+    - **If-None-Match**: 304 Not Modified without a body while the policy is
+      still at that ETag's version
     """
-    rules = db.query(PolicyRule).all()
-
-    rule_schemas = [
-        PolicyRuleSchema(
-            id=rule.id,
-            name=rule.name,
-            description=rule.description,
-            risk_type=rule.risk_type.value,
-            pattern=rule.pattern,
-            pattern_type=rule.pattern_type,
-            severity=rule.severity.value,
-            action=rule.action.value,
-            enabled=rule.enabled,
-        )
-        for rule in rules
-    ]
+    version = current_version(db)
+    etag = policy_etag(version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    return PolicyResponse(rules=rule_schemas)
+    query = db.query(PolicyRule)
+    if since_version is not None:
+        query = query.filter(PolicyRule.version > since_version)
+    # Read after the version: a concurrent change can only make the rules
+    # newer than the version returned, so an incremental poller never misses one
+    rules = query.order_by(PolicyRule.id).all()
+
+    rule_schemas = [rule_schema(rule) for rule in rules]
+
+    response.headers.update(headers)
+    return PolicyResponse(rules=rule_schemas, version=version)
 
 
 @router.put("/v1/policy", response_model=PolicyResponse)
-async def update_policy_rules(
+def update_policy_rules(
     request: PolicyResponse,
+    response: Response,
     db: Session = Depends(get_db),
     # current_user = Depends(get_current_admin_user)  # Temporarily disabled for testing
 ):
@@ -51,52 +74,19 @@ async def update_policy_rules(
 
     - **rules**: List of policy rules to create or update
 
+    Rules are validated and written in bulk: either every rule is applied or,
+    if any rule is invalid, unknown or clashes with an existing name, none is.
+    Validation probes regex patterns in subprocesses, so this is a plain def
+    that runs on a worker thread rather than blocking the event loop.
+
     Requires admin authentication.
     """
-    updated_rules = []
-
-    for rule_data in request.rules:
-        if rule_data.id:
-            rule = db.query(PolicyRule).filter_by(id=rule_data.id).first()
-            if not rule:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Policy rule with id {rule_data.id} not found",
-                )
-            rule.name = rule_data.name
-            rule.description = rule_data.description
-            rule.risk_type = RiskType(rule_data.risk_type)
-            rule.pattern = rule_data.pattern
-            rule.pattern_type = rule_data.pattern_type
-            rule.severity = Severity(rule_data.severity)
-            rule.action = Decision(rule_data.action)
-            rule.enabled = rule_data.enabled
-        else:
-            existing = db.query(PolicyRule).filter_by(name=rule_data.name).first()
-            if existing:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Policy rule with name '{rule_data.name}' already exists",
-                )
-
-            rule = PolicyRule(
-                name=rule_data.name,
-                description=rule_data.description,
-                risk_type=RiskType(rule_data.risk_type),
-                pattern=rule_data.pattern,
-                pattern_type=rule_data.pattern_type,
-                severity=Severity(rule_data.severity),
-                action=Decision(rule_data.action),
-                enabled=rule_data.enabled,
-            )
-            db.add(rule)
-
-        updated_rules.append(rule)
-
     try:
+        rule_schemas = upsert_rules(db, request.rules)
         db.commit()
-        for rule in updated_rules:
-            db.refresh(rule)
+    except HTTPException:
+        db.rollback()
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
@@ -104,19 +94,35 @@ async def update_policy_rules(
             detail=f"Error updating policy rules: {str(e)}",
         )
 
-    rule_schemas = [
-        PolicyRuleSchema(
-            id=rule.id,
-            name=rule.name,
-            description=rule.description,
-            risk_type=rule.risk_type.value,
-            pattern=rule.pattern,
-            pattern_type=rule.pattern_type,
-            severity=rule.severity.value,
-            action=rule.action.value,
-            enabled=rule.enabled,
-        )
-        for rule in updated_rules
-    ]
+    version = rule_schemas[0].version if rule_schemas else current_version(db)
+    response.headers["ETag"] = policy_etag(version)
+    return PolicyResponse(rules=rule_schemas, version=version)
+
+
+@router.post("/v1/policy/replay", response_model=PolicyReplayResponse)
+def replay_policy_rules(
+    request: PolicyReplayRequest,
+    db: Session = Depends(get_read_db),
+    current_user = Depends(get_current_admin_user),
+):
+    """
+    Dry-run a candidate policy against logged requests (admin only).
 
-    return PolicyResponse(rules=rule_schemas)
+    - **rules**: Candidate policy rules, validated like PUT /v1/policy but not
+      saved, and applied over the saved rules by name
+    - **limit**: Number of most recent logs to replay
+    - **samples**: Number of changed requests to return as examples
+
+    Each log is evaluated with the saved rules and with the candidate policy.
+    Returns decision counts before and after, changes by transition and
+    sample changed requests. Logs are evaluated in a process pool of at most
+    POLICY_REPLAY_API_WORKERS processes; this is a plain def so the replay
+    runs on a worker thread rather than blocking the event loop.
+
+    Requires admin authentication.
+    """
+    rule_values = candidate_rules(request.rules)
+    workers = min(policy_replay.POLICY_REPLAY_WORKERS, policy_replay.POLICY_REPLAY_API_WORKERS)
+    return PolicyReplayResponse(
+        **policy_replay.replay_policy(db, rule_values, request.limit, request.samples, workers)
+    )
@@ -2,14 +2,16 @@
 Query endpoint router.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 import logging
+from datetime import datetime
 from app.schemas import QueryRequest, QueryResponse
 from app.firewall.firewall_core import FirewallCore
 from app.database import get_db
-from app.models import RequestLog, Decision
+from app.models import RequestLog, RequestRisk, Decision
+from app import log_bodies, log_rollups, log_search, log_tiers, prompt_blobs
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -17,9 +19,48 @@ logger = logging.getLogger(__name__)
 firewall = FirewallCore()
 
 
+def _build_request_log(db: Session, request: QueryRequest, result: dict, tier: str) -> RequestLog:
+    """Build the log row of a processed request for the given logging tier."""
+    prompt = request.prompt or ""
+    risks = result["risks"]
+    if tier == log_tiers.METADATA:
+        bodies = {"original_prompt": "", "prompt_length": len(prompt)}
+        risks = log_tiers.strip_matches(risks)
+    else:
+        try:
+            prompt_hash = prompt_blobs.store_prompt(db, prompt)
+        except SQLAlchemyError as e:
+            db.rollback()
+            logger.error(f"Failed to store shared prompt body: {str(e)}", exc_info=True)
+            prompt_hash = None
+        bodies = {
+            "prompt_hash": prompt_hash,
+            **log_bodies.body_columns(
+                prompt,
+                result["promptModified"],
+                request.response,
+                result.get("responseModified"),
+                shared_prompt=prompt_hash is not None
+            ),
+        }
+    
+    return RequestLog(
+        request_id=result["metadata"]["requestId"],
+        **bodies,
+        decision=Decision(result["decision"]),
+        risks=risks,
+        request_metadata={
+            **result["metadata"],
+            **log_tiers.tier_metadata(result["decision"], tier)
+        },
+        risk_entries=[RequestRisk.from_risk_dict(risk) for risk in risks]
+    )
+
+
 @router.post("/v1/query", response_model=QueryResponse)
 async def process_query(
     request: QueryRequest,
+    explain: bool = Query(False, description="Include the human-readable explanation"),
     db: Session = Depends(get_db)
 ):
     """
@@ -28,8 +69,10 @@ async def process_query(
     - **prompt**: User's input prompt (optional)
     - **response**: Model's response (optional)
     
-    Returns firewall decision, modified text, detected risks, and explanation.
-    All requests are logged to the database for review in the admin console.
+    Returns firewall decision, modified text and detected risks. The overall
+    explanation is only built with `?explain=true`; it is null otherwise.
+    Requests are logged to the database for review in the admin console;
+    allowed requests may be logged without text or sampled (LOG_ALLOW_TIER).
     """
     if not request.prompt and not request.response:
         raise HTTPException(
@@ -39,26 +82,32 @@ async def process_query(
     
     result = firewall.process(
         prompt=request.prompt,
-        response=request.response
+        response=request.response,
+        explain=explain
     )
     
-    # Save request log to database for admin console
-    request_log = RequestLog(
-        request_id=result["metadata"]["requestId"],
-        original_prompt=request.prompt or "",
-        modified_prompt=result["promptModified"],
-        original_response=request.response,
-        modified_response=result.get("responseModified"),
-        decision=Decision(result["decision"]),
-        risks=result["risks"],
-        request_metadata=result["metadata"]
+    log_rollups.record_request(
+        datetime.fromisoformat(result["metadata"]["timestamp"].replace('Z', '+00:00')),
+        result["decision"],
+        result["risks"]
     )
     
+    # Save request log to database for admin console, as far as its tier allows
+    tier = log_tiers.choose_tier(result["decision"])
+    request_log = None
+    if tier != log_tiers.SKIPPED:
+        request_log = _build_request_log(db, request, result, tier)
+    
     try:
-        db.add(request_log)
-        db.commit()
-        db.refresh(request_log)
-        logger.info(f"Request logged successfully: {result['metadata']['requestId']}")
+        if request_log is not None:
+            db.add(request_log)
+            if tier == log_tiers.FULL:
+                log_search.index_log(
+                    db, request_log, log_search.search_text(request.prompt, request.response)
+                )
+            db.commit()
+            db.refresh(request_log)
+            logger.info(f"Request logged successfully: {result['metadata']['requestId']}")
     except SQLAlchemyError as e:
         db.rollback()
         logger.error(f"Failed to save request log to database: {str(e)}", exc_info=True)
@@ -66,5 +115,11 @@ async def process_query(
         db.rollback()
         logger.error(f"Unexpected error saving request log: {str(e)}", exc_info=True)
     
+    # Rollup counts are written in their own transaction, after the log's
+    try:
+        log_rollups.flush_if_due(db)
+    except SQLAlchemyError as e:
+        logger.error(f"Failed to write stats rollups, will retry: {str(e)}", exc_info=True)
+    
     return QueryResponse(**result)
 
@@ -0,0 +1,131 @@
+"""
+Stats endpoint router.
+"""
+
+from fastapi import APIRouter, Depends, Query, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+
+from app import log_rollups, log_tiers
+from app.database import get_read_db
+from app.models import DecisionRollup, RiskRollup
+from app.auth import get_current_admin_user
+
+router = APIRouter()
+
+# Range returned when date_from is omitted
+DEFAULT_WINDOWS = {
+    "minute": timedelta(hours=1),
+    "hour": timedelta(days=7),
+    "day": timedelta(days=90),
+}
+
+
+def _parse_date(value: str, name: str) -> datetime:
+    """Parse an ISO date parameter, treating naive values as UTC."""
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {name} format. Use ISO format."
+        )
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+@router.get("/v1/stats")
+async def get_stats(
+    granularity: str = Query("hour", pattern="^(minute|hour|day)$", description="Bucket size"),
+    date_from: Optional[str] = Query(None, description="Start date (ISO format)"),
+    date_to: Optional[str] = Query(None, description="End date (ISO format)"),
+    db: Session = Depends(get_read_db),
+    # current_user = Depends(get_current_admin_user)  # Temporarily disabled for testing
+):
+    """
+    Retrieve decision and risk counts over time.
+
+    - **granularity**: minute, hour or day buckets
+    - **date_from**: Start date, rounded down to the start of its bucket (default: 1 hour, 7 days or 90 days before date_to)
+    - **date_to**: End date (default: now)
+
+    Served from rollup tables maintained as requests are logged, so the cost
+    depends on the number of buckets rather than the number of logs. Counts
+    can trail requests by up to LOG_ROLLUP_FLUSH_SECONDS.
+    """
+    end = _parse_date(date_to, "date_to") if date_to else datetime.now(timezone.utc)
+    start = _parse_date(date_from, "date_from") if date_from else end - DEFAULT_WINDOWS[granularity]
+    # Include the bucket containing start rather than only those beginning after it
+    start = log_rollups.bucket_start(start, granularity)
+
+    decisions = (
+        db.query(DecisionRollup.bucket_start, DecisionRollup.decision, DecisionRollup.count)
+        .filter(
+            DecisionRollup.granularity == granularity,
+            DecisionRollup.bucket_start >= start,
+            DecisionRollup.bucket_start <= end,
+        )
+        .order_by(DecisionRollup.bucket_start, DecisionRollup.decision)
+        .all()
+    )
+    risks = (
+        db.query(
+            RiskRollup.bucket_start,
+            RiskRollup.risk_type,
+            RiskRollup.severity,
+            RiskRollup.pattern_name,
+            RiskRollup.count,
+        )
+        .filter(
+            RiskRollup.granularity == granularity,
+            RiskRollup.bucket_start >= start,
+            RiskRollup.bucket_start <= end,
+        )
+        .order_by(
+            RiskRollup.bucket_start,
+            RiskRollup.risk_type,
+            RiskRollup.severity,
+            RiskRollup.pattern_name,
+        )
+        .all()
+    )
+
+    return {
+        "granularity": granularity,
+        "date_from": start.isoformat(),
+        "date_to": end.isoformat(),
+        "decisions": [
+            {"bucket": row.bucket_start.isoformat(), "decision": row.decision, "count": row.count}
+            for row in decisions
+        ],
+        "risks": [
+            {
+                "bucket": row.bucket_start.isoformat(),
+                "risk_type": row.risk_type,
+                "severity": row.severity,
+                "pattern_name": row.pattern_name or None,
+                "count": row.count,
+            }
+            for row in risks
+        ],
+    }
+
+
+@router.get("/v1/stats/logging")
+async def get_logging_stats(
+    # current_user = Depends(get_current_admin_user)  # Temporarily disabled for testing
+):
+    """
+    Report the logging tier policy and how many requests this process has
+    logged in full, logged as metadata only, or skipped.
+    """
+    return {
+        "allow_tier": log_tiers.LOG_ALLOW_TIER,
+        "allow_sample_rate": log_tiers.LOG_ALLOW_SAMPLE_RATE,
+        "counts": {
+            tier: log_tiers.tier_counts[tier]
+            for tier in (log_tiers.FULL, log_tiers.METADATA, log_tiers.SKIPPED)
+        },
+    }
@@ -25,6 +25,7 @@ class RiskSchema(BaseModel):
     """Schema for risk information."""
     type: str = Field(..., description="Type of risk (PII, PHI, PROMPT_INJECTION, etc.)")
     severity: str = Field(..., description="Severity level (high, medium, low)")
+    pattern_name: Optional[str] = Field(None, description="Name of the detection pattern that matched")
     match: str = Field(..., description="The matched text")
     position: Dict[str, int] = Field(..., description="Start and end positions")
     explanation: str = Field(..., description="Explanation of the risk")
@@ -36,7 +37,7 @@ class QueryResponse(BaseModel):
     promptModified: Optional[str] = Field(None, description="Modified prompt (if redacted/blocked)")
     responseModified: Optional[str] = Field(None, description="Modified response (if redacted/blocked)")
     risks: List[RiskSchema] = Field(..., description="List of detected risks")
-    explanation: str = Field(..., description="Human-readable explanation")
+    explanation: Optional[str] = Field(None, description="Human-readable explanation (with ?explain=true)")
     metadata: Dict[str, Any] = Field(..., description="Request metadata (requestId, timestamp)")
 
 
@@ -51,11 +52,48 @@ class PolicyRuleSchema(BaseModel):
     severity: str
     action: str
     enabled: bool = True
+    # Measured when the rule is saved; ignored on input
+    pattern_cost: Optional[Dict[str, Any]] = None
+    # Policy version of the rule's last change; ignored on input
+    version: Optional[int] = None
 
 
 class PolicyResponse(BaseModel):
     """Response schema for policy endpoints."""
     rules: List[PolicyRuleSchema]
+    # Current policy version; ignored on input
+    version: Optional[int] = None
+
+
+class PolicyReplayRequest(BaseModel):
+    """Request schema for replaying a candidate policy against logged requests."""
+    rules: List[PolicyRuleSchema]
+    limit: int = Field(10000, ge=1, le=1_000_000)
+    samples: int = Field(20, ge=0, le=200)
+
+
+class PolicyReplaySample(BaseModel):
+    """A logged request whose decision the candidate policy changes."""
+    log_id: int
+    request_id: str
+    timestamp: Optional[str] = None
+    before: str
+    after: str
+    risks: List[str]
+    prompt_before: Optional[str] = None
+    prompt_after: Optional[str] = None
+
+
+class PolicyReplayResponse(BaseModel):
+    """Response schema for a policy replay."""
+    evaluated: int
+    skipped: int
+    changed: int
+    before: Dict[str, int]
+    after: Dict[str, int]
+    transitions: Dict[str, int]
+    samples: List[PolicyReplaySample]
+    duration_seconds: float
 
 
 class LogFilterSchema(BaseModel):
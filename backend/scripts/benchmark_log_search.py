@@ -0,0 +1,104 @@
+"""
+Benchmark GET /v1/logs/search latency.
+
+Seeds DATABASE_URL with synthetic logs whose prompts and responses are
+realistic support/analytics text (default 1,000,000 logs), indexes them the
+same way the write path does, and reports median latency for rare, common
+and phrase queries in both rank and recent order.
+"""
+
+import argparse
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, text
+
+from app.database import SessionLocal, engine, Base
+from app.log_search import SEARCH_CONFIG
+from app.main import app
+from app.models import RequestLog, Decision
+from benchmark_log_storage import synthetic_text
+from benchmark_logs_pagination import time_request
+
+QUERIES = [
+    "kangaroo",                     # rare: planted in 0.1% of logs
+    "deployment",                   # common
+    '"overdue contract signature"', # phrase
+]
+
+
+def seed_search_logs(db, rows: int, batch_size: int = 10000):
+    """Insert and index synthetic logs until the table holds at least `rows` rows."""
+    rng = random.Random(11)
+    existing = db.query(func.count(RequestLog.id)).scalar()
+    start = datetime.utcnow() - timedelta(seconds=rows)
+
+    for batch_start in range(existing, rows, batch_size):
+        batch_end = min(batch_start + batch_size, rows)
+        batch = []
+        for i in range(batch_start, batch_end):
+            prompt = synthetic_text(rng, rng.randint(1, 8), 0.1)
+            if rng.random() < 0.001:
+                prompt += " Does the kangaroo mascot need a license?"
+            batch.append({
+                "request_id": str(uuid.uuid4()),
+                "timestamp": start + timedelta(seconds=i),
+                "original_prompt": prompt,
+                "original_response": synthetic_text(rng, rng.randint(1, 6), 0.0),
+                "decision": Decision.allow,
+                "risks": [],
+                "request_metadata": {},
+            })
+        db.execute(insert(RequestLog), batch)
+        db.commit()
+        print(f"Seeded {batch_end}/{rows} logs", end="\r")
+    print()
+
+    # Index everything not indexed yet, as app.log_search does on insert
+    if engine.dialect.name == "postgresql":
+        db.execute(text(
+            f"UPDATE request_logs SET search_vector = to_tsvector('{SEARCH_CONFIG}', "
+            "original_prompt || chr(10) || coalesce(original_response, '')) "
+            "WHERE search_vector IS NULL"
+        ))
+        db.execute(text("ANALYZE request_logs"))
+    else:
+        db.execute(text(
+            "INSERT INTO request_logs_fts (rowid, body) "
+            "SELECT id, original_prompt || char(10) || coalesce(original_response, '') "
+            "FROM request_logs WHERE id > coalesce((SELECT max(rowid) FROM request_logs_fts), 0)"
+        ))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed_search_logs(db, args.rows)
+    finally:
+        db.close()
+
+    client = TestClient(app)
+    print(f"{'query':<34}{'order':<8}{'median ms':>12}")
+    for query in QUERIES:
+        for order in ("rank", "recent"):
+            url = f"/v1/logs/search?q={query}&order={order}&limit={args.limit}"
+            print(f"{query:<34}{order:<8}{time_request(client, url, args.repeat):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark /v1/logs/export throughput and size for each export format.
+
+Seeds DATABASE_URL with synthetic request logs (if it holds fewer than
+--rows) and reports wall time and payload size of a full export in each
+format.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal, engine, Base
+from app.main import app
+from benchmark_logs_pagination import seed_logs
+
+EXPORTS = [
+    ("csv", "format=csv"),
+    ("csv.gz", "format=csv&gzip=true"),
+    ("ndjson", "format=ndjson"),
+    ("ndjson.gz", "format=ndjson&gzip=true"),
+    ("parquet", "format=parquet"),
+    ("arrow", "format=arrow"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed_logs(db, args.rows)
+    finally:
+        db.close()
+
+    client = TestClient(app)
+    print(f"{'format':<12}{'seconds':>10}{'MB':>10}")
+    for name, query in EXPORTS:
+        started = time.perf_counter()
+        size = 0
+        with client.stream("GET", f"/v1/logs/export?{query}") as response:
+            response.raise_for_status()
+            for chunk in response.iter_raw():
+                size += len(chunk)
+        elapsed = time.perf_counter() - started
+        print(f"{name:<12}{elapsed:>10.2f}{size / 1_000_000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
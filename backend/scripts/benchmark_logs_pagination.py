@@ -0,0 +1,110 @@
+"""
+Benchmark offset vs cursor pagination on the /v1/logs endpoint.
+
+Seeds DATABASE_URL with synthetic request logs (if it holds fewer than
+--rows) and reports median page-fetch latency for the first page and a deep
+page using both pagination modes.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert
+
+from app.database import SessionLocal, engine, Base
+from app.main import app
+from app.models import RequestLog, Decision
+from app.routers.logs import encode_cursor
+
+
+def seed_logs(db, rows: int, batch_size: int = 10000):
+    """Insert synthetic logs until the table holds at least `rows` rows."""
+    existing = db.query(func.count(RequestLog.id)).scalar()
+    start = datetime.utcnow() - timedelta(seconds=rows)
+
+    for batch_start in range(existing, rows, batch_size):
+        batch_end = min(batch_start + batch_size, rows)
+        db.execute(
+            insert(RequestLog),
+            [
+                {
+                    "request_id": str(uuid.uuid4()),
+                    "timestamp": start + timedelta(seconds=i),
+                    "original_prompt": f"Synthetic prompt {i}",
+                    "modified_prompt": f"Synthetic prompt {i}",
+                    "decision": Decision.allow,
+                    "risks": [],
+                    "request_metadata": {},
+                    "risk_count": 0,
+                    "risk_types": 0,
+                    "prompt_length": len(f"Synthetic prompt {i}"),
+                }
+                for i in range(batch_start, batch_end)
+            ],
+        )
+        db.commit()
+        print(f"Seeded {batch_end}/{rows} logs", end="\r")
+    print()
+
+
+def time_request(client: TestClient, url: str, repeat: int) -> float:
+    """Return the median latency of GET url in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=10_000, help="Deep page number (1-based)")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed_logs(db, args.rows)
+
+        # Cursor for the deep page points at the last row of the page before it
+        anchor = (
+            db.query(RequestLog.timestamp, RequestLog.id)
+            .order_by(RequestLog.timestamp.desc(), RequestLog.id.desc())
+            .offset((args.page - 1) * args.limit - 1)
+            .first()
+        )
+    finally:
+        db.close()
+
+    client = TestClient(app)
+    deep_offset = (args.page - 1) * args.limit
+    deep_cursor = encode_cursor(anchor.timestamp, anchor.id)
+
+    results = [
+        ("offset", 1, f"/v1/logs?limit={args.limit}"),
+        ("offset", args.page, f"/v1/logs?limit={args.limit}&offset={deep_offset}"),
+        ("cursor", 1, f"/v1/logs?limit={args.limit}"),
+        ("cursor", args.page, f"/v1/logs?limit={args.limit}&cursor={deep_cursor}"),
+    ]
+
+    print(f"{'mode':<8}{'page':>8}{'median ms':>12}")
+    for mode, page, url in results:
+        print(f"{mode:<8}{page:>8}{time_request(client, url, args.repeat):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Measure precision and latency of card number and SSN validation.
+
+Builds a labeled corpus of texts, each holding one candidate: real-shaped
+card numbers (known issuer prefix, valid Luhn digit) and SSNs (SSA rules)
+are positives; random 16-digit order numbers and 3-2-4 digit reference
+codes are negatives. Runs PIIDetector over it with and without validators
+and reports precision, recall, risk objects built and detection time.
+
+Random negatives that happen to pass validation are indistinguishable from
+real numbers and count as false positives.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.firewall.pii_detector import PIIDetector
+from app.firewall.validators import CARD_IIN_RANGES, luhn_valid
+
+# Positive and negative sentence for each pattern
+TEMPLATES = {
+    "credit_card": [
+        "Please charge card {} for the renewal.",
+        "Order {} shipped on Tuesday.",
+    ],
+    "ssn": [
+        "My social is {}, can you check my file?",
+        "Ticket reference {} was escalated.",
+    ],
+}
+SEPARATORS = ["-", " ", ""]
+
+
+def card_number(rng: random.Random) -> str:
+    """A 16-digit number with a known issuer prefix and a valid Luhn digit."""
+    length, low, high = rng.choice(CARD_IIN_RANGES)
+    digits = str(rng.randint(low, high)).zfill(length)
+    digits += "".join(str(rng.randint(0, 9)) for _ in range(15 - len(digits)))
+    return next(digits + check for check in "0123456789" if luhn_valid(digits + check))
+
+
+def format_card(digits: str, rng: random.Random) -> str:
+    separator = rng.choice(SEPARATORS)
+    return separator.join(digits[i:i + 4] for i in range(0, 16, 4))
+
+
+def ssn(rng: random.Random) -> str:
+    area = rng.choice([a for a in range(1, 900) if a != 666])
+    return f"{area:03d}-{rng.randint(1, 99):02d}-{rng.randint(1, 9999):04d}"
+
+
+def build_corpus(size: int, seed: int):
+    """Return (text, pattern name, is PII) triples, half positives."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        pattern = "credit_card" if i % 2 else "ssn"
+        positive = rng.random() < 0.5
+        if pattern == "credit_card":
+            digits = card_number(rng) if positive else "".join(str(rng.randint(0, 9)) for _ in range(16))
+            candidate = format_card(digits, rng)
+        else:
+            candidate = ssn(rng) if positive else "-".join(
+                "".join(str(rng.randint(0, 9)) for _ in range(n)) for n in (3, 2, 4)
+            )
+        template = TEMPLATES[pattern][0 if positive else 1]
+        corpus.append((template.format(candidate), pattern, positive))
+    return corpus
+
+
+def evaluate(detector: PIIDetector, corpus):
+    """Return per-pattern counts, risk objects built and seconds spent detecting."""
+    counts = {pattern: {"tp": 0, "fp": 0, "fn": 0} for pattern in TEMPLATES}
+    risks = 0
+    started = time.perf_counter()
+    results = [detector.detect(text) for text, _, _ in corpus]
+    elapsed = time.perf_counter() - started
+    for matches, (_, pattern, positive) in zip(results, corpus):
+        risks += len(matches)
+        flagged = any(match.pattern_name == pattern for match in matches)
+        if flagged and positive:
+            counts[pattern]["tp"] += 1
+        elif flagged:
+            counts[pattern]["fp"] += 1
+        elif positive:
+            counts[pattern]["fn"] += 1
+    return counts, risks, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PII candidate validation")
+    parser.add_argument("--texts", type=int, default=20000, help="Labeled texts in the corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.texts, args.seed)
+
+    unvalidated = PIIDetector()
+    for pattern_def in unvalidated.patterns:
+        pattern_def.pop("validator", None)
+
+    print(f"{args.texts} labeled texts, half card-shaped and half SSN-shaped, half of each real")
+    for label, detector in (("without validators", unvalidated), ("with validators", PIIDetector())):
+        counts, risks, elapsed = evaluate(detector, corpus)
+        print(f"\n{label}: {risks} risk objects, "
+              f"{elapsed / len(corpus) * 1e6:.1f} us per text")
+        for pattern, c in counts.items():
+            flagged = c["tp"] + c["fp"]
+            precision = c["tp"] / flagged if flagged else 0.0
+            recall = c["tp"] / (c["tp"] + c["fn"]) if c["tp"] + c["fn"] else 0.0
+            print(f"  {pattern:12s} precision {precision:.3f}  recall {recall:.3f}  "
+                  f"false positives {c['fp']}")
+
+
+if __name__ == "__main__":
+    main()
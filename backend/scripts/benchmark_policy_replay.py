@@ -0,0 +1,92 @@
+"""
+Benchmark policy replay throughput.
+
+Seeds DATABASE_URL with synthetic logged requests (default 100,000), then
+replays a candidate policy against them with 1 worker and with
+POLICY_REPLAY_WORKERS workers, reporting logs per second and the projected
+time for a million-row replay.
+"""
+
+import argparse
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import func, insert
+
+from app.database import SessionLocal, engine, Base
+from app.models import RequestLog, Decision
+from app.policy_replay import POLICY_REPLAY_WORKERS, replay_policy
+from app.policy_rules import candidate_rules
+from app.schemas import PolicyRuleSchema
+from benchmark_log_storage import synthetic_text
+
+CANDIDATE = [
+    PolicyRuleSchema(
+        name="block-emails", risk_type="PII", pattern="@", pattern_type="keyword",
+        severity="high", action="block",
+    ),
+    PolicyRuleSchema(
+        name="warn-phones", risk_type="PII", pattern=r"\d{3}-\d{4}", pattern_type="regex",
+        severity="low", action="warn",
+    ),
+]
+
+
+def seed_replay_logs(db, rows: int, batch_size: int = 10000):
+    """Insert synthetic logs with realistic text until the table holds at least `rows` rows."""
+    rng = random.Random(5)
+    existing = db.query(func.count(RequestLog.id)).scalar()
+    start = datetime.utcnow() - timedelta(seconds=rows)
+
+    for batch_start in range(existing, rows, batch_size):
+        batch_end = min(batch_start + batch_size, rows)
+        db.execute(
+            insert(RequestLog),
+            [
+                {
+                    "request_id": str(uuid.uuid4()),
+                    "timestamp": start + timedelta(seconds=i),
+                    "original_prompt": synthetic_text(rng, rng.randint(1, 8), 0.1),
+                    "decision": Decision.allow,
+                    "risks": [],
+                    "request_metadata": {},
+                }
+                for i in range(batch_start, batch_end)
+            ],
+        )
+        db.commit()
+        print(f"Seeded {batch_end}/{rows} logs", end="\r")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=POLICY_REPLAY_WORKERS)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    rules = candidate_rules(CANDIDATE)
+    db = SessionLocal()
+    try:
+        seed_replay_logs(db, args.rows)
+        print(f"{'workers':>8}{'logs':>10}{'seconds':>10}{'logs/s':>10}{'1M logs, min':>14}")
+        for workers in sorted({1, args.workers}):
+            result = replay_policy(db, rules, args.rows, workers=workers)
+            rate = result["evaluated"] / result["duration_seconds"]
+            print(
+                f"{workers:>8}{result['evaluated']:>10}{result['duration_seconds']:>10.1f}"
+                f"{rate:>10.0f}{1_000_000 / rate / 60:>14.1f}"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark PUT /v1/policy with large policy packs.
+
+For each pack size (default 10, 1,000 and 10,000 rules) the rule table is
+emptied, then the pack is imported as new rules and re-imported as updates
+to those rules. The bulk endpoint is compared against the previous
+implementation, which issued one SELECT per rule and one refresh per rule
+after commit.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.database import SessionLocal, engine, Base
+from app.main import app
+from app.models import PolicyRule, RiskType, Severity, Decision
+
+
+def make_pack(size: int, ids=None):
+    """Return a policy pack of `size` rules, as updates when ids are given."""
+    rules = []
+    for i in range(size):
+        rule = {
+            "name": f"pack-rule-{i}",
+            "description": f"Imported rule {i}",
+            "risk_type": "PII",
+            "pattern": rf"\bsecret-{i}\b",
+            "pattern_type": "regex",
+            "severity": "high" if ids else "medium",
+            "action": "block" if ids else "redact",
+            "enabled": True,
+        }
+        if ids:
+            rule["id"] = ids[rule["name"]]
+        rules.append(rule)
+    return rules
+
+
+def per_rule_upsert(db, rules):
+    """The former PUT /v1/policy write path: a query and a refresh per rule."""
+    written = []
+    for data in rules:
+        if data.get("id"):
+            rule = db.query(PolicyRule).filter_by(id=data["id"]).first()
+        else:
+            assert db.query(PolicyRule).filter_by(name=data["name"]).first() is None
+            rule = PolicyRule()
+            db.add(rule)
+        rule.name = data["name"]
+        rule.description = data["description"]
+        rule.risk_type = RiskType(data["risk_type"])
+        rule.pattern = data["pattern"]
+        rule.pattern_type = data["pattern_type"]
+        rule.severity = Severity(data["severity"])
+        rule.action = Decision(data["action"])
+        rule.enabled = data["enabled"]
+        written.append(rule)
+    db.commit()
+    for rule in written:
+        db.refresh(rule)
+    return {rule.name: rule.id for rule in written}
+
+
+def bulk_upsert(client, rules):
+    """Import a pack through the endpoint."""
+    response = client.put("/v1/policy", json={"rules": rules})
+    response.raise_for_status()
+    return {rule["name"]: rule["id"] for rule in response.json()["rules"]}
+
+
+def clear_rules():
+    with SessionLocal() as db:
+        db.execute(delete(PolicyRule).where(PolicyRule.name.like("pack-rule-%")))
+        db.commit()
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    client = TestClient(app)
+
+    print(f"{'rules':>8}{'path':>10}{'create ms':>12}{'update ms':>12}")
+    for size in args.sizes:
+        clear_rules()
+        with SessionLocal() as db:
+            ids, create_ms = timed(per_rule_upsert, db, make_pack(size))
+            _, update_ms = timed(per_rule_upsert, db, make_pack(size, ids))
+        print(f"{size:>8}{'per-rule':>10}{create_ms:>12.1f}{update_ms:>12.1f}")
+
+        clear_rules()
+        ids, create_ms = timed(bulk_upsert, client, make_pack(size))
+        _, update_ms = timed(bulk_upsert, client, make_pack(size, ids))
+        print(f"{size:>8}{'bulk':>10}{create_ms:>12.1f}{update_ms:>12.1f}")
+    clear_rules()
+
+
+if __name__ == "__main__":
+    main()
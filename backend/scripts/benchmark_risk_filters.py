@@ -0,0 +1,117 @@
+"""
+Benchmark risk type/severity filtering on the /v1/logs endpoint.
+
+Seeds DATABASE_URL with synthetic request logs and their normalized
+request_risks rows (default 1,000,000 logs x 5 risks = 5M risks) and reports
+median latency for each filter combination.
+"""
+
+import argparse
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert
+
+from app.database import SessionLocal, engine, Base
+from app.main import app
+from app.models import RequestLog, RequestRisk, Decision, risk_summary
+from benchmark_logs_pagination import time_request
+
+RISK_SHAPES = [
+    ("PII", "medium", "email"),
+    ("PII", "high", "ssn"),
+    ("PII", "medium", "phone"),
+    ("PHI", "high", "medical_record_number"),
+    ("PROMPT_INJECTION", "high", "bypass_attempt"),
+    ("PROMPT_INJECTION", "medium", "encoding_obfuscation"),
+]
+
+
+def seed_logs_with_risks(db, logs: int, risks_per_log: int, batch_size: int = 5000):
+    """Insert synthetic logs and risk rows until `logs` logs exist."""
+    existing = db.query(func.count(RequestLog.id)).scalar()
+    start = datetime.utcnow() - timedelta(seconds=logs)
+
+    for batch_start in range(existing, logs, batch_size):
+        batch_end = min(batch_start + batch_size, logs)
+        log_rows = []
+        for i in range(batch_start, batch_end):
+            # Vary which risk shapes each log carries so filters have mixed selectivity
+            shapes = [RISK_SHAPES[(i + k) % len(RISK_SHAPES)] for k in range(risks_per_log)]
+            risks = [
+                {"type": t, "severity": s, "pattern_name": p,
+                 "position": {"start": 0, "end": 8}}
+                for t, s, p in shapes
+            ]
+            prompt = f"Synthetic prompt {i}"
+            log_rows.append({
+                "request_id": str(uuid.uuid4()),
+                "timestamp": start + timedelta(seconds=i),
+                "original_prompt": prompt,
+                "decision": Decision.block,
+                "risks": risks,
+                "request_metadata": {},
+                # Core inserts bypass the model's validators, so set summaries here
+                **risk_summary(risks),
+                "prompt_length": len(prompt),
+            })
+
+        ids = db.execute(
+            insert(RequestLog).returning(RequestLog.id, sort_by_parameter_order=True),
+            log_rows,
+        ).scalars().all()
+        db.execute(
+            insert(RequestRisk),
+            [
+                {"request_log_id": log_id, "risk_type": risk["type"],
+                 "severity": risk["severity"], "pattern_name": risk["pattern_name"],
+                 "start": 0, "end": 8}
+                for log_id, row in zip(ids, log_rows)
+                for risk in row["risks"]
+            ],
+        )
+        db.commit()
+        print(f"Seeded {batch_end}/{logs} logs", end="\r")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logs", type=int, default=1_000_000)
+    parser.add_argument("--risks-per-log", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed_logs_with_risks(db, args.logs, args.risks_per_log)
+        risk_count = db.query(func.count(RequestRisk.id)).scalar()
+    finally:
+        db.close()
+
+    print(f"{risk_count} risk rows")
+    client = TestClient(app)
+    filters = [
+        "type=PII",
+        "type=PHI",
+        "severity=high",
+        "min_severity=high",
+        "type=PROMPT_INJECTION&severity=medium",
+    ]
+
+    print(f"{'filter':<42}{'median ms':>12}")
+    for query in filters:
+        url = f"/v1/logs?limit={args.limit}&count=exact&{query}"
+        print(f"{query:<42}{time_request(client, url, args.repeat):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
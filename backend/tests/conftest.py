@@ -0,0 +1,60 @@
+"""
+Shared fixtures for tests that need an isolated database.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app import log_rollups
+from app.auth import get_current_admin_user
+from app.database import Base, get_db
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def rollup_buffer(monkeypatch):
+    """Give every test an empty stats rollup buffer that is written after each request."""
+    monkeypatch.setattr(log_rollups, "buffer", log_rollups.RollupBuffer())
+    monkeypatch.setattr(log_rollups, "ROLLUP_FLUSH_SECONDS", 0)
+
+
+@pytest.fixture
+def engine():
+    """Create an isolated in-memory database engine with the schema."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    """Create an isolated in-memory database session."""
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def admin():
+    """Sign requests to admin-only endpoints in as an admin."""
+    app.dependency_overrides[get_current_admin_user] = lambda: {"username": "admin", "is_superuser": True}
+    yield
+    app.dependency_overrides.pop(get_current_admin_user, None)
+
+
+@pytest.fixture
+def client(db, admin):
+    """Create a test client backed by the isolated database, signed in as an admin."""
+    app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
@@ -7,7 +7,10 @@ import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.database import Base, get_db
-from app.models import RequestLog, PolicyRule, AdminUser, AuditLog, RiskType, Severity, Decision
+from app.models import (
+    RequestLog, RequestRisk, PolicyRule, AdminUser, AuditLog, RiskType, Severity, Decision,
+    RISK_TYPE_BITS,
+)
 from datetime import datetime
 
 
@@ -49,6 +52,33 @@ def test_request_log_model(db_session):
     assert retrieved.decision == Decision.ALLOW
 
 
+def test_request_risk_model(db_session):
+    """Test RequestRisk rows are written with their parent RequestLog."""
+    risk = {
+        "type": "PII",
+        "severity": "high",
+        "pattern_name": "ssn",
+        "match": "123-45-6789",
+        "position": {"start": 4, "end": 15},
+        "explanation": "Social Security Number detected",
+    }
+    log = RequestLog(
+        request_id="test-risks",
+        original_prompt="SSN 123-45-6789",
+        decision=Decision.block,
+        risks=[risk],
+        risk_entries=[RequestRisk.from_risk_dict(risk)],
+    )
+    db_session.add(log)
+    db_session.commit()
+
+    retrieved = db_session.query(RequestRisk).filter_by(request_log_id=log.id).one()
+    assert retrieved.risk_type == "PII"
+    assert retrieved.severity == "high"
+    assert retrieved.pattern_name == "ssn"
+    assert (retrieved.start, retrieved.end) == (4, 15)
+
+
 def test_policy_rule_model(db_session):
     """Test PolicyRule model creation and retrieval."""
     rule = PolicyRule(
@@ -112,3 +142,27 @@ def test_get_db_generator():
     assert hasattr(db_gen, "__iter__")
     assert hasattr(db_gen, "__next__")
 
+
+
+def test_request_log_summary_columns(db_session):
+    """Test that risk summary columns follow the risks and prompt assigned."""
+    log = RequestLog(
+        request_id="test-summary",
+        original_prompt="a@b.co bypass safety",
+        decision=Decision.block,
+        risks=[
+            {"type": "PII", "severity": "medium"},
+            {"type": "PROMPT_INJECTION", "severity": "high"},
+        ],
+    )
+    db_session.add(log)
+    db_session.commit()
+
+    assert log.risk_count == 2
+    assert log.max_severity == "high"
+    assert log.risk_types == RISK_TYPE_BITS["PII"] | RISK_TYPE_BITS["PROMPT_INJECTION"]
+    assert log.prompt_length == 20
+
+    log.risks = []
+    db_session.commit()
+    assert (log.risk_count, log.max_severity, log.risk_types) == (0, None, 0)
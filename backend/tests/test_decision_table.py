@@ -0,0 +1,89 @@
+"""
+Property-based tests for the compiled default decision table.
+
+The table must give exactly the decisions of the branching implementation it
+replaced, which is kept here as the reference.
+"""
+
+from hypothesis import given, strategies as st
+from app.firewall import decision_table
+from app.firewall.pii_detector import RiskMatch
+from app.firewall.policy_engine import PolicyEngine, Decision
+
+RISK_TYPES = ["PII", "PHI", "PROMPT_INJECTION", "OTHER", "CUSTOM"]
+SEVERITIES = ["low", "medium", "high", "critical", "HIGH", ""]
+
+risks = st.lists(
+    st.builds(
+        RiskMatch,
+        risk_type=st.sampled_from(RISK_TYPES),
+        pattern_name=st.just("test"),
+        match=st.just("x"),
+        start=st.just(0),
+        end=st.just(1),
+        severity=st.sampled_from(SEVERITIES),
+        explanation=st.just(""),
+    ),
+    max_size=8,
+)
+
+
+def reference_determine_action(prompt_risks, response_risks):
+    """PolicyEngine.determine_action before the decision table, without custom rules."""
+    all_risks = prompt_risks + response_risks
+    if not all_risks:
+        return Decision.ALLOW
+
+    severity_priority = {"high": 3, "medium": 2, "low": 1}
+    highest_severity = max(
+        [r.severity for r in all_risks], key=lambda s: severity_priority.get(s, 0)
+    )
+    has_injection = any(r.risk_type == "PROMPT_INJECTION" for r in all_risks)
+    has_high_pii = any(
+        r.risk_type in ["PII", "PHI"] and r.severity == "high" for r in all_risks
+    )
+
+    if has_injection or highest_severity == "high":
+        return Decision.BLOCK
+    if has_high_pii or highest_severity == "medium":
+        return Decision.REDACT
+    if highest_severity == "low":
+        return Decision.WARN
+    return Decision.ALLOW
+
+
+@given(prompt_risks=risks, response_risks=risks)
+def test_table_matches_reference(prompt_risks, response_risks):
+    """The table decision equals the branching decision for any risks."""
+    decision = PolicyEngine().determine_action(prompt_risks, response_risks)
+
+    assert decision == reference_determine_action(prompt_risks, response_risks)
+
+
+@given(prompt_risks=risks, response_risks=risks)
+def test_summary_is_order_independent(prompt_risks, response_risks):
+    """Summaries do not depend on risk order or on which side a risk came from."""
+    combined = prompt_risks + response_risks
+
+    summary = decision_table.summarize(prompt_risks, response_risks)
+
+    assert summary == decision_table.summarize(combined)
+    assert summary == decision_table.summarize(list(reversed(combined)))
+
+
+@given(risks=risks, extra=risks)
+def test_more_risks_never_loosen_the_decision(risks, extra):
+    """Adding risks can only keep or tighten the default decision."""
+    before = decision_table.decide(decision_table.summarize(risks))
+    after = decision_table.decide(decision_table.summarize(risks, extra))
+
+    assert after >= before
+
+
+def test_table_covers_every_summary():
+    """Every type mask and severity code has an entry."""
+    assert len(decision_table.DEFAULT_TABLE) == decision_table.TYPE_MASKS * 4
+    for summary, decision in enumerate(decision_table.DEFAULT_TABLE):
+        types, severity = decision_table.unpack(summary)
+        assert (types << 2 | severity) == summary
+        assert decision in range(4)
@@ -0,0 +1,137 @@
+"""
+Tests for cold storage archival of log text.
+"""
+
+import pytest
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from app import log_archive
+from app.log_archive import ArchiveError, LocalArchiveStore, archive_logs, get_store, load_bodies
+from app.models import PromptBlob, RequestLog, Decision
+
+
+@pytest.fixture
+def db(db):
+    """Create a session with five logs, one per day from 2025-01-01."""
+    for day in range(1, 6):
+        db.add(RequestLog(
+            request_id=f"req-{day}",
+            timestamp=datetime(2025, 1, day, 12),
+            original_prompt=f"Prompt {day} " * 50,
+            modified_prompt=f"Prompt {day}",
+            original_response=f"Response {day}",
+            decision=Decision.allow,
+            risks=[],
+        ))
+    db.commit()
+    return db
+
+
+def test_compress_round_trip():
+    """Test that compressed blobs decompress to the original bytes."""
+    data = b"request log text " * 1000
+
+    blob = log_archive.compress(data)
+
+    assert len(blob) < len(data)
+    assert log_archive.decompress(blob) == data
+
+
+def test_archive_logs_moves_old_text(engine, db, tmp_path):
+    """Test that only old logs are archived, in blobs of batch_size logs."""
+    store = LocalArchiveStore(str(tmp_path))
+
+    archived = archive_logs(engine, store, datetime(2025, 1, 4), batch_size=2)
+
+    assert archived == 3
+    assert len(list(tmp_path.rglob("*.json.zst"))) == 2
+    db.expire_all()
+    logs = {log.request_id: log for log in db.query(RequestLog)}
+    assert logs["req-1"].original_prompt == ""
+    assert logs["req-1"].modified_prompt is None
+    assert logs["req-1"].prompt_length == len("Prompt 1 " * 50)
+    assert logs["req-4"].archive_ref is None
+    assert logs["req-4"].original_prompt.startswith("Prompt 4")
+
+    bodies = load_bodies(store, logs["req-3"])
+    assert bodies["original_prompt"] == "Prompt 3 " * 50
+    assert bodies["original_response"] == "Response 3"
+    assert archive_logs(engine, store, datetime(2025, 1, 4)) == 0
+
+
+def test_archive_logs_retries_failed_commit_with_same_blob(engine, db, tmp_path):
+    """Test that a blob written for a batch that failed to commit is reused, not orphaned."""
+    store = LocalArchiveStore(str(tmp_path))
+
+    def fail_update(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            raise OperationalError(statement, parameters, Exception("connection lost"))
+
+    event.listen(engine, "before_cursor_execute", fail_update)
+    with pytest.raises(OperationalError):
+        archive_logs(engine, store, datetime(2025, 1, 3))
+    event.remove(engine, "before_cursor_execute", fail_update)
+    written = list(tmp_path.rglob("*.json.zst"))
+    assert db.query(RequestLog).filter(RequestLog.archive_ref.isnot(None)).count() == 0
+
+    assert archive_logs(engine, store, datetime(2025, 1, 3)) == 2
+    assert list(tmp_path.rglob("*.json.zst")) == written
+    log = db.query(RequestLog).filter_by(request_id="req-2").one()
+    assert load_bodies(store, log)["original_response"] == "Response 2"
+
+
+def test_archive_logs_prunes_unreferenced_prompt_blobs(engine, db, tmp_path):
+    """Test that archival deletes shared prompts only archived logs referenced."""
+    shared, archived_only = "Shared system prompt " * 5, "Old system prompt " * 5
+    db.add_all([PromptBlob(hash="a" * 64, body=shared), PromptBlob(hash="b" * 64, body=archived_only)])
+    for day, digest in [(1, "a" * 64), (2, "b" * 64), (5, "a" * 64)]:
+        log = db.query(RequestLog).filter_by(request_id=f"req-{day}").one()
+        log.original_prompt = ""
+        log.prompt_hash = digest
+    db.commit()
+    store = LocalArchiveStore(str(tmp_path))
+
+    archive_logs(engine, store, datetime(2025, 1, 4))
+
+    assert [blob.hash for blob in db.query(PromptBlob)] == ["a" * 64]
+    log = db.query(RequestLog).filter_by(request_id="req-2").one()
+    assert load_bodies(store, log)["original_prompt"] == archived_only
+
+
+def test_get_store_requires_absolute_url():
+    """Test that an unset or relative archive location is rejected."""
+    with pytest.raises(ArchiveError):
+        get_store("")
+    with pytest.raises(ArchiveError):
+        get_store("log_archive")
+    assert isinstance(get_store("file:///var/lib/archive"), LocalArchiveStore)
+
+
+def test_load_bodies_rejects_tampered_hash(engine, db, tmp_path):
+    """Test that rehydration verifies the stored hash."""
+    store = LocalArchiveStore(str(tmp_path))
+    archive_logs(engine, store, datetime(2025, 1, 2))
+    log = db.query(RequestLog).filter_by(request_id="req-1").one()
+    db.refresh(log)
+    log.archive_sha256 = "0" * 64
+
+    with pytest.raises(ArchiveError):
+        load_bodies(store, log)
+
+
+def test_log_detail_rehydrates_archived_text(engine, db, client, tmp_path, monkeypatch):
+    """Test that the detail endpoint returns archived text transparently."""
+    store = LocalArchiveStore(str(tmp_path))
+    archive_logs(engine, store, datetime(2025, 1, 2))
+    monkeypatch.setattr("app.routers.logs.get_store", lambda: store)
+    log_id = db.query(RequestLog.id).filter_by(request_id="req-1").scalar()
+
+    detail = client.get(f"/v1/logs/{log_id}").json()
+    listed = client.get("/v1/logs?fields=request_id,original_prompt,archived&count=none").json()
+
+    assert detail["archived"] is True
+    assert detail["original_prompt"] == "Prompt 1 " * 50
+    assert detail["modified_prompt"] == "Prompt 1"
+    row = next(log for log in listed["logs"] if log["request_id"] == "req-1")
+    assert row == {"request_id": "req-1", "original_prompt": "", "archived": True}
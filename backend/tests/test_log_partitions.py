@@ -0,0 +1,150 @@
+"""
+Tests for request_logs partition maintenance helpers.
+"""
+
+import pytest
+from datetime import date
+from unittest.mock import MagicMock, patch
+from app import log_partitions
+from app.log_partitions import (
+    planned_partitions,
+    parse_partition_name,
+    expired_partitions,
+    ensure_partitions,
+    apply_retention,
+)
+
+
+def test_planned_monthly_partitions_roll_over_year():
+    """Test that monthly partitions are contiguous across a year boundary."""
+    planned = planned_partitions(date(2025, 11, 17), "month", 2)
+
+    assert planned == [
+        ("request_logs_p2025_11", date(2025, 11, 1), date(2025, 12, 1)),
+        ("request_logs_p2025_12", date(2025, 12, 1), date(2026, 1, 1)),
+        ("request_logs_p2026_01", date(2026, 1, 1), date(2026, 2, 1)),
+    ]
+
+
+def test_planned_daily_partitions():
+    """Test daily partition names and bounds."""
+    planned = planned_partitions(date(2025, 2, 28), "day", 1)
+
+    assert planned == [
+        ("request_logs_p2025_02_28", date(2025, 2, 28), date(2025, 3, 1)),
+        ("request_logs_p2025_03_01", date(2025, 3, 1), date(2025, 3, 2)),
+    ]
+
+
+def test_parse_partition_name():
+    """Test that partition names round-trip to their ranges."""
+    assert parse_partition_name("request_logs_p2025_01") == (date(2025, 1, 1), date(2025, 2, 1))
+    assert parse_partition_name("request_logs_p2025_01_31") == (date(2025, 1, 31), date(2025, 2, 1))
+    assert parse_partition_name("request_logs_default") is None
+
+
+def test_expired_partitions_only_whole_ranges():
+    """Test that a partition expires only once its whole range is past the cutoff."""
+    names = ["request_logs_p2025_01", "request_logs_p2025_02", "request_logs_default"]
+
+    assert expired_partitions(names, date(2025, 2, 15)) == ["request_logs_p2025_01"]
+    assert expired_partitions(names, date(2025, 1, 31)) == []
+
+
+def test_ensure_partitions_skips_covered_ranges():
+    """Test that existing monthly partitions are not recreated as daily ones."""
+    conn = MagicMock()
+    with patch.object(log_partitions, "list_partitions", return_value=["request_logs_p2025_03"]):
+        created = ensure_partitions(conn, date(2025, 3, 31), interval="day", ahead=1)
+
+    assert created == ["request_logs_p2025_04_01"]
+    assert conn.execute.call_count == 1
+
+
+def test_ensure_partitions_moves_rows_out_of_default():
+    """Test that rows caught by the DEFAULT partition move into the new partition."""
+    conn = MagicMock()
+    # Only April's range has rows in the DEFAULT partition
+    conn.execute.return_value.scalar.side_effect = [True, False]
+    partitions = ["request_logs_p2025_03", "request_logs_default"]
+    with patch.object(log_partitions, "list_partitions", return_value=partitions):
+        created = ensure_partitions(conn, date(2025, 3, 31), interval="month", ahead=2)
+
+    assert created == ["request_logs_p2025_04", "request_logs_p2025_05"]
+    statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+    assert statements[1] == 'CREATE TABLE "request_logs_p2025_04" (LIKE request_logs INCLUDING DEFAULTS)'
+    assert statements[2].startswith('WITH moved AS (DELETE FROM "request_logs_default"')
+    assert statements[3] == (
+        'ALTER TABLE request_logs ATTACH PARTITION "request_logs_p2025_04" '
+        "FOR VALUES FROM ('2025-04-01') TO ('2025-05-01')"
+    )
+    assert statements[5].startswith('CREATE TABLE "request_logs_p2025_05" PARTITION OF request_logs')
+
+
+def test_apply_retention_disabled_by_default():
+    """Test that a zero retention window keeps every partition."""
+    conn = MagicMock()
+
+    assert apply_retention(conn, date(2025, 6, 1), retention_days=0) == []
+    conn.execute.assert_not_called()
+
+
+def test_apply_retention_drops_expired_partitions():
+    """Test that expired partitions and their risk rows are removed."""
+    conn = MagicMock()
+    names = ["request_logs_p2025_01", "request_logs_p2025_05"]
+    with patch.object(log_partitions, "list_partitions", return_value=names):
+        expired = apply_retention(conn, date(2025, 5, 10), retention_days=30, action="drop")
+
+    assert expired == ["request_logs_p2025_01"]
+    statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+    assert any("DELETE FROM request_risks" in sql for sql in statements)
+    assert any('DROP TABLE "request_logs_p2025_01"' in sql for sql in statements)
+
+
+def test_apply_retention_detaches_partitions_with_their_prompts():
+    """Test that detached partitions keep their prompts and release the shared blobs."""
+    conn = MagicMock()
+    conn.execute.return_value.scalars.return_value = ["fk_request_logs_prompt_hash"]
+    names = ["request_logs_p2025_01", "request_logs_p2025_05"]
+    with patch.object(log_partitions, "list_partitions", return_value=names):
+        apply_retention(conn, date(2025, 5, 10), retention_days=30, action="detach")
+
+    statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+    assert any('CREATE TABLE "request_logs_p2025_01_prompts"' in sql for sql in statements)
+    assert 'ALTER TABLE "request_logs_p2025_01" DROP CONSTRAINT "fk_request_logs_prompt_hash"' in statements
+    assert statements[-1].startswith("DELETE FROM prompt_blobs")
+
+
+def test_apply_retention_keeps_prompt_blobs_without_expired_logs():
+    """Test that prompt blobs are not pruned when nothing expired."""
+    conn = MagicMock()
+    with patch.object(log_partitions, "list_partitions", return_value=["request_logs_p2025_05"]):
+        apply_retention(conn, date(2025, 5, 10), retention_days=30, action="drop")
+
+    conn.execute.assert_not_called()
+
+
+@pytest.mark.parametrize("action", ["drop", "detach"])
+def test_apply_retention_expires_default_partition_rows(action):
+    """Test that expired rows of the DEFAULT partition and their risks are removed."""
+    conn = MagicMock()
+    conn.execute.return_value.scalar.return_value = True
+    names = ["request_logs_p2025_05", "request_logs_default"]
+    with patch.object(log_partitions, "list_partitions", return_value=names):
+        expired = apply_retention(conn, date(2025, 5, 10), retention_days=30, action=action)
+
+    assert expired == []
+    statements = [str(call.args[0]) for call in conn.execute.call_args_list]
+    assert statements[-3].startswith("DELETE FROM request_risks WHERE request_log_id IN (SELECT id FROM")
+    assert statements[-2] == 'DELETE FROM "request_logs_default" WHERE "timestamp" < :cutoff'
+    assert conn.execute.call_args_list[-2].args[1] == {"cutoff": date(2025, 4, 10)}
+    assert statements[-1].startswith("DELETE FROM prompt_blobs")
+    archived = [sql for sql in statements if 'CREATE TABLE "request_logs_default_before_2025_04_10' in sql]
+    assert len(archived) == (3 if action == "detach" else 0)
+
+
+def test_apply_retention_rejects_unknown_action():
+    """Test that an unsupported retention action is rejected."""
+    with pytest.raises(ValueError):
+        apply_retention(MagicMock(), date(2025, 5, 10), retention_days=30, action="archive")
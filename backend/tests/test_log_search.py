@@ -0,0 +1,111 @@
+"""
+Tests for full-text search over logged prompts and responses.
+"""
+
+from datetime import datetime, timedelta
+from app import log_bodies, log_tiers
+from app.auth import get_current_admin_user
+from app.log_archive import LocalArchiveStore, archive_logs
+from app.main import app
+from app.models import RequestLog
+
+
+def log_query(client, prompt, response=None):
+    """Send a request through the firewall so it is logged and indexed."""
+    client.post("/v1/query", json={"prompt": prompt, "response": response})
+
+
+def search(client, url):
+    """Return the request ids of the hits of a search."""
+    response = client.get(url)
+    assert response.status_code == 200
+    return [hit["request_id"] for hit in response.json()["logs"]]
+
+
+def test_search_ranks_matching_logs(client, db):
+    """Test that hits are restricted to matches and ordered by relevance."""
+    log_query(client, "How do I reset my router password?")
+    log_query(client, "Router password reset failed, router keeps rebooting", "Try a router factory reset.")
+    log_query(client, "What is the capital of France?")
+
+    response = client.get("/v1/logs/search?q=router")
+
+    assert response.status_code == 200
+    hits = response.json()["logs"]
+    assert len(hits) == 2
+    assert hits[0]["rank"] >= hits[1]["rank"]
+    assert set(hits[0]) == {"id", "request_id", "timestamp", "decision", "risk_count", "rank"}
+    assert search(client, "/v1/logs/search?q=france") == [
+        search(client, "/v1/logs/search?q=capital")[0]
+    ]
+
+
+def test_search_matches_responses_and_every_word(client):
+    """Test that responses are indexed and all words must match."""
+    log_query(client, "Tell me a story", "Once upon a time a dragon slept")
+    log_query(client, "Another dragon question")
+
+    assert len(search(client, "/v1/logs/search?q=dragon")) == 2
+    assert len(search(client, "/v1/logs/search?q=dragon%20slept")) == 1
+    assert search(client, "/v1/logs/search?q=unicorn") == []
+
+
+def test_search_pagination_and_filters(client):
+    """Test paging through hits and combining search with log filters."""
+    for i in range(5):
+        log_query(client, f"Invoice question number {i}")
+    log_query(client, "Invoice for john@example.com")
+
+    first = client.get("/v1/logs/search?q=invoice&limit=4&order=recent").json()
+    second = client.get("/v1/logs/search?q=invoice&limit=4&offset=4&order=recent").json()
+
+    assert first["has_more"] is True and second["has_more"] is False
+    assert len(first["logs"]) + len(second["logs"]) == 6
+    assert len(search(client, "/v1/logs/search?q=invoice&type=PII")) == 1
+
+
+def test_search_covers_compressed_and_skips_metadata_only_logs(client, monkeypatch):
+    """Test that indexing follows the request text, not how bodies are stored."""
+    monkeypatch.setattr(log_bodies, "BODY_STORAGE", "compressed")
+    log_query(client, "Compressed kangaroo prompt")
+    monkeypatch.setattr(log_tiers, "LOG_ALLOW_TIER", "metadata")
+    log_query(client, "Metadata kangaroo prompt")
+
+    hits = client.get("/v1/logs/search?q=kangaroo&fields=original_prompt").json()["logs"]
+
+    assert [hit["original_prompt"] for hit in hits] == ["Compressed kangaroo prompt"]
+
+
+def test_search_skips_archived_logs(client, engine, tmp_path):
+    """Test that archival removes logs from the index along with their text."""
+    log_query(client, "Tell me about dragons")
+
+    archive_logs(engine, LocalArchiveStore(str(tmp_path)), datetime.utcnow() + timedelta(days=1))
+
+    assert search(client, "/v1/logs/search?q=dragons") == []
+
+
+def test_search_forgets_deleted_logs(client, db):
+    """Test that a deleted log's text does not match a new log reusing its id."""
+    log_query(client, "Tell me about dragons")
+    deleted = db.query(RequestLog).one()
+    db.delete(deleted)
+    db.commit()
+
+    log_query(client, "Tell me about unicorns")
+
+    assert db.query(RequestLog).one().id == deleted.id
+    assert search(client, "/v1/logs/search?q=dragons") == []
+
+
+def test_search_rejects_blank_query(client):
+    """Test that a query without words is rejected."""
+    assert client.get("/v1/logs/search?q=%20%20").status_code == 400
+    assert client.get("/v1/logs/search").status_code == 422
+
+
+def test_search_requires_an_admin(client):
+    """Test that searching unredacted text is refused without admin credentials."""
+    app.dependency_overrides.pop(get_current_admin_user)
+
+    assert client.get("/v1/logs/search?q=password").status_code == 403
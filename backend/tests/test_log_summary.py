@@ -0,0 +1,43 @@
+"""
+Tests for the request_logs summary backfill.
+"""
+
+from sqlalchemy import insert, select
+from app.log_summary import backfill_summaries
+from app.models import RequestLog, Decision
+
+
+def test_backfill_summaries_fills_missing_rows_in_batches(engine):
+    """Test that rows without summaries are filled and existing ones are left alone."""
+    risks = [
+        {"type": "PHI", "severity": "low"},
+        {"type": "PII", "severity": "medium"},
+    ]
+    with engine.begin() as conn:
+        # Core inserts skip the model validators, like rows logged before migration 006
+        conn.execute(insert(RequestLog), [
+            {"request_id": f"req-{i}", "original_prompt": "x" * i,
+             "decision": Decision.redact, "risks": risks[:i % 3]}
+            for i in range(5)
+        ])
+        conn.execute(insert(RequestLog), [
+            {"request_id": "req-done", "original_prompt": "", "decision": Decision.allow,
+             "risks": [], "risk_count": 7, "risk_types": 0, "prompt_length": 0},
+        ])
+
+    batches = []
+    updated = backfill_summaries(engine, batch_size=2, progress=batches.append)
+
+    assert updated == 5
+    assert batches == [2, 4, 5]
+    with engine.connect() as conn:
+        rows = {
+            row.request_id: row
+            for row in conn.execute(select(RequestLog.__table__))
+        }
+    assert (rows["req-2"].risk_count, rows["req-2"].max_severity) == (2, "medium")
+    assert rows["req-2"].risk_types == 0b011
+    assert rows["req-4"].prompt_length == 4
+    assert (rows["req-0"].risk_count, rows["req-0"].max_severity) == (0, None)
+    assert rows["req-done"].risk_count == 7
+    assert backfill_summaries(engine) == 0
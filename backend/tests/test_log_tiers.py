@@ -0,0 +1,72 @@
+"""
+Tests for tiered logging of processed requests.
+"""
+
+import pytest
+from collections import Counter
+from app import log_tiers
+from app.models import DecisionRollup, RequestLog
+
+CLEAN_PROMPT = "What is the capital of France?"
+PII_PROMPT = "Contact me at john@example.com"
+
+
+@pytest.fixture(autouse=True)
+def tier_counts(monkeypatch):
+    """Start every test with fresh tier counters."""
+    monkeypatch.setattr(log_tiers, "tier_counts", Counter())
+
+
+def test_full_tier_logs_everything(client, db):
+    """Test that the default tier logs allowed requests with their text."""
+    client.post("/v1/query", json={"prompt": CLEAN_PROMPT})
+
+    log = db.query(RequestLog).one()
+    assert log.original_prompt == CLEAN_PROMPT
+    assert "log_tier" not in log.request_metadata
+
+
+def test_metadata_tier_omits_allowed_text(client, db, monkeypatch):
+    """Test that allowed requests lose their text while risky ones stay full."""
+    monkeypatch.setattr(log_tiers, "LOG_ALLOW_TIER", "metadata")
+
+    client.post("/v1/query", json={"prompt": CLEAN_PROMPT, "response": "Paris."})
+    client.post("/v1/query", json={"prompt": PII_PROMPT})
+
+    allowed, redacted = db.query(RequestLog).order_by(RequestLog.id).all()
+    assert allowed.original_prompt == ""
+    assert allowed.original_response is None and allowed.modified_prompt is None
+    assert allowed.prompt_length == len(CLEAN_PROMPT)
+    assert allowed.request_metadata["log_tier"] == "metadata"
+    assert redacted.original_prompt == PII_PROMPT
+    assert redacted.risks[0]["match"] == "john@example.com"
+
+
+def test_sampled_tier_skips_unsampled_requests(client, db, monkeypatch):
+    """Test that unsampled allowed requests are counted in stats but not logged."""
+    monkeypatch.setattr(log_tiers, "LOG_ALLOW_TIER", "sampled")
+    monkeypatch.setattr(log_tiers, "LOG_ALLOW_SAMPLE_RATE", 0.1)
+    draws = iter([0.5, 0.05])
+    monkeypatch.setattr(log_tiers.random, "random", lambda: next(draws))
+
+    client.post("/v1/query", json={"prompt": CLEAN_PROMPT})
+    client.post("/v1/query", json={"prompt": CLEAN_PROMPT})
+    client.post("/v1/query", json={"prompt": PII_PROMPT})
+
+    logs = db.query(RequestLog).order_by(RequestLog.id).all()
+    assert [log.decision.value for log in logs] == ["allow", "redact"]
+    assert logs[0].request_metadata["sample_rate"] == 0.1
+    allowed = db.query(DecisionRollup).filter_by(granularity="day", decision="allow").one()
+    assert allowed.count == 2
+
+    counts = client.get("/v1/stats/logging").json()["counts"]
+    assert counts == {"full": 2, "metadata": 0, "skipped": 1}
+
+
+def test_strip_matches():
+    """Test that metadata-only risks keep everything but the matched text."""
+    risks = [{"type": "PII", "severity": "low", "match": "secret", "position": {"start": 0, "end": 6}}]
+
+    assert log_tiers.strip_matches(risks) == [
+        {"type": "PII", "severity": "low", "position": {"start": 0, "end": 6}}
+    ]
@@ -0,0 +1,119 @@
+"""
+Tests for bulk create/update of policy rules through PUT /v1/policy.
+"""
+
+import pytest
+from sqlalchemy import event
+from app.models import PolicyRule, RiskType, Severity, Decision
+
+
+@pytest.fixture
+def db(db):
+    """Create a session holding one existing rule."""
+    db.add(PolicyRule(
+        name="existing-rule",
+        risk_type=RiskType.PII,
+        pattern=".*@.*",
+        pattern_type="regex",
+        severity=Severity.medium,
+        action=Decision.redact,
+    ))
+    db.commit()
+    return db
+
+
+def make_rule(name, **overrides):
+    """Return a PUT /v1/policy rule payload."""
+    rule = {
+        "name": name,
+        "risk_type": "PII",
+        "pattern": ".*",
+        "pattern_type": "regex",
+        "severity": "medium",
+        "action": "redact",
+        "enabled": True,
+    }
+    rule.update(overrides)
+    return rule
+
+
+def existing_id(db):
+    return db.query(PolicyRule.id).filter_by(name="existing-rule").scalar()
+
+
+def test_mixed_batch_returns_rules_in_request_order(client, db):
+    """Created and updated rules come back with their ids, in request order."""
+    rules = [make_rule(f"bulk-{i}") for i in range(3)]
+    rules.insert(1, make_rule("existing-rule", id=existing_id(db), severity="high", action="block"))
+
+    response = client.put("/v1/policy", json={"rules": rules})
+
+    assert response.status_code == 200
+    returned = response.json()["rules"]
+    assert [rule["name"] for rule in returned] == [rule["name"] for rule in rules]
+    assert returned[1]["id"] == existing_id(db)
+    assert returned[1]["action"] == "block"
+
+    stored = {rule.name: rule for rule in db.query(PolicyRule).populate_existing()}
+    assert len(stored) == 4
+    assert stored["existing-rule"].severity == Severity.high
+    assert stored["existing-rule"].action == Decision.block
+    for rule in returned:
+        assert stored[rule["name"]].id == rule["id"]
+
+
+def test_round_trips_do_not_grow_with_rule_count(client, engine):
+    """A large batch costs the same number of statements as a small one."""
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    client.put("/v1/policy", json={"rules": [make_rule("small-0"), make_rule("small-1")]})
+    small = len(statements)
+    statements.clear()
+    response = client.put("/v1/policy", json={"rules": [make_rule(f"large-{i}") for i in range(500)]})
+
+    assert response.status_code == 200
+    assert len(response.json()["rules"]) == 500
+    assert len(statements) == small
+
+
+def test_unknown_id_rejects_the_whole_batch(client, db):
+    """Nothing is written when one rule in the batch refers to a missing id."""
+    response = client.put(
+        "/v1/policy",
+        json={"rules": [make_rule("fine-rule"), make_rule("ghost-rule", id=9999)]},
+    )
+
+    assert response.status_code == 404
+    assert db.query(PolicyRule).count() == 1
+
+
+def test_taken_and_repeated_names_are_rejected(client, db):
+    """New rules may not reuse a stored name or repeat a name within the batch."""
+    taken = client.put("/v1/policy", json={"rules": [make_rule("existing-rule")]})
+    repeated = client.put("/v1/policy", json={"rules": [make_rule("twin"), make_rule("twin")]})
+    renamed = client.put(
+        "/v1/policy",
+        json={"rules": [make_rule("other-rule"), make_rule("other-rule-2")]},
+    )
+    clash = client.put(
+        "/v1/policy",
+        json={"rules": [make_rule("other-rule", id=existing_id(db))]},
+    )
+
+    assert taken.status_code == 400
+    assert repeated.status_code == 400
+    assert renamed.status_code == 200
+    assert clash.status_code == 400
+    assert db.query(PolicyRule).count() == 3
+
+
+def test_unknown_enum_values_are_client_errors(client, db):
+    """An unknown risk type is rejected with 422 before anything is written."""
+    response = client.put(
+        "/v1/policy",
+        json={"rules": [make_rule("fine-rule"), make_rule("odd-rule", risk_type="SECRETS")]},
+    )
+
+    assert response.status_code == 422
+    assert db.query(PolicyRule).count() == 1
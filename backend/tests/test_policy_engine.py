@@ -121,6 +121,25 @@ def test_redact_text(policy_engine):
     assert "[REDACTED" in redacted or "[EMAIL" in redacted or "[SSN" in redacted
 
 
+def test_redact_text_merges_overlapping_risks(policy_engine):
+    """Risks sharing or overlapping a span are redacted once."""
+    text = "decode aGk9MTIzLTQ1LTY3ODk= now"
+    risks = [
+        RiskMatch(
+            risk_type="PII",
+            pattern_name=name,
+            match=text[start:end],
+            start=start,
+            end=end,
+            severity="high",
+            explanation="detected"
+        )
+        for name, start, end in [("ssn", 7, 27), ("phone", 7, 27), ("email", 20, 30)]
+    ]
+
+    assert policy_engine.redact_text(text, risks) == "decode [SSN_REDACTED]w"
+
+
 def test_generate_explanation(policy_engine, sample_risks):
     """Test explanation generation."""
     explanation = policy_engine.generate_explanation(sample_risks)
@@ -0,0 +1,157 @@
+"""
+Tests for save-time regex validation and cost analysis of policy rules.
+"""
+
+import pytest
+from app import policy_regex
+from app.firewall.injection_detector import RiskMatch
+from app.firewall.policy_engine import PolicyEngine
+from app.models import PolicyRule, RiskType, Severity, Decision
+
+
+@pytest.fixture
+def client(client, monkeypatch):
+    """Create a test client with a small probe budget."""
+    monkeypatch.setattr(policy_regex, "POLICY_REGEX_BUDGET_MS", 20)
+    return client
+
+
+def make_rule(name, pattern, **overrides):
+    """Return a PUT /v1/policy rule payload."""
+    rule = {
+        "name": name,
+        "risk_type": "PII",
+        "pattern": pattern,
+        "pattern_type": "regex",
+        "severity": "medium",
+        "action": "redact",
+    }
+    rule.update(overrides)
+    return rule
+
+
+def test_measure_linear_pattern():
+    """A linear pattern gets a cost and no flag."""
+    cost = policy_regex.measure(r"\b\d{3}-\d{2}-\d{4}\b", budget=1.0)
+
+    assert cost["flag"] is None
+    assert cost["growth"] < policy_regex.SUPERLINEAR_GROWTH
+    assert cost["us_per_kb"] > 0
+
+
+def test_measure_flags_quadratic_pattern():
+    """A pattern that backtracks quadratically is flagged as super-linear."""
+    cost = policy_regex.measure(r"(\s*,\s*)*z", budget=1.0)
+
+    assert cost["flag"] == policy_regex.SUPERLINEAR
+    assert cost["growth"] > policy_regex.SUPERLINEAR_GROWTH
+
+
+def test_analyze_patterns_kills_catastrophic_pattern(monkeypatch):
+    """An exponential pattern times out without holding up the others."""
+    monkeypatch.setattr(policy_regex, "POLICY_REGEX_BUDGET_MS", 20)
+
+    costs = policy_regex.analyze_patterns([r"(a+)+$", r"ignore previous", r"(a+)+$"])
+
+    assert costs[r"(a+)+$"]["flag"] == policy_regex.TIMEOUT
+    assert costs["ignore previous"]["flag"] is None
+    assert policy_regex.rejection(costs[r"(a+)+$"])
+    assert policy_regex.rejection(costs["ignore previous"]) is None
+
+
+def test_put_rejects_regex_that_does_not_compile(client, db):
+    """A broken regex is a 422 naming the rule, and nothing is saved."""
+    response = client.put(
+        "/v1/policy",
+        json={"rules": [make_rule("good", r"\d+"), make_rule("broken", r"(unclosed")]},
+    )
+
+    assert response.status_code == 422
+    assert "'broken'" in response.json()["detail"]
+    assert db.query(PolicyRule).count() == 0
+
+
+def test_put_rejects_catastrophic_regex(client, db):
+    """A pattern with exponential backtracking is refused at save time."""
+    response = client.put("/v1/policy", json={"rules": [make_rule("redos", r"^(\w+\s?)*$")]})
+
+    assert response.status_code == 422
+    assert "catastrophic" in response.json()["detail"]
+    assert db.query(PolicyRule).count() == 0
+
+
+def test_put_stores_cost_and_flags_superlinear_regex(client, db, monkeypatch):
+    """Costs are stored and returned; super-linear patterns are flagged or rejected per setting."""
+    response = client.put(
+        "/v1/policy",
+        json={"rules": [
+            make_rule("ssn", r"\b\d{3}-\d{2}-\d{4}\b"),
+            make_rule("commas", r"(\s*,\s*)*z"),
+            make_rule("keyword", "password", pattern_type="keyword"),
+        ]},
+    )
+
+    assert response.status_code == 200
+    costs = {rule["name"]: rule["pattern_cost"] for rule in response.json()["rules"]}
+    assert costs["ssn"]["flag"] is None
+    assert costs["commas"]["flag"] == policy_regex.SUPERLINEAR
+    assert costs["keyword"] is None
+    assert db.query(PolicyRule).filter_by(name="ssn").one().pattern_cost == costs["ssn"]
+
+    monkeypatch.setattr(policy_regex, "POLICY_REGEX_SUPERLINEAR", "reject")
+    rejected = client.put("/v1/policy", json={"rules": [make_rule("commas-2", r"(\s*,\s*)*y")]})
+    assert rejected.status_code == 422
+
+
+def test_put_reuses_cost_of_unchanged_pattern(client, db, monkeypatch):
+    """Only new or changed patterns are probed again."""
+    created = client.put("/v1/policy", json={"rules": [make_rule("ssn", r"\d{3}-\d{2}-\d{4}")]})
+    rule = created.json()["rules"][0]
+
+    probed = []
+    analyze = policy_regex.analyze_patterns
+
+    def recording_analyze(patterns):
+        patterns = list(patterns)
+        probed.extend(patterns)
+        return analyze(patterns)
+
+    monkeypatch.setattr(policy_regex, "analyze_patterns", recording_analyze)
+    client.put("/v1/policy", json={"rules": [dict(rule, severity="high")]})
+    assert probed == []
+
+    client.put("/v1/policy", json={"rules": [dict(rule, pattern=r"\d{9}")]})
+    assert probed == [r"\d{9}"]
+
+
+def test_engine_prefers_stricter_then_cheaper_rules():
+    """Among equally severe matching rules the strictest action wins, cheapest first."""
+    engine = PolicyEngine()
+    expensive = PolicyRule(
+        name="expensive", risk_type=RiskType.PII, pattern=".*", pattern_type="regex",
+        severity=Severity.medium, action=Decision.redact, enabled=True,
+        pattern_cost={"us_per_kb": 50.0, "growth": 1.0, "flag": None},
+    )
+    cheap = PolicyRule(
+        name="cheap", risk_type=RiskType.PII, pattern="@", pattern_type="regex",
+        severity=Severity.medium, action=Decision.redact, enabled=True,
+        pattern_cost={"us_per_kb": 1.0, "growth": 1.0, "flag": None},
+    )
+    strict = PolicyRule(
+        name="strict", risk_type=RiskType.PII, pattern="example", pattern_type="keyword",
+        severity=Severity.medium, action=Decision.block, enabled=True,
+    )
+    low = PolicyRule(
+        name="low", risk_type=RiskType.PII, pattern=".*", pattern_type="regex",
+        severity=Severity.low, action=Decision.warn, enabled=True,
+    )
+
+    assert [rule.name for rule in engine._order_rules([low, expensive, cheap, strict])] == [
+        "strict", "cheap", "expensive", "low"
+    ]
+
+    risk = RiskMatch(
+        risk_type="PII", severity="medium", pattern_name="email", match="a@example.com",
+        start=0, end=13, explanation="Email address"
+    )
+    assert engine.apply_policy_rules([risk], [low, expensive, cheap, strict]) == Decision.block
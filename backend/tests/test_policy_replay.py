@@ -0,0 +1,153 @@
+"""
+Tests for replaying a candidate policy against logged requests.
+"""
+
+import pytest
+from app import policy_replay
+from app.auth import get_current_admin_user
+from app.main import app
+from app.models import PolicyRule, RequestLog, Decision
+from app.policy_rules import candidate_rules
+from app.schemas import PolicyRuleSchema
+
+PROMPTS = [
+    "What is the weather today?",
+    "Email me at jane@example.com",
+    "My SSN is 123-45-6789",
+    "Please write to bob@example.org about the invoice",
+    "Call 555-123-4567 tomorrow",
+]
+
+BLOCK_EMAILS = {
+    "name": "block-emails",
+    "risk_type": "PII",
+    "pattern": "@",
+    "pattern_type": "keyword",
+    "severity": "high",
+    "action": "block",
+}
+
+
+@pytest.fixture
+def client(client, monkeypatch):
+    """Create a test client whose database holds a few logged requests."""
+    monkeypatch.setattr(policy_replay, "POLICY_REPLAY_WORKERS", 1)
+    for prompt in PROMPTS:
+        client.post("/v1/query", json={"prompt": prompt})
+    return client
+
+
+def test_replay_without_rules_changes_nothing(client):
+    """The default policy reproduces the logged decisions."""
+    response = client.post("/v1/policy/replay", json={"rules": []})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["evaluated"] == len(PROMPTS)
+    assert result["changed"] == 0
+    assert result["before"] == result["after"] == {"allow": 1, "redact": 3, "block": 1}
+
+
+def test_replay_reports_changed_decisions_with_samples(client, db):
+    """Blocking emails turns both logged email redactions into blocks."""
+    response = client.post("/v1/policy/replay", json={"rules": [BLOCK_EMAILS], "samples": 1})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["changed"] == 2
+    assert result["transitions"] == {"redact->block": 2}
+    assert result["after"] == {"allow": 1, "redact": 1, "block": 3}
+
+    # Samples are the most recent changed requests
+    [sample] = result["samples"]
+    newest_email_log = db.query(RequestLog).filter(
+        RequestLog.original_prompt.like("%bob@example.org%")
+    ).one()
+    assert sample["log_id"] == newest_email_log.id
+    assert sample["risks"] == ["email"]
+    assert "[EMAIL_REDACTED]" in sample["prompt_before"]
+    assert sample["prompt_after"] == "[BLOCKED]"
+
+    # A dry run saves nothing
+    assert db.query(PolicyRule).count() == 0
+
+
+def test_replay_limit_and_skipped_logs(client, db):
+    """Only the most recent logs are replayed, and logs without text are skipped."""
+    db.add(RequestLog(
+        request_id="metadata-only",
+        original_prompt="",
+        decision=Decision.allow,
+        risks=[],
+        request_metadata={"log_tier": "metadata"},
+    ))
+    db.commit()
+
+    result = client.post("/v1/policy/replay", json={"rules": [BLOCK_EMAILS], "limit": 3}).json()
+
+    assert result["skipped"] == 1
+    assert result["evaluated"] == 2
+    assert result["transitions"] == {"redact->block": 1}
+
+
+def test_replay_requires_an_admin(client):
+    """Replays are refused without admin credentials."""
+    app.dependency_overrides.pop(get_current_admin_user)
+
+    response = client.post("/v1/policy/replay", json={"rules": [BLOCK_EMAILS]})
+
+    assert response.status_code == 403
+
+
+def test_replay_validates_candidate_rules(client):
+    """Candidate regexes get the same checks as saved ones."""
+    broken = dict(BLOCK_EMAILS, pattern="(unclosed", pattern_type="regex")
+
+    response = client.post("/v1/policy/replay", json={"rules": [broken]})
+
+    assert response.status_code == 422
+
+
+def test_replay_compares_saved_rules_with_candidate(client, db):
+    """Saved rules apply to both runs, and a candidate rule replaces one by name."""
+    db.add(PolicyRule(**candidate_rules([PolicyRuleSchema(**BLOCK_EMAILS)])[0]))
+    db.commit()
+
+    unchanged = client.post("/v1/policy/replay", json={"rules": []}).json()
+    disabled = client.post(
+        "/v1/policy/replay", json={"rules": [dict(BLOCK_EMAILS, enabled=False)]}
+    ).json()
+
+    # Logged decisions predate the saved rule; the replay diffs the rule sets only
+    assert unchanged["changed"] == 0
+    assert unchanged["before"] == {"allow": 1, "redact": 1, "block": 3}
+    assert disabled["transitions"] == {"block->redact": 2}
+
+
+def test_api_replay_caps_worker_processes(client, monkeypatch):
+    """Replays started through the API use at most POLICY_REPLAY_API_WORKERS processes."""
+    calls = []
+    replay = policy_replay.replay_policy
+    monkeypatch.setattr(policy_replay, "POLICY_REPLAY_WORKERS", 64)
+    monkeypatch.setattr(policy_replay, "POLICY_REPLAY_API_WORKERS", 1)
+    monkeypatch.setattr(
+        policy_replay, "replay_policy",
+        lambda *args: calls.append(args[-1]) or replay(*args),
+    )
+
+    assert client.post("/v1/policy/replay", json={"rules": []}).status_code == 200
+    assert calls == [1]
+
+
+def test_process_pool_matches_in_process_replay(client, db, monkeypatch):
+    """Replaying in worker processes gives the same result as in-process."""
+    rules = candidate_rules([PolicyRuleSchema(**BLOCK_EMAILS)])
+    # Several chunks, so the pool has work to spread
+    monkeypatch.setattr(policy_replay, "CHUNK_SIZE", 2)
+
+    serial = policy_replay.replay_policy(db, rules, limit=100, workers=1)
+    pooled = policy_replay.replay_policy(db, rules, limit=100, workers=2)
+
+    for result in (serial, pooled):
+        result.pop("duration_seconds")
+    assert pooled == serial
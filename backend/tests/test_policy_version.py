@@ -0,0 +1,73 @@
+"""
+Tests for ETags, conditional GET and incremental polling of /v1/policy.
+"""
+
+
+def make_rule(name, **overrides):
+    """Return a PUT /v1/policy rule payload."""
+    rule = {
+        "name": name,
+        "risk_type": "PII",
+        "pattern": "secret",
+        "pattern_type": "keyword",
+        "severity": "medium",
+        "action": "redact",
+    }
+    rule.update(overrides)
+    return rule
+
+
+def test_empty_policy_has_version_zero(client):
+    """A fresh database serves version 0 with an ETag."""
+    response = client.get("/v1/policy")
+
+    assert response.status_code == 200
+    assert response.json() == {"rules": [], "version": 0}
+    assert response.headers["ETag"] == '"policy-0"'
+
+
+def test_if_none_match_returns_304_until_the_policy_changes(client):
+    """Polling with the last ETag costs no body until a write bumps the version."""
+    put = client.put("/v1/policy", json={"rules": [make_rule("a"), make_rule("b")]})
+    etag = put.headers["ETag"]
+    assert put.json()["version"] == 1
+
+    not_modified = client.get("/v1/policy", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    client.put("/v1/policy", json={"rules": [make_rule("c")]})
+    changed = client.get("/v1/policy", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["version"] == 2
+    assert changed.headers["ETag"] == '"policy-2"'
+    assert len(changed.json()["rules"]) == 3
+
+
+def test_since_version_returns_only_changed_rules(client):
+    """Incremental polls return rules created or updated after the given version."""
+    created = client.put("/v1/policy", json={"rules": [make_rule("a"), make_rule("b")]}).json()
+    rule_a = created["rules"][0]
+
+    client.put("/v1/policy", json={"rules": [dict(rule_a, enabled=False)]})
+    client.put("/v1/policy", json={"rules": [make_rule("c")]})
+
+    since_1 = client.get("/v1/policy", params={"since_version": 1}).json()
+    assert since_1["version"] == 3
+    assert [(rule["name"], rule["version"], rule["enabled"]) for rule in since_1["rules"]] == [
+        ("a", 2, False),
+        ("c", 3, True),
+    ]
+    assert client.get("/v1/policy", params={"since_version": 3}).json()["rules"] == []
+    assert len(client.get("/v1/policy", params={"since_version": 0}).json()["rules"]) == 3
+
+
+def test_rejected_write_does_not_bump_the_version(client):
+    """A PUT that fails validation leaves the version, and so the ETag, unchanged."""
+    client.put("/v1/policy", json={"rules": [make_rule("a")]})
+
+    rejected = client.put("/v1/policy", json={"rules": [make_rule("a")]})
+
+    assert rejected.status_code == 400
+    assert client.get("/v1/policy").headers["ETag"] == '"policy-1"'
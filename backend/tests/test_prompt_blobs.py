@@ -0,0 +1,85 @@
+"""
+Tests for deduplicated storage of repeated prompts.
+"""
+
+import pytest
+from sqlalchemy import event
+from app import log_bodies, prompt_blobs
+from app.models import PromptBlob, RequestLog
+
+TEMPLATE = "You are a helpful support assistant for Acme Corp. Answer politely and concisely."
+
+
+@pytest.fixture(autouse=True)
+def dedup(monkeypatch):
+    """Enable prompt deduplication with an empty hash cache."""
+    monkeypatch.setattr(prompt_blobs, "PROMPT_DEDUP", True)
+    monkeypatch.setattr(prompt_blobs, "_known_hashes", type(prompt_blobs._known_hashes)())
+
+
+def test_store_prompt_skips_short_prompts_and_disabled_dedup(db, monkeypatch):
+    """Test that short prompts and disabled dedup keep text inline."""
+    assert prompt_blobs.store_prompt(db, "hi") is None
+    monkeypatch.setattr(prompt_blobs, "PROMPT_DEDUP", False)
+    assert prompt_blobs.store_prompt(db, TEMPLATE) is None
+    assert db.query(PromptBlob).count() == 0
+
+
+def test_store_prompt_caches_committed_hashes(engine, db):
+    """Test that a committed hash is served from the cache without a round trip."""
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    digest = prompt_blobs.store_prompt(db, TEMPLATE)
+    db.commit()
+    statements.clear()
+
+    assert prompt_blobs.store_prompt(db, TEMPLATE) == digest
+    assert statements == []
+    assert db.query(PromptBlob).count() == 1
+
+
+def test_store_prompt_forgets_rolled_back_hashes(db):
+    """Test that a hash inserted by a rolled back transaction is not cached."""
+    digest = prompt_blobs.store_prompt(db, TEMPLATE)
+    db.rollback()
+
+    assert digest not in prompt_blobs._known_hashes
+    assert prompt_blobs.store_prompt(db, TEMPLATE) == digest
+    db.commit()
+    assert db.query(PromptBlob).count() == 1
+
+
+def test_store_prompt_rechecks_expired_cache_entries(engine, db, monkeypatch):
+    """Test that a cached hash past its TTL is inserted again, as after pruning."""
+    digest = prompt_blobs.store_prompt(db, TEMPLATE)
+    db.commit()
+    db.query(PromptBlob).delete()
+    db.commit()
+    monkeypatch.setattr(prompt_blobs, "PROMPT_BLOB_CACHE_TTL", 0)
+
+    assert prompt_blobs.store_prompt(db, TEMPLATE) == digest
+    db.commit()
+    assert db.query(PromptBlob).count() == 1
+
+
+@pytest.mark.parametrize("storage", ["text", "compressed"])
+def test_repeated_prompts_are_stored_once(client, db, monkeypatch, storage):
+    """Test that identical prompts share one blob and read back in full."""
+    monkeypatch.setattr(log_bodies, "BODY_STORAGE", storage)
+    prompt = TEMPLATE + " Contact john@example.com"
+    for _ in range(3):
+        client.post("/v1/query", json={"prompt": prompt})
+
+    logs = db.query(RequestLog).all()
+    assert db.query(PromptBlob).count() == 1
+    assert {log.prompt_hash for log in logs} == {prompt_blobs.prompt_hash(prompt)}
+    assert all(log.original_prompt == "" for log in logs)
+    assert logs[0].prompt_length == len(prompt)
+
+    listed = client.get("/v1/logs?count=none").json()["logs"]
+    detail = client.get(f"/v1/logs/{logs[0].id}").json()
+    for data in listed + [detail]:
+        assert data["original_prompt"] == prompt
+        assert data["modified_prompt"].startswith(TEMPLATE)
+        assert "john@example.com" not in data["modified_prompt"]
@@ -137,16 +137,29 @@ def test_query_metadata_included(client):
 
 
 def test_query_explanation_included(client):
-    """Test that explanation is included in response."""
+    """Test that explanation is included in response when requested."""
     response = client.post(
-        "/v1/query",
+        "/v1/query?explain=true",
         json={"prompt": "My email is test@example.com"}
     )
     
     assert response.status_code == 200
     data = response.json()
     assert "explanation" in data
-    assert len(data["explanation"]) > 0
+    assert data["explanation"] == "Detected 1 PII item(s): email"
+
+
+def test_query_explanation_omitted_by_default(client):
+    """Test that the explanation is not built unless requested."""
+    response = client.post(
+        "/v1/query",
+        json={"prompt": "My email is test@example.com"}
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["explanation"] is None
+    assert data["risks"][0]["explanation"] == "Email address detected"
 
 
 def test_query_logs_request(client):
@@ -0,0 +1,100 @@
+"""
+Tests for routing admin reads to a read replica.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app import database
+from app.database import Base, get_db
+from app.main import app
+from app.models import PolicyRule, RiskType, Severity, Decision
+
+
+def make_database(path, rule_name):
+    """Create a file-backed SQLite database holding one policy rule."""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with session_factory() as session:
+        session.add(PolicyRule(
+            name=rule_name,
+            risk_type=RiskType.PII,
+            pattern="x",
+            pattern_type="regex",
+            severity=Severity.low,
+            action=Decision.warn,
+        ))
+        session.commit()
+    return engine, session_factory
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Create a client whose primary and replica hold different policy rules."""
+    primary_engine, primary_sessions = make_database(tmp_path / "primary.db", "primary-rule")
+    replica_engine, replica_sessions = make_database(tmp_path / "replica.db", "replica-rule")
+    monkeypatch.setattr(database, "read_engine", replica_engine)
+    monkeypatch.setattr(database, "ReadSessionLocal", replica_sessions)
+    monkeypatch.setattr(database, "REPLICA_LAG_CHECK_INTERVAL", 0)
+
+    def override_get_db():
+        db = primary_sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    primary_engine.dispose()
+    replica_engine.dispose()
+
+
+def rule_names(client):
+    """Return the policy rule names served by GET /v1/policy."""
+    return [rule["name"] for rule in client.get("/v1/policy").json()["rules"]]
+
+
+def test_reads_use_replica(client):
+    """Test that read endpoints are served from a current replica."""
+    assert rule_names(client) == ["replica-rule"]
+
+
+def test_lagging_replica_falls_back_to_primary(client, monkeypatch):
+    """Test that a replica beyond the lag limit is bypassed."""
+    monkeypatch.setattr(database, "replica_lag_seconds", lambda: 60.0)
+
+    assert rule_names(client) == ["primary-rule"]
+
+
+def test_unreachable_replica_falls_back_to_primary(client, monkeypatch, tmp_path):
+    """Test that reads go to the primary when the replica cannot be reached."""
+    broken = create_engine(f"sqlite:///{tmp_path}/missing/replica.db")
+    monkeypatch.setattr(database, "read_engine", broken)
+
+    assert database.replica_lag_seconds() is None
+    assert rule_names(client) == ["primary-rule"]
+
+
+def test_lag_check_is_cached(client, monkeypatch):
+    """Test that replica lag is measured at most once per check interval."""
+    calls = []
+    monkeypatch.setattr(database, "REPLICA_LAG_CHECK_INTERVAL", 60)
+    monkeypatch.setattr(database, "_replica_check", (float("-inf"), False))
+    monkeypatch.setattr(database, "replica_lag_seconds", lambda: calls.append(1) or 0.0)
+
+    rule_names(client)
+    rule_names(client)
+
+    assert len(calls) == 1
+
+
+def test_writes_stay_on_primary(client):
+    """Test that the query write path never uses the replica."""
+    client.post("/v1/query", json={"prompt": "hello"})
+
+    with database.ReadSessionLocal() as replica:
+        assert replica.execute(text("SELECT count(*) FROM request_logs")).scalar() == 0
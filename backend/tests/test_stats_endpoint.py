@@ -0,0 +1,155 @@
+"""
+Tests for /v1/stats endpoint and the rollups behind it.
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.exc import OperationalError
+from app import log_rollups
+from app.models import DecisionRollup, RiskRollup
+from app.log_rollups import bucket_start, flush, prune_rollups, record_request
+
+
+def test_bucket_start_truncates_in_utc():
+    """Test bucket truncation for each granularity."""
+    moment = datetime(2025, 3, 4, 15, 42, 37, 123456, tzinfo=timezone.utc)
+
+    assert bucket_start(moment, "minute") == datetime(2025, 3, 4, 15, 42, tzinfo=timezone.utc)
+    assert bucket_start(moment, "hour") == datetime(2025, 3, 4, 15, tzinfo=timezone.utc)
+    assert bucket_start(moment, "day") == datetime(2025, 3, 4, tzinfo=timezone.utc)
+
+
+def test_record_request_accumulates_counts(db):
+    """Test that repeated requests add to the same rollup rows."""
+    moment = datetime(2025, 3, 4, 15, 42, tzinfo=timezone.utc)
+    risks = [
+        {"type": "PII", "severity": "medium", "pattern_name": "email"},
+        {"type": "PII", "severity": "medium", "pattern_name": "email"},
+    ]
+
+    record_request(moment, "redact", risks)
+    record_request(moment, "redact", risks[:1])
+    flush(db)
+
+    decision = db.query(DecisionRollup).filter_by(granularity="hour").one()
+    assert decision.count == 2
+    risk = db.query(RiskRollup).filter_by(granularity="day").one()
+    assert risk.count == 3
+    assert db.query(DecisionRollup).count() == 3
+
+
+def test_stats_endpoint_reflects_logged_queries(client):
+    """Test that /v1/query updates the counts served by /v1/stats."""
+    client.post("/v1/query", json={"prompt": "What is the capital of France?"})
+    client.post("/v1/query", json={"prompt": "Contact me at john@example.com"})
+    client.post("/v1/query", json={"prompt": "Or jane@example.com instead"})
+
+    response = client.get("/v1/stats?granularity=day")
+
+    assert response.status_code == 200
+    data = response.json()
+    decisions = {row["decision"]: row["count"] for row in data["decisions"]}
+    assert decisions == {"allow": 1, "redact": 2}
+    emails = [row for row in data["risks"] if row["pattern_name"] == "email"]
+    assert len(emails) == 1
+    assert emails[0]["count"] == 2
+
+
+def test_stats_endpoint_date_range(client, db):
+    """Test that buckets outside the requested range are excluded."""
+    record_request(datetime(2025, 1, 1, 10, tzinfo=timezone.utc), "allow", [])
+    record_request(datetime(2025, 1, 3, 10, tzinfo=timezone.utc), "block", [])
+    flush(db)
+
+    response = client.get(
+        "/v1/stats?granularity=day&date_from=2025-01-02T00:00:00Z&date_to=2025-01-05T00:00:00Z"
+    )
+
+    assert response.status_code == 200
+    assert [row["decision"] for row in response.json()["decisions"]] == ["block"]
+
+
+def test_stats_endpoint_includes_bucket_containing_start(client, db):
+    """Test that date_from inside a bucket still returns that bucket."""
+    record_request(datetime(2025, 1, 1, 15, 10, tzinfo=timezone.utc), "allow", [])
+    flush(db)
+
+    response = client.get(
+        "/v1/stats?granularity=hour&date_from=2025-01-01T15:30:00Z&date_to=2025-01-01T18:00:00Z"
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["date_from"] == "2025-01-01T15:00:00+00:00"
+    assert [row["decision"] for row in data["decisions"]] == ["allow"]
+
+
+def test_stats_endpoint_invalid_granularity(client):
+    """Test that unsupported granularities are rejected."""
+    response = client.get("/v1/stats?granularity=week")
+
+    assert response.status_code == 422
+
+
+def test_counts_are_buffered_until_due(client, db, monkeypatch):
+    """Test that requests within the flush interval share one rollup write."""
+    monkeypatch.setattr(log_rollups, "ROLLUP_FLUSH_SECONDS", 3600)
+    for _ in range(3):
+        client.post("/v1/query", json={"prompt": "What is the capital of France?"})
+
+    assert db.query(DecisionRollup).count() == 0
+
+    monkeypatch.setattr(log_rollups, "ROLLUP_FLUSH_SECONDS", 0)
+    client.post("/v1/query", json={"prompt": "What is the capital of France?"})
+
+    assert db.query(DecisionRollup).filter_by(granularity="day").one().count == 4
+
+
+def test_flush_upserts_in_key_order(db):
+    """Test that rows are written in key order whatever order risks were detected in."""
+    moment = datetime(2025, 3, 4, 15, 42, tzinfo=timezone.utc)
+    record_request(moment, "block", [
+        {"type": "PROMPT_INJECTION", "severity": "high", "pattern_name": "jailbreak"},
+        {"type": "PII", "severity": "medium", "pattern_name": "email"},
+    ])
+    flush(db)
+
+    # Ids follow insertion order
+    rows = db.query(RiskRollup).order_by(RiskRollup.id).all()
+    keys = [(row.granularity, row.risk_type) for row in rows]
+    assert len(keys) == 6
+    assert keys == sorted(keys)
+
+
+def test_failed_flush_keeps_counts(db, monkeypatch):
+    """Test that counts survive a failed write and are added by the next one."""
+    record_request(datetime(2025, 3, 4, tzinfo=timezone.utc), "allow", [])
+    with monkeypatch.context() as patched:
+        patched.setattr(log_rollups, "_upsert_counts", _fail)
+        with pytest.raises(OperationalError):
+            flush(db)
+
+    flush(db)
+
+    assert db.query(DecisionRollup).filter_by(granularity="day").one().count == 1
+
+
+def _fail(*args):
+    raise OperationalError("INSERT", {}, Exception("deadlock detected"))
+
+
+def test_prune_rollups_drops_old_minute_buckets(engine, db):
+    """Test that only minute buckets older than the retention window are pruned."""
+    now = datetime(2025, 3, 20, 12, tzinfo=timezone.utc)
+    record_request(now - timedelta(days=10), "allow", [{"type": "PII", "severity": "low"}])
+    record_request(now - timedelta(days=1), "allow", [])
+    flush(db)
+
+    with engine.begin() as conn:
+        assert prune_rollups(conn, now, retention_days=7) == 2
+
+    minutes = db.query(DecisionRollup.bucket_start).filter_by(granularity="minute").all()
+    assert len(minutes) == 1
+    assert db.query(DecisionRollup).filter_by(granularity="day").count() == 2
+    with engine.begin() as conn:
+        assert prune_rollups(conn, now, retention_days=0) == 0
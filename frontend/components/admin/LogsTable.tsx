@@ -63,12 +63,14 @@ export default function LogsTable({ filters }: LogsTableProps) {
           limit,
           offset,
           format: 'json',
+          // Only the columns the table renders; skips the prompt/response text
+          fields: 'id,request_id,timestamp,decision,risks',
         }) as LogsResponse;
         
         setClientMode(false);
         setClientAll([]);
         setLogs(response.logs);
-        setTotal(response.total);
+        setTotal(response.total ?? 0);
         setHasMore(response.has_more);
       }
     } catch (err) {
@@ -12,6 +12,7 @@ export interface QueryRequest {
 export interface Risk {
   type: string;
   severity: 'high' | 'medium' | 'low';
+  pattern_name?: string;
   match: string;
   position: { start: number; end: number };
   explanation: string;
@@ -22,7 +23,7 @@ export interface QueryResponse {
   promptModified?: string;
   responseModified?: string;
   risks: Risk[];
-  explanation: string;
+  explanation: string | null;
   metadata: {
     requestId: string;
     timestamp: string;
@@ -60,10 +61,12 @@ export interface LogEntry {
 
 export interface LogsResponse {
   logs: LogEntry[];
-  total: number;
+  total: number | null;
+  total_is_estimate: boolean;
   limit: number;
   offset: number;
   has_more: boolean;
+  next_cursor: string | null;
 }
 
 export class APIError extends Error {
@@ -110,7 +113,7 @@ async function fetchAPI<T>(
 
 export const apiClient = {
   async query(request: QueryRequest): Promise<QueryResponse> {
-    return fetchAPI<QueryResponse>('/v1/query', {
+    return fetchAPI<QueryResponse>('/v1/query?explain=true', {
       method: 'POST',
       body: JSON.stringify(request),
     });
@@ -135,6 +138,7 @@ export const apiClient = {
     limit?: number;
     offset?: number;
     format?: 'json' | 'csv';
+    fields?: string;
   }): Promise<LogsResponse | string> {
     const queryParams = new URLSearchParams();
     if (params) {
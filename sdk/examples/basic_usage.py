@@ -10,7 +10,7 @@ def main():
     
     # Example 1: Process a clean prompt
     print("Example 1: Clean prompt")
-    result = client.query(prompt="What is the capital of France?")
+    result = client.query(prompt="What is the capital of France?", explain=True)
     print(f"Decision: {result['decision']}")
     print(f"Explanation: {result['explanation']}")
     print()
@@ -30,7 +30,10 @@ class PromptFirewallClient:
         )
 
     def query(
-        self, prompt: Optional[str] = None, response: Optional[str] = None
+        self,
+        prompt: Optional[str] = None,
+        response: Optional[str] = None,
+        explain: bool = False,
     ) -> Dict[str, Any]:
         """
         Process a prompt and/or response through the firewall.
@@ -38,6 +41,7 @@ class PromptFirewallClient:
         Args:
             prompt: User's input prompt (optional)
             response: Model's response (optional)
+            explain: Include the human-readable explanation (None otherwise)
 
         Returns:
             Dictionary containing firewall decision, modified text, risks, and metadata
@@ -55,7 +59,9 @@ class PromptFirewallClient:
             payload["response"] = response
 
         try:
-            resp = self.client.post("/v1/query", json=payload)
+            resp = self.client.post(
+                "/v1/query", json=payload, params={"explain": "true"} if explain else None
+            )
             resp.raise_for_status()
             return resp.json()
         except httpx.HTTPStatusError as e:
@@ -69,7 +69,8 @@ class TestQueryMethod:
         assert result["decision"] == "allow"
         mock_client.post.assert_called_once_with(
             "/v1/query",
-            json={"prompt": "What is the capital of France?"}
+            json={"prompt": "What is the capital of France?"},
+            params=None
         )
         client.close()
     
@@ -97,7 +98,8 @@ class TestQueryMethod:
         assert result["decision"] == "allow"
         mock_client.post.assert_called_once_with(
             "/v1/query",
-            json={"response": "The capital of France is Paris."}
+            json={"response": "The capital of France is Paris."},
+            params=None
         )
         client.close()
     
@@ -131,7 +133,37 @@ class TestQueryMethod:
             json={
                 "prompt": "What is the capital of France?",
                 "response": "The capital of France is Paris."
-            }
+            },
+            params=None
+        )
+        client.close()
+    
+    @patch('httpx.Client')
+    def test_query_with_explain(self, mock_client_class):
+        """Test query method requests the explanation."""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "decision": "allow",
+            "promptModified": None,
+            "responseModified": None,
+            "risks": [],
+            "explanation": "No security risks detected. Request allowed.",
+            "metadata": {"requestId": "test-id", "timestamp": "2024-01-01T00:00:00Z"}
+        }
+        mock_response.raise_for_status = Mock()
+        
+        mock_client = Mock()
+        mock_client.post.return_value = mock_response
+        mock_client_class.return_value = mock_client
+        
+        client = PromptFirewallClient(base_url="http://localhost:8000")
+        result = client.query(prompt="What is the capital of France?", explain=True)
+        
+        assert result["explanation"] == "No security risks detected. Request allowed."
+        mock_client.post.assert_called_once_with(
+            "/v1/query",
+            json={"prompt": "What is the capital of France?"},
+            params={"explain": "true"}
         )
         client.close()
     